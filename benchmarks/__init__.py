@@ -0,0 +1,16 @@
+from .cases import CASES, Case, case
+from .fixtures import Fixture
+from .runner import Regression, Result, load, regressions, run, save
+
+__all__ = [
+    "CASES",
+    "Case",
+    "Fixture",
+    "Regression",
+    "Result",
+    "case",
+    "load",
+    "regressions",
+    "run",
+    "save",
+]
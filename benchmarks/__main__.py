@@ -0,0 +1,134 @@
+from __future__ import annotations
+
+import argparse
+import sys
+from collections.abc import Sequence
+from pathlib import Path
+from typing import cast
+
+from .cases import CASES, Case
+from .fixtures import SHAPES, Shape
+from .runner import (
+    DEFAULT_MIN_TIME,
+    DEFAULT_THRESHOLD,
+    HEADER,
+    Result,
+    format_result,
+    load,
+    regressions,
+    run,
+    save,
+    select,
+)
+
+
+def parse_args(argv: Sequence[str] | None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks",
+        description="Times RichSet operations and reports ops/s and peak "
+        "memory.",
+    )
+    parser.add_argument(
+        "cases",
+        nargs="*",
+        help="case names or groups to run, e.g. sorting search.has "
+        "(default: all)",
+    )
+    parser.add_argument(
+        "--sizes",
+        default="1e3,1e4,1e5",
+        help="comma-separated input sizes (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--shapes",
+        default=",".join(SHAPES),
+        help="comma-separated record shapes (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--hit-ratios",
+        default="0.5,0,1",
+        help="comma-separated hit ratios for searches, set operations and "
+        "joins (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--min-time",
+        type=float,
+        default=DEFAULT_MIN_TIME,
+        help="minimum seconds per measurement (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--output",
+        type=Path,
+        help="write the results to this JSON file",
+    )
+    parser.add_argument(
+        "--compare",
+        type=Path,
+        help="flag regressions against the results in this JSON file "
+        "and exit with status 1 if there are any",
+    )
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=DEFAULT_THRESHOLD,
+        help="relative slowdown or memory growth flagged as a regression "
+        "(default: %(default)s)",
+    )
+    parser.add_argument("--list", action="store_true", help="list cases")
+    return parser.parse_args(argv)
+
+
+def parse_shapes(value: str) -> list[Shape]:
+    shapes = value.split(",")
+    for shape in shapes:
+        if shape not in SHAPES:
+            raise SystemExit(f"unknown shape: {shape}")
+    return cast(list[Shape], shapes)
+
+
+def measure_all(
+    cases: Sequence[Case],
+    args: argparse.Namespace,
+) -> list[Result]:
+    """Returns the results of the cases, printing them as they come."""
+    results: list[Result] = []
+    print(HEADER)
+    for result in run(
+        cases,
+        sizes=[int(float(size)) for size in args.sizes.split(",")],
+        shapes=parse_shapes(args.shapes),
+        hit_ratios=[float(ratio) for ratio in args.hit_ratios.split(",")],
+        min_time=args.min_time,
+    ):
+        print(format_result(result), flush=True)
+        results.append(result)
+    return results
+
+
+def report_regressions(
+    previous: Path,
+    results: list[Result],
+    threshold: float,
+) -> int:
+    found = regressions(load(previous), results, threshold=threshold)
+    for regression in found:
+        print(f"REGRESSION {regression}")
+    return 1 if found else 0
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    args = parse_args(argv)
+    cases = select(CASES, args.cases)
+    if args.list or not cases:
+        print("\n".join(case.name for case in cases))
+        return 0 if cases else 1
+    results = measure_all(cases, args)
+    if args.output is not None:
+        save(args.output, results)
+    if args.compare is None:
+        return 0
+    return report_regressions(args.compare, results, args.threshold)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,711 @@
+from __future__ import annotations
+
+import asyncio
+import atexit
+import functools
+import tempfile
+import warnings
+from collections.abc import AsyncIterator, Callable
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+from richset import RichSet
+
+from .fixtures import GROUPS, SHAPES, Fixture, Shape, make_record
+
+Run = Callable[[RichSet[Any], Fixture], object]
+
+
+@dataclass(frozen=True)
+class Case:
+    """A benchmarked operation. name is "<group>.<method>".
+
+    run is called with a new RichSet of the records, so lazily built
+    caches such as index_by() start cold, and the fixture. With warm,
+    the same RichSet is reused after a first untimed call instead.
+    Cases with uses_hit_ratio are measured at every hit ratio, the others
+    at the first one only, and cases are measured for the given shapes
+    only."""
+
+    name: str
+    run: Run
+    uses_hit_ratio: bool = False
+    warm: bool = False
+    shapes: tuple[Shape, ...] = SHAPES
+
+    @property
+    def group(self) -> str:
+        return self.name.split(".", 1)[0]
+
+    def measured_at(self, shape: Shape, *, first_hit_ratio: bool) -> bool:
+        """Returns True if the case is measured for the shape, at the
+        first hit ratio or at another one."""
+        if shape not in self.shapes:
+            return False
+        return first_hit_ratio or self.uses_hit_ratio
+
+
+CASES: list[Case] = []
+
+
+def case(
+    name: str,
+    *,
+    uses_hit_ratio: bool = False,
+    warm: bool = False,
+    shapes: tuple[Shape, ...] = SHAPES,
+) -> Callable[[Run], Run]:
+    """Registers the decorated function as the benchmark case name."""
+
+    def register(run: Run) -> Run:
+        CASES.append(Case(name, run, uses_hit_ratio, warm, shapes))
+        return run
+
+    return register
+
+
+def equals(key: Callable[[Any], int], k: int) -> Callable[[Any], bool]:
+    return lambda r: key(r) == k
+
+
+# the functions below are picklable (unlike lambdas and fx.group_key, a
+# method of the fixture), for the parallel_* cases
+
+
+def is_even(key: Callable[[Any], int], r: Any) -> bool:  # noqa: ANN401
+    return key(r) % 2 == 0
+
+
+def group_of(key: Callable[[Any], int], r: Any) -> int:  # noqa: ANN401
+    return key(r) % GROUPS
+
+
+def add_key(key: Callable[[Any], int], a: int, r: Any) -> int:  # noqa: ANN401
+    return a + key(r)
+
+
+@functools.cache
+def process_pool() -> ProcessPoolExecutor:
+    """Returns a process pool shared by the parallel_* cases, so that
+    they do not time the start of the worker processes."""
+    return ProcessPoolExecutor(max_workers=2)
+
+
+@functools.cache
+def snapshot_dir() -> Path:
+    """Returns a temporary directory for the snapshots cases, removed
+    at exit."""
+    directory = tempfile.TemporaryDirectory(prefix="richset-bench-")
+    atexit.register(directory.cleanup)
+    return Path(directory.name)
+
+
+def saved(rs: RichSet[Any]) -> Path:
+    path = snapshot_dir() / f"{id(rs)}.snap"
+    rs.save(path)
+    return path
+
+
+# factories
+
+
+@case("factories.from_list")
+def from_list(_: RichSet[Any], fx: Fixture) -> object:
+    return RichSet.from_list(list(fx.records))
+
+
+@case("factories.from_tuple")
+def from_tuple(_: RichSet[Any], fx: Fixture) -> object:
+    return RichSet.from_tuple(fx.records)
+
+
+@case("factories.from_set")
+def from_set(_: RichSet[Any], fx: Fixture) -> object:
+    return RichSet.from_set(set(fx.records))
+
+
+@case("factories.from_frozenset")
+def from_frozenset(_: RichSet[Any], fx: Fixture) -> object:
+    return RichSet.from_frozenset(frozenset(fx.records))
+
+
+@case("factories.from_iterable")
+def from_iterable(_: RichSet[Any], fx: Fixture) -> object:
+    return RichSet.from_iterable(iter(fx.records))
+
+
+@case("factories.from_empty")
+def from_empty(_: RichSet[Any], __: Fixture) -> object:
+    return RichSet.from_empty()
+
+
+@case("factories.from_async_iterable")
+def from_async_iterable(_: RichSet[Any], fx: Fixture) -> object:
+    async def records() -> AsyncIterator[Any]:
+        for r in fx.records:
+            yield r
+
+    return asyncio.run(RichSet.from_async_iterable(records()))
+
+
+# conversions
+
+
+@case("conversions.to_list")
+def to_list(rs: RichSet[Any], _: Fixture) -> object:
+    return rs.to_list()
+
+
+@case("conversions.to_tuple")
+def to_tuple(rs: RichSet[Any], _: Fixture) -> object:
+    return rs.to_tuple()
+
+
+@case("conversions.to_set")
+def to_set(rs: RichSet[Any], _: Fixture) -> object:
+    return rs.to_set()
+
+
+@case("conversions.to_frozenset")
+def to_frozenset(rs: RichSet[Any], _: Fixture) -> object:
+    return rs.to_frozenset()
+
+
+@case("conversions.to_dict")
+def to_dict(rs: RichSet[Any], fx: Fixture) -> object:
+    return rs.to_dict(fx.key)
+
+
+@case("conversions.to_dict_of_list")
+def to_dict_of_list(rs: RichSet[Any], fx: Fixture) -> object:
+    return rs.to_dict_of_list(fx.group_key)
+
+
+@case("conversions.to_columnar", shapes=("dataclass",))
+def to_columnar(rs: RichSet[Any], _: Fixture) -> object:
+    return rs.to_columnar()
+
+
+@case("conversions.view")
+def view(rs: RichSet[Any], fx: Fixture) -> object:
+    return rs.view().slice(fx.size // 4, fx.size // 2).to_richset()
+
+
+@case("conversions.indexed_records")
+def indexed_records(rs: RichSet[Any], _: Fixture) -> object:
+    return list(rs.indexed_records(reverse=True))
+
+
+# accessors
+
+
+@case("accessors.first")
+def first(rs: RichSet[Any], _: Fixture) -> object:
+    return rs.first()
+
+
+@case("accessors.last")
+def last(rs: RichSet[Any], _: Fixture) -> object:
+    return rs.last()
+
+
+@case("accessors.nth")
+def nth(rs: RichSet[Any], fx: Fixture) -> object:
+    return rs.nth(fx.size // 2)
+
+
+@case("accessors.get_first")
+def get_first(rs: RichSet[Any], _: Fixture) -> object:
+    return rs.get_first()
+
+
+@case("accessors.get_last")
+def get_last(rs: RichSet[Any], _: Fixture) -> object:
+    return rs.get_last()
+
+
+@case("accessors.get_nth")
+def get_nth(rs: RichSet[Any], fx: Fixture) -> object:
+    return rs.get_nth(fx.size)
+
+
+@case("accessors.one")
+def one(rs: RichSet[Any], _: Fixture) -> object:
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", FutureWarning)
+        return rs.one()
+
+
+@case("accessors.get_one")
+def get_one(rs: RichSet[Any], _: Fixture) -> object:
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", FutureWarning)
+        return rs.get_one()
+
+
+# manipulations
+
+
+@case("manipulations.filter")
+def filter_(rs: RichSet[Any], fx: Fixture) -> object:
+    return rs.filter(lambda r: fx.key(r) % 2 == 0)
+
+
+@case("manipulations.map")
+def map_(rs: RichSet[Any], fx: Fixture) -> object:
+    return rs.map(fx.key)
+
+
+@case("manipulations.unique")
+def unique(rs: RichSet[Any], fx: Fixture) -> object:
+    return rs.unique(fx.group_key)
+
+
+@case("manipulations.reduce")
+def reduce(rs: RichSet[Any], fx: Fixture) -> object:
+    return rs.reduce(lambda a, r: a + fx.key(r), initial=0)
+
+
+@case("manipulations.slice")
+def slice_(rs: RichSet[Any], fx: Fixture) -> object:
+    return rs.slice(fx.size // 4, fx.size // 2)
+
+
+@case("manipulations.pushed")
+def pushed(rs: RichSet[Any], fx: Fixture) -> object:
+    return rs.pushed(fx.records[0])
+
+
+@case("manipulations.pushed_all")
+def pushed_all(rs: RichSet[Any], fx: Fixture) -> object:
+    return rs.pushed_all(fx.other[:100])
+
+
+@case("manipulations.unshifted")
+def unshifted(rs: RichSet[Any], fx: Fixture) -> object:
+    return rs.unshifted(fx.records[0])
+
+
+@case("manipulations.unshifted_all")
+def unshifted_all(rs: RichSet[Any], fx: Fixture) -> object:
+    return rs.unshifted_all(fx.other[:100])
+
+
+@case("manipulations.popped")
+def popped(rs: RichSet[Any], _: Fixture) -> object:
+    return rs.popped()
+
+
+@case("manipulations.popped_n")
+def popped_n(rs: RichSet[Any], fx: Fixture) -> object:
+    return rs.popped_n(fx.size // 2)
+
+
+@case("manipulations.shifted")
+def shifted(rs: RichSet[Any], _: Fixture) -> object:
+    return rs.shifted()
+
+
+@case("manipulations.shifted_n")
+def shifted_n(rs: RichSet[Any], fx: Fixture) -> object:
+    return rs.shifted_n(fx.size // 2)
+
+
+@case("manipulations.divide_at")
+def divide_at(rs: RichSet[Any], fx: Fixture) -> object:
+    return rs.divide_at(fx.size // 2)
+
+
+@case("manipulations.builder")
+def builder(rs: RichSet[Any], fx: Fixture) -> object:
+    b = rs.builder()
+    for r in fx.records[:100]:
+        b = b.pushed(r)
+    return b.build()
+
+
+@case("manipulations.lazy")
+def lazy(rs: RichSet[Any], fx: Fixture) -> object:
+    return rs.lazy().filter(lambda r: fx.key(r) % 2 == 0).map(fx.key).collect()
+
+
+# search
+
+
+@case("search.index_of", uses_hit_ratio=True)
+def index_of(rs: RichSet[Any], fx: Fixture) -> object:
+    return [rs.index_of(equals(fx.key, k)) for k in fx.probes]
+
+
+@case("search.contains", uses_hit_ratio=True)
+def contains(rs: RichSet[Any], fx: Fixture) -> object:
+    return [rs.contains(equals(fx.key, k)) for k in fx.probes]
+
+
+@case("search.search_first", uses_hit_ratio=True)
+def search_first(rs: RichSet[Any], fx: Fixture) -> object:
+    return [rs.search_first(equals(fx.key, k)) for k in fx.probes]
+
+
+@case("search.search_last", uses_hit_ratio=True)
+def search_last(rs: RichSet[Any], fx: Fixture) -> object:
+    return [rs.search_last(equals(fx.key, k)) for k in fx.probes]
+
+
+@case("search.indices_of", uses_hit_ratio=True)
+def indices_of(rs: RichSet[Any], fx: Fixture) -> object:
+    return [rs.indices_of(equals(fx.key, k)) for k in fx.probes]
+
+
+@case("search.search_all", uses_hit_ratio=True)
+def search_all(rs: RichSet[Any], fx: Fixture) -> object:
+    return [rs.search_all(equals(fx.key, k)) for k in fx.probes]
+
+
+@case("search.has", uses_hit_ratio=True)
+def has(rs: RichSet[Any], fx: Fixture) -> object:
+    return [rs.has(make_record(fx.shape, k)) for k in fx.probes]
+
+
+@case("search.index_by", uses_hit_ratio=True)
+def index_by(rs: RichSet[Any], fx: Fixture) -> object:
+    index = rs.index_by(fx.key)
+    return index.get_many(list(fx.probes))
+
+
+@case("search.index_by_cached", uses_hit_ratio=True, warm=True)
+def index_by_cached(rs: RichSet[Any], fx: Fixture) -> object:
+    return index_by(rs, fx)
+
+
+@case("search.sorted_index", uses_hit_ratio=True)
+def sorted_index(rs: RichSet[Any], fx: Fixture) -> object:
+    index = rs.sorted_index(fx.key)
+    return [index.floor(k) for k in fx.probes]
+
+
+@case("search.has_cached", uses_hit_ratio=True, warm=True)
+def has_cached(rs: RichSet[Any], fx: Fixture) -> object:
+    return has(rs, fx)
+
+
+# set operations
+
+
+@case("set_operations.union", uses_hit_ratio=True)
+def union(rs: RichSet[Any], fx: Fixture) -> object:
+    return rs.union(fx.other_richset())
+
+
+@case("set_operations.intersection", uses_hit_ratio=True)
+def intersection(rs: RichSet[Any], fx: Fixture) -> object:
+    return rs.intersection(fx.other_richset())
+
+
+@case("set_operations.difference", uses_hit_ratio=True)
+def difference(rs: RichSet[Any], fx: Fixture) -> object:
+    return rs.difference(fx.other_richset())
+
+
+@case("set_operations.symmetric_difference", uses_hit_ratio=True)
+def symmetric_difference(rs: RichSet[Any], fx: Fixture) -> object:
+    return rs.symmetric_difference(fx.other_richset())
+
+
+@case("set_operations.is_subset", uses_hit_ratio=True)
+def is_subset(rs: RichSet[Any], fx: Fixture) -> object:
+    return rs.is_subset(fx.other_richset())
+
+
+@case("set_operations.is_superset", uses_hit_ratio=True)
+def is_superset(rs: RichSet[Any], fx: Fixture) -> object:
+    return rs.is_superset(fx.other_richset())
+
+
+@case("set_operations.is_disjoint", uses_hit_ratio=True)
+def is_disjoint(rs: RichSet[Any], fx: Fixture) -> object:
+    return rs.is_disjoint(fx.other_richset())
+
+
+@case("set_operations.is_equal_as_set", uses_hit_ratio=True)
+def is_equal_as_set(rs: RichSet[Any], fx: Fixture) -> object:
+    return rs.is_equal_as_set(fx.other_richset())
+
+
+@case("set_operations.zip")
+def zip_(rs: RichSet[Any], fx: Fixture) -> object:
+    return rs.zip(fx.other_richset())
+
+
+@case("set_operations.zip_longest")
+def zip_longest(rs: RichSet[Any], fx: Fixture) -> object:
+    return rs.zip_longest(RichSet.from_tuple(fx.other[: fx.size // 2]))
+
+
+@case("set_operations.cartesian_product")
+def cartesian_product(rs: RichSet[Any], fx: Fixture) -> object:
+    # the product is quadratic: pair the records with 10 others only
+    return rs.cartesian_product(RichSet.from_tuple(fx.other[:10]))
+
+
+@case("set_operations.join", uses_hit_ratio=True)
+def join(rs: RichSet[Any], fx: Fixture) -> object:
+    return rs.join(fx.other_richset(), left_key=fx.key, right_key=fx.key)
+
+
+@case("set_operations.left_join", uses_hit_ratio=True)
+def left_join(rs: RichSet[Any], fx: Fixture) -> object:
+    other = fx.other_richset()
+    return rs.left_join(other, left_key=fx.key, right_key=fx.key)
+
+
+@case("set_operations.semi_join", uses_hit_ratio=True)
+def semi_join(rs: RichSet[Any], fx: Fixture) -> object:
+    other = fx.other_richset()
+    return rs.semi_join(other, left_key=fx.key, right_key=fx.key)
+
+
+@case("set_operations.anti_join", uses_hit_ratio=True)
+def anti_join(rs: RichSet[Any], fx: Fixture) -> object:
+    other = fx.other_richset()
+    return rs.anti_join(other, left_key=fx.key, right_key=fx.key)
+
+
+# sorting
+
+
+@case("sorting.sorted")
+def sorted_(rs: RichSet[Any], fx: Fixture) -> object:
+    return rs.sorted(key=fx.key)
+
+
+@case("sorting.sorted_reverse")
+def sorted_reverse(rs: RichSet[Any], fx: Fixture) -> object:
+    return rs.sorted(key=fx.key, reverse=True)
+
+
+@case("sorting.reversed")
+def reversed_(rs: RichSet[Any], _: Fixture) -> object:
+    return rs.reversed()
+
+
+@case("sorting.top_k")
+def top_k(rs: RichSet[Any], fx: Fixture) -> object:
+    return rs.top_k(20, key=fx.key)
+
+
+@case("sorting.bottom_k")
+def bottom_k(rs: RichSet[Any], fx: Fixture) -> object:
+    return rs.bottom_k(20, key=fx.key)
+
+
+# statistics
+
+
+@case("statistics.size")
+def size(rs: RichSet[Any], _: Fixture) -> object:
+    return rs.size()
+
+
+@case("statistics.is_empty")
+def is_empty(rs: RichSet[Any], _: Fixture) -> object:
+    return rs.is_empty()
+
+
+@case("statistics.is_non_empty")
+def is_non_empty(rs: RichSet[Any], _: Fixture) -> object:
+    return rs.is_non_empty()
+
+
+@case("statistics.count")
+def count(rs: RichSet[Any], fx: Fixture) -> object:
+    return rs.count(lambda r: fx.key(r) % 2 == 0)
+
+
+# grouping
+
+
+@case("grouping.group_by")
+def group_by(rs: RichSet[Any], fx: Fixture) -> object:
+    return rs.group_by(fx.group_key)
+
+
+@case("grouping.size_of_group_by")
+def size_of_group_by(rs: RichSet[Any], fx: Fixture) -> object:
+    return rs.size_of_group_by(fx.group_key)
+
+
+@case("grouping.count_of_group_by")
+def count_of_group_by(rs: RichSet[Any], fx: Fixture) -> object:
+    return rs.count_of_group_by(
+        key=fx.group_key,
+        predicate=lambda r: fx.key(r) % 2 == 0,
+    )
+
+
+@case("grouping.aggregate_by")
+def aggregate_by(rs: RichSet[Any], fx: Fixture) -> object:
+    return rs.aggregate_by(
+        key=fx.group_key,
+        fn=lambda a, r: a + fx.key(r),
+        initial=0,
+    )
+
+
+@case("grouping.sum_by")
+def sum_by(rs: RichSet[Any], fx: Fixture) -> object:
+    return rs.sum_by(key=fx.group_key, value=fx.key)
+
+
+@case("grouping.mean_by")
+def mean_by(rs: RichSet[Any], fx: Fixture) -> object:
+    return rs.mean_by(key=fx.group_key, value=fx.key)
+
+
+@case("grouping.min_by")
+def min_by(rs: RichSet[Any], fx: Fixture) -> object:
+    return rs.min_by(key=fx.group_key, value=fx.key)
+
+
+@case("grouping.max_by")
+def max_by(rs: RichSet[Any], fx: Fixture) -> object:
+    return rs.max_by(key=fx.group_key, value=fx.key)
+
+
+@case("grouping.top_k_by")
+def top_k_by(rs: RichSet[Any], fx: Fixture) -> object:
+    return rs.top_k_by(3, group_key=fx.group_key, key=fx.key)
+
+
+# paging
+
+
+@case("paging.page")
+def page(rs: RichSet[Any], fx: Fixture) -> object:
+    return rs.page(fx.size // 2, 100)
+
+
+@case("paging.split_into_pages")
+def split_into_pages(rs: RichSet[Any], _: Fixture) -> object:
+    return rs.split_into_pages(100)
+
+
+@case("paging.iter_pages")
+def iter_pages(rs: RichSet[Any], _: Fixture) -> object:
+    return sum(page.size() for page in rs.iter_pages(100))
+
+
+@case("paging.batched")
+def batched(rs: RichSet[Any], _: Fixture) -> object:
+    return sum(len(batch) for batch in rs.batched(100))
+
+
+@case("paging.page_after", warm=True)
+def page_after(rs: RichSet[Any], fx: Fixture) -> object:
+    return rs.page_after(fx.size // 2, 100, key=rs.sorted_index(fx.key))
+
+
+# parallel execution
+
+
+@case("parallel.parallel_map")
+def parallel_map(rs: RichSet[Any], fx: Fixture) -> object:
+    return rs.parallel_map(fx.key, executor=process_pool())
+
+
+@case("parallel.parallel_filter")
+def parallel_filter(rs: RichSet[Any], fx: Fixture) -> object:
+    predicate = functools.partial(is_even, fx.key)
+    return rs.parallel_filter(predicate, executor=process_pool())
+
+
+@case("parallel.parallel_count")
+def parallel_count(rs: RichSet[Any], fx: Fixture) -> object:
+    predicate = functools.partial(is_even, fx.key)
+    return rs.parallel_count(predicate, executor=process_pool())
+
+
+@case("parallel.parallel_indices_of")
+def parallel_indices_of(rs: RichSet[Any], fx: Fixture) -> object:
+    predicate = functools.partial(is_even, fx.key)
+    return rs.parallel_indices_of(predicate, executor=process_pool())
+
+
+@case("parallel.parallel_group_by")
+def parallel_group_by(rs: RichSet[Any], fx: Fixture) -> object:
+    key = functools.partial(group_of, fx.key)
+    return rs.parallel_group_by(key, executor=process_pool())
+
+
+@case("parallel.parallel_aggregate_by")
+def parallel_aggregate_by(rs: RichSet[Any], fx: Fixture) -> object:
+    return rs.parallel_aggregate_by(
+        key=functools.partial(group_of, fx.key),
+        fn=functools.partial(add_key, fx.key),
+        initial=0,
+        executor=process_pool(),
+    )
+
+
+# asynchronous execution
+
+
+@case("asynchronous.amap")
+def amap(rs: RichSet[Any], fx: Fixture) -> object:
+    async def f(r: Any) -> int:  # noqa: ANN401
+        return fx.key(r)
+
+    return asyncio.run(rs.amap(f))
+
+
+@case("asynchronous.afilter")
+def afilter(rs: RichSet[Any], fx: Fixture) -> object:
+    async def f(r: Any) -> bool:  # noqa: ANN401
+        return fx.key(r) % 2 == 0
+
+    return asyncio.run(rs.afilter(f))
+
+
+@case("asynchronous.aforeach")
+def aforeach(rs: RichSet[Any], fx: Fixture) -> object:
+    keys: list[int] = []
+
+    async def f(r: Any) -> None:  # noqa: ANN401
+        keys.append(fx.key(r))
+
+    asyncio.run(rs.aforeach(f))
+    return keys
+
+
+@case("asynchronous.agroup_by")
+def agroup_by(rs: RichSet[Any], fx: Fixture) -> object:
+    async def key(r: Any) -> int:  # noqa: ANN401
+        return fx.group_key(r)
+
+    return asyncio.run(rs.agroup_by(key))
+
+
+# snapshots
+
+
+@case("snapshots.save")
+def save(rs: RichSet[Any], _: Fixture) -> object:
+    path = saved(rs)
+    path.unlink()
+    return path
+
+
+@case("snapshots.load", warm=True)
+def load(rs: RichSet[Any], _: Fixture) -> object:
+    # the snapshot is written by the first, untimed run
+    path = rs._cached(("benchmark_snapshot",), lambda: saved(rs))
+    return RichSet.load(path)
+
+
+__all__ = [
+    "CASES",
+    "Case",
+    "case",
+]
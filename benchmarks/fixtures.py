@@ -0,0 +1,116 @@
+from __future__ import annotations
+
+import operator
+import random
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from typing import Any, Literal
+
+from richset import RichSet
+
+Shape = Literal["int", "tuple", "dataclass"]
+SHAPES: tuple[Shape, ...] = ("int", "tuple", "dataclass")
+
+# records fall into this many groups for group_by() and friends
+GROUPS = 100
+# search cases look up this many keys per run
+PROBES = 10
+
+
+@dataclass(frozen=True)
+class Record:
+    id: int
+    name: str
+
+
+def make_record(shape: Shape, i: int) -> Any:  # noqa: ANN401
+    """Returns the i-th record of the given shape."""
+    if shape == "int":
+        return i
+    if shape == "tuple":
+        return (i, f"name{i % GROUPS}")
+    return Record(i, f"name{i % GROUPS}")
+
+
+def key_of(shape: Shape) -> Callable[[Any], int]:
+    """Returns the function extracting the unique int key of a record."""
+    if shape == "int":
+        return int
+    if shape == "tuple":
+        return operator.itemgetter(0)
+    return operator.attrgetter("id")
+
+
+@dataclass(frozen=True)
+class Fixture:
+    """The input of a benchmark case.
+
+    records are the size records of the shape, in shuffled order. Of the
+    probes (keys to search for) and of the records of other (the right
+    side of set operations and joins), the hit_ratio fraction is found
+    in records and the rest is not."""
+
+    shape: Shape
+    size: int
+    hit_ratio: float
+    records: tuple[Any, ...]
+    other: tuple[Any, ...]
+    probes: tuple[int, ...]
+    key: Callable[[Any], int] = field(repr=False)
+
+    @classmethod
+    def build(
+        cls,
+        shape: Shape,
+        size: int,
+        hit_ratio: float,
+        *,
+        seed: int = 0,
+    ) -> Fixture:
+        rng = random.Random(seed)  # noqa: S311 (reproducible inputs)
+        ids = list(range(size))
+        rng.shuffle(ids)
+        records = tuple(make_record(shape, i) for i in ids)
+        hits = round(size * hit_ratio)
+        other = tuple(
+            make_record(shape, i if n < hits else size + i)
+            for n, i in enumerate(ids)
+        )
+        probe_hits = round(PROBES * hit_ratio)
+        probes = tuple(
+            rng.randrange(size) if n < probe_hits else size + n
+            for n in range(PROBES)
+        )
+        return cls(
+            shape,
+            size,
+            hit_ratio,
+            records,
+            other,
+            probes,
+            key_of(shape),
+        )
+
+    def richset(self) -> RichSet[Any]:
+        """Returns a new RichSet of the records, without cached indexes.
+
+        This does not copy the records."""
+        return RichSet.from_tuple(self.records)
+
+    def other_richset(self) -> RichSet[Any]:
+        return RichSet.from_tuple(self.other)
+
+    def group_key(self, record: Any) -> int:  # noqa: ANN401
+        return self.key(record) % GROUPS
+
+
+__all__ = [
+    "GROUPS",
+    "PROBES",
+    "SHAPES",
+    "Fixture",
+    "Record",
+    "Shape",
+    "key_of",
+    "make_record",
+]
@@ -0,0 +1,248 @@
+from __future__ import annotations
+
+import gc
+import itertools
+import json
+import platform
+import time
+import tracemalloc
+from collections.abc import Iterable, Iterator, Sequence
+from dataclasses import asdict, dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any
+
+import richset
+
+from .cases import Case
+from .fixtures import Fixture, Shape
+
+# a measurement repeats a case until it has run for at least this long
+DEFAULT_MIN_TIME = 0.2
+# a result is flagged if it is this much slower (or uses this much more
+# memory) than the same result of a previous run
+DEFAULT_THRESHOLD = 0.1
+# smaller growths of the peak memory are never flagged, as noise
+MIN_MEMORY_GROWTH = 1024
+
+
+@dataclass(frozen=True)
+class Result:
+    case: str
+    shape: str
+    size: int
+    hit_ratio: float
+    number: int
+    seconds: float
+    peak_bytes: int
+
+    @property
+    def ops_per_sec(self) -> float:
+        return self.number / self.seconds if self.seconds else float("inf")
+
+    @property
+    def id(self) -> tuple[str, str, int, float]:
+        return (self.case, self.shape, self.size, self.hit_ratio)
+
+    def to_json(self) -> dict[str, Any]:
+        return {**asdict(self), "ops_per_sec": self.ops_per_sec}
+
+
+@dataclass(frozen=True)
+class Regression:
+    before: Result
+    after: Result
+    metric: str
+    ratio: float
+
+    def __str__(self) -> str:
+        case, shape, size, hit_ratio = self.after.id
+        return (
+            f"{case} [{shape}, size={size}, hit_ratio={hit_ratio}]: "
+            f"{self.metric} x{self.ratio:.2f}"
+        )
+
+
+def time_case(case: Case, fixture: Fixture, number: int) -> float:
+    """Returns the seconds taken by number runs of the case."""
+    if case.warm:
+        rs = fixture.richset()
+        case.run(rs, fixture)
+        inputs = [rs] * number
+    else:
+        inputs = [fixture.richset() for _ in range(number)]
+    gc.collect()
+    start = time.perf_counter()
+    for rs in inputs:
+        case.run(rs, fixture)
+    return time.perf_counter() - start
+
+
+def autorange(
+    case: Case,
+    fixture: Fixture,
+    min_time: float,
+) -> tuple[int, float]:
+    """Returns (number, seconds) for a number of runs, doubled from 1,
+    that takes at least min_time, like timeit.Timer.autorange."""
+    number = 1
+    while True:
+        seconds = time_case(case, fixture, number)
+        if seconds >= min_time:
+            return number, seconds
+        number *= 2
+
+
+def peak_memory(case: Case, fixture: Fixture) -> int:
+    """Returns the peak bytes allocated during one run of the case."""
+    rs = fixture.richset()
+    if case.warm:
+        case.run(rs, fixture)
+    gc.collect()
+    tracemalloc.start()
+    try:
+        case.run(rs, fixture)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def measure(case: Case, fixture: Fixture, min_time: float) -> Result:
+    number, seconds = autorange(case, fixture, min_time)
+    return Result(
+        case=case.name,
+        shape=fixture.shape,
+        size=fixture.size,
+        hit_ratio=fixture.hit_ratio,
+        number=number,
+        seconds=seconds,
+        peak_bytes=peak_memory(case, fixture),
+    )
+
+
+def run(
+    cases: Sequence[Case],
+    *,
+    sizes: Iterable[int],
+    shapes: Iterable[Shape],
+    hit_ratios: Sequence[float],
+    min_time: float = DEFAULT_MIN_TIME,
+) -> Iterator[Result]:
+    """Yields the results of the cases for every size, shape and hit
+    ratio, as they are measured."""
+    for size, shape, (i, hit_ratio) in itertools.product(
+        sizes,
+        shapes,
+        enumerate(hit_ratios),
+    ):
+        fixture = Fixture.build(shape, size, hit_ratio)
+        for case in cases:
+            if case.measured_at(shape, first_hit_ratio=i == 0):
+                yield measure(case, fixture, min_time)
+
+
+def selected(name: str, pattern: str) -> bool:
+    return name == pattern or name.startswith(pattern + ".")
+
+
+def select(cases: Iterable[Case], patterns: Sequence[str]) -> list[Case]:
+    """Returns the cases whose name is a pattern or starts with
+    a pattern and ".", or all cases if there are no patterns."""
+    return [
+        case
+        for case in cases
+        if not patterns or any(selected(case.name, p) for p in patterns)
+    ]
+
+
+# reports
+
+
+def environment() -> dict[str, str]:
+    return {
+        "richset": richset.__version__,
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "created_at": datetime.now(timezone.utc).isoformat(),
+    }
+
+
+def save(path: Path, results: Iterable[Result]) -> None:
+    """Writes the results, with the environment, as JSON."""
+    report = {
+        "environment": environment(),
+        "results": [result.to_json() for result in results],
+    }
+    path.write_text(json.dumps(report, indent=2) + "\n")
+
+
+def load(path: Path) -> list[Result]:
+    """Returns the results saved by save()."""
+    fields = Result.__dataclass_fields__
+    return [
+        Result(**{k: v for k, v in result.items() if k in fields})
+        for result in json.loads(path.read_text())["results"]
+    ]
+
+
+def regressions(
+    before: Iterable[Result],
+    after: Iterable[Result],
+    *,
+    threshold: float = DEFAULT_THRESHOLD,
+) -> list[Regression]:
+    """Returns the results of after that are slower, or use more memory,
+    than the same results of before by more than threshold."""
+    previous = {result.id: result for result in before}
+    found: list[Regression] = []
+    for result in after:
+        old = previous.get(result.id)
+        if old is not None:
+            found.extend(compare(old, result, threshold))
+    return found
+
+
+def compare(
+    before: Result,
+    after: Result,
+    threshold: float,
+) -> Iterator[Regression]:
+    slowdown = before.ops_per_sec / after.ops_per_sec
+    if slowdown > 1 + threshold:
+        yield Regression(before, after, "time", slowdown)
+    if after.peak_bytes - before.peak_bytes < MIN_MEMORY_GROWTH:
+        return
+    growth = after.peak_bytes / max(before.peak_bytes, 1)
+    if growth > 1 + threshold:
+        yield Regression(before, after, "peak memory", growth)
+
+
+def format_result(result: Result) -> str:
+    return (
+        f"{result.case:<40} {result.shape:<9} {result.size:>10} "
+        f"{result.hit_ratio:>5.2f} {result.ops_per_sec:>14.1f} "
+        f"{result.peak_bytes:>14}"
+    )
+
+
+HEADER = (
+    f"{'case':<40} {'shape':<9} {'size':>10} {'hit':>5} "
+    f"{'ops/s':>14} {'peak bytes':>14}"
+)
+
+
+__all__ = [
+    "DEFAULT_MIN_TIME",
+    "DEFAULT_THRESHOLD",
+    "HEADER",
+    "Regression",
+    "Result",
+    "format_result",
+    "load",
+    "measure",
+    "regressions",
+    "run",
+    "save",
+    "select",
+]
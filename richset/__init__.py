@@ -1,9 +1,56 @@
+from ._builder import RichSetBuilder
+from ._columnar import ColumnarRichSet
+from ._expr import Expr, F
+from ._index import KeyIndex, SortedIndex
+from ._instrumentation import (
+    CallRecord,
+    Instrumentation,
+    MethodSummary,
+    add_hook,
+    remove_hook,
+)
+from ._lazy import LazyRichSet
+from ._mapped import Codec, MappedRichSet, PickleCodec, StructCodec
+from ._parallel import ParallelMode
 from ._richset import OnDuplicateActions, RichSet, duplicate_value_selector
+from ._shared import SharedRichSet
+from ._tracing import (
+    InMemoryExporter,
+    JsonLinesExporter,
+    Span,
+    SpanExporter,
+    Tracer,
+)
 from ._version import __version__
+from ._view import RichSetView
 
 __all__ = [
+    "CallRecord",
+    "Codec",
+    "ColumnarRichSet",
+    "Expr",
+    "F",
+    "InMemoryExporter",
+    "Instrumentation",
+    "JsonLinesExporter",
+    "KeyIndex",
+    "LazyRichSet",
+    "MappedRichSet",
+    "MethodSummary",
     "OnDuplicateActions",
+    "ParallelMode",
+    "PickleCodec",
     "RichSet",
+    "RichSetBuilder",
+    "RichSetView",
+    "SharedRichSet",
+    "SortedIndex",
+    "Span",
+    "SpanExporter",
+    "StructCodec",
+    "Tracer",
     "__version__",
+    "add_hook",
     "duplicate_value_selector",
+    "remove_hook",
 ]
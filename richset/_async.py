@@ -0,0 +1,52 @@
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Awaitable, Callable, Sequence
+from typing import Any, TypeVar, cast
+
+T = TypeVar("T")
+S = TypeVar("S")
+
+
+async def _gather_or_cancel(tasks: list[asyncio.Future[None]]) -> None:
+    try:
+        await asyncio.gather(*tasks)
+    except BaseException:
+        for task in tasks:
+            task.cancel()
+        raise
+
+
+async def bounded_map(
+    f: Callable[[T], Awaitable[S]],
+    records: Sequence[T],
+    *,
+    concurrency: int | None = None,
+) -> list[S]:
+    """Returns [await f(r) for r in records], awaiting concurrently.
+
+    At most concurrency calls are in flight at a time (unbounded if None):
+    that many worker tasks take the next record as soon as they are free.
+    The order of the results follows the order of the records. If a call
+    raises, the other workers are cancelled and the error propagates."""
+    if concurrency is not None and concurrency <= 0:
+        raise ValueError(
+            f"concurrency must be a positive integer, got {concurrency}",
+        )
+    results: list[Any] = [None] * len(records)
+    pending = iter(range(len(records)))
+
+    async def worker() -> None:
+        for i in pending:
+            results[i] = await f(records[i])
+
+    size = min(concurrency or len(records), len(records))
+    await _gather_or_cancel(
+        [asyncio.ensure_future(worker()) for _ in range(size)],
+    )
+    return cast(list[S], results)
+
+
+__all__ = [
+    "bounded_map",
+]
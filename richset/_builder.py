@@ -0,0 +1,92 @@
+from __future__ import annotations
+
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass, field
+from typing import Generic, TypeVar
+
+from ._richset import RichSet
+
+T = TypeVar("T")
+
+# an immutable singly linked list: (value, rest) or None
+_Node = tuple[T, "_Node[T]"] | None
+
+
+def _cons_all(node: _Node[T], records: Iterable[T]) -> tuple[_Node[T], int]:
+    count = 0
+    for r in records:
+        node = (r, node)
+        count += 1
+    return node, count
+
+
+def _walk(node: _Node[T]) -> Iterator[T]:
+    while node is not None:
+        value, node = node
+        yield value
+
+
+@dataclass(frozen=True, eq=False)
+class RichSetBuilder(Generic[T]):
+    """A persistent accumulator for building a RichSet record by record.
+
+    pushed() and unshifted() are O(1) and share structure with the
+    previous builder, which stays valid. build() materializes the
+    RichSet in a single O(n) pass."""
+
+    base: tuple[T, ...] = ()
+    # unshifted records, first record at the head
+    front: _Node[T] = field(default=None, repr=False)
+    # pushed records, last record at the head
+    back: _Node[T] = field(default=None, repr=False)
+    extra: int = 0
+
+    def pushed(self, record: T) -> RichSetBuilder[T]:
+        """Returns a new builder with the given record pushed to the end."""
+        return RichSetBuilder(
+            self.base,
+            self.front,
+            (record, self.back),
+            self.extra + 1,
+        )
+
+    def pushed_all(self, records: Iterable[T]) -> RichSetBuilder[T]:
+        """Returns a new builder with the given records pushed to the end."""
+        back, count = _cons_all(self.back, records)
+        return RichSetBuilder(self.base, self.front, back, self.extra + count)
+
+    def unshifted(self, record: T) -> RichSetBuilder[T]:
+        """Returns a new builder with the given record \
+unshifted to the beginning."""
+        return RichSetBuilder(
+            self.base,
+            (record, self.front),
+            self.back,
+            self.extra + 1,
+        )
+
+    def unshifted_all(self, records: Iterable[T]) -> RichSetBuilder[T]:
+        """Returns a new builder with the given records \
+unshifted to the beginning."""
+        front, count = _cons_all(self.front, reversed(tuple(records)))
+        return RichSetBuilder(self.base, front, self.back, self.extra + count)
+
+    def size(self) -> int:
+        """Returns the number of records the built RichSet will have."""
+        return len(self.base) + self.extra
+
+    def __len__(self) -> int:
+        return self.size()
+
+    def build(self) -> RichSet[T]:
+        """Returns a new RichSet with the accumulated records."""
+        back = list(_walk(self.back))
+        back.reverse()
+        return RichSet.from_tuple(
+            (*_walk(self.front), *self.base, *back),
+        )
+
+
+__all__ = [
+    "RichSetBuilder",
+]
@@ -0,0 +1,413 @@
+from __future__ import annotations
+
+import array
+import dataclasses
+import functools
+import os
+from collections.abc import Callable, Hashable, Iterable, Iterator, Sequence
+from dataclasses import dataclass
+from typing import Any, Generic, TypeAlias, TypeVar, overload
+
+from . import _numpy
+from ._expr import field_comparison, field_name
+from ._numpy import COMPARE_OPS, CompareOp, Indices
+from ._richset import RichSet
+from .comparable import Comparable
+
+T = TypeVar("T")
+S = TypeVar("S")
+Key = TypeVar("Key", bound=Hashable)
+
+# a column holds the values of one field for all records; int and float
+# columns loaded from a memory-mapped snapshot are memoryviews of the file
+Column: TypeAlias = "array.array[Any] | memoryview | list[Any]"
+
+
+def compact_column(values: list[Any]) -> Column:
+    """Returns the values as a compact array if they are all ints
+    (that fit in 64 bits) or all floats, otherwise as the list itself."""
+    if values and all(type(v) is int for v in values):
+        try:
+            return array.array("q", values)
+        except OverflowError:
+            return values
+    if values and all(type(v) is float for v in values):
+        return array.array("d", values)
+    return values
+
+
+def typecode(column: Column) -> str | None:
+    """Returns the array typecode of an int or float column,
+    or None for a list."""
+    if isinstance(column, list):
+        return None
+    return memoryview(column).format
+
+
+def take(column: Column, indices: Indices) -> Column:
+    """Returns a column of the same kind with the values at the indices.
+
+    Memoryview columns are taken into new arrays."""
+    taken = _numpy.take(column, indices)
+    if taken is not None:
+        return taken
+    values = [column[i] for i in indices]
+    code = typecode(column)
+    if code is not None:
+        return array.array(code, values)
+    return values
+
+
+def field_names(record_type: type[Any]) -> tuple[str, ...]:
+    """Returns the field names of a dataclass that can be stored
+    column by column (see record_builder)."""
+    if not dataclasses.is_dataclass(record_type):
+        raise TypeError(f"not a dataclass: {record_type}")
+    return tuple(f.name for f in dataclasses.fields(record_type))
+
+
+def build_record(
+    record_type: type[T],
+    names: tuple[str, ...],
+    *values: Any,  # noqa: ANN401
+) -> T:
+    record = object.__new__(record_type)
+    record.__dict__.update(zip(names, values, strict=True))
+    return record
+
+
+def build_slotted_record(
+    record_type: type[T],
+    names: tuple[str, ...],
+    *values: Any,  # noqa: ANN401
+) -> T:
+    record = object.__new__(record_type)
+    for name, value in zip(names, values, strict=True):
+        object.__setattr__(record, name, value)
+    return record
+
+
+def record_builder(record_type: type[T]) -> Callable[..., T]:
+    """Returns a function that rebuilds a record of the dataclass from
+    the values of its fields, in field order.
+
+    __init__ (and __post_init__) is not called, so records come back
+    with the values they were stored with, whatever __init__ does with
+    its arguments, and keyword-only or init=False fields are set too."""
+    names = field_names(record_type)
+    if record_type.__dictoffset__:
+        return functools.partial(build_record, record_type, names)
+    return functools.partial(build_slotted_record, record_type, names)
+
+
+def check_record_type(records: Iterable[Any], record_type: type[Any]) -> None:
+    """Raises TypeError unless all records are exactly record_type."""
+    for r in records:
+        if type(r) is not record_type:
+            raise TypeError(f"record is not a {record_type}: {r}")
+
+
+@dataclass(frozen=True, eq=False)
+class ColumnarRichSet(Generic[T]):
+    """A RichSet of dataclass records stored column by column.
+
+    Each field is stored as one column: an array.array (or a memoryview,
+    see load()) for int and float fields, a list otherwise. Records are
+    rebuilt on iteration, and operations that take a field name as key
+    read the column directly without building records."""
+
+    record_type: type[T]
+    columns: dict[str, Column]
+    length: int
+
+    # factory classmethods
+
+    @classmethod
+    def from_iterable(
+        cls,
+        itr: Iterable[T],
+        *,
+        record_type: type[T] | None = None,
+    ) -> ColumnarRichSet[T]:
+        """Returns a new ColumnarRichSet from an iterable of dataclasses.
+
+        All records must be instances of the same dataclass. record_type
+        is required if the iterable may be empty."""
+        records = list(itr)
+        if record_type is None:
+            if not records:
+                raise ValueError("record_type is required for no records")
+            record_type = type(records[0])
+        names = field_names(record_type)
+        check_record_type(records, record_type)
+        columns = {
+            name: compact_column([getattr(r, name) for r in records])
+            for name in names
+        }
+        return cls(record_type, columns, len(records))
+
+    @classmethod
+    def from_richset(
+        cls,
+        richset: RichSet[T],
+        *,
+        record_type: type[T] | None = None,
+    ) -> ColumnarRichSet[T]:
+        """Returns a new ColumnarRichSet from a RichSet of dataclasses."""
+        return cls.from_iterable(richset.records, record_type=record_type)
+
+    @classmethod
+    def load(
+        cls,
+        path: str | os.PathLike[str],
+        *,
+        mmap: bool = False,
+    ) -> ColumnarRichSet[Any]:
+        """Returns a new ColumnarRichSet from a snapshot file of
+        dataclass records, saved by save() or RichSet.save().
+
+        With mmap, the int and float columns are memoryviews of the
+        memory-mapped file: nothing is read until it is accessed, and
+        processes loading the same file share its pages. Snapshots are
+        pickles: only load files you trust."""
+        from ._snapshot import load_columns
+
+        return load_columns(path, mmap=mmap)
+
+    def _take(self, indices: Indices) -> ColumnarRichSet[T]:
+        columns = {
+            name: take(column, indices)
+            for name, column in self.columns.items()
+        }
+        return ColumnarRichSet(self.record_type, columns, len(indices))
+
+    def _key_values(self, key: str | Callable[[T], Any]) -> Sequence[Any]:
+        name = key if isinstance(key, str) else field_name(key)
+        if name is not None:
+            return self.column(name)
+        return [key(r) for r in self]  # type: ignore[operator]
+
+    def _ndarray(self, key: str | Callable[[T], Any]) -> Any:  # noqa: ANN401
+        """Returns the column named by key as an ndarray, or None if
+        key is a function or the column cannot be vectorized."""
+        name = key if isinstance(key, str) else field_name(key)
+        if name is not None:
+            return _numpy.as_ndarray(self.column(name))
+        return None
+
+    def _group_positions(
+        self,
+        key: str | Callable[[T], Any],
+    ) -> Iterable[tuple[Any, Indices]]:
+        values = self._ndarray(key)
+        if values is not None:
+            return _numpy.group_indices(values)
+        groups: dict[Any, list[int]] = {}
+        for i, k in enumerate(self._key_values(key)):
+            groups.setdefault(k, []).append(i)
+        return groups.items()
+
+    def _where(
+        self,
+        field: str,
+        op: CompareOp,
+        value: object,
+    ) -> Indices:
+        values = self._ndarray(field)
+        if values is not None:
+            indices = _numpy.matching_indices(values, op, value)
+            if indices is not None:
+                return indices
+        compare = COMPARE_OPS[op]
+        return [
+            i for i, v in enumerate(self.column(field)) if compare(v, value)
+        ]
+
+    # magic methods
+
+    def __iter__(self) -> Iterator[T]:
+        build = record_builder(self.record_type)
+        if not self.columns:
+            return (build() for _ in range(self.length))
+        return (
+            build(*values)
+            for values in zip(*self.columns.values(), strict=True)
+        )
+
+    def __len__(self) -> int:
+        return self.size()
+
+    # conversions
+
+    def to_richset(self) -> RichSet[T]:
+        """Returns a RichSet of the records."""
+        return RichSet.from_iterable(self)
+
+    def to_list(self) -> list[T]:
+        """Returns a list of records."""
+        return list(self)
+
+    def to_tuple(self) -> tuple[T, ...]:
+        """Returns a tuple of records."""
+        return tuple(self)
+
+    def save(self, path: str | os.PathLike[str]) -> None:
+        """Writes the records to a binary snapshot file, with the int
+        and float columns as raw arrays. See load()."""
+        from ._snapshot import encode_columns, write
+
+        write(path, encode_columns(self))
+
+    def column(self, name: str) -> Column:
+        """Returns the column of the given field. Do not modify it."""
+        if name not in self.columns:
+            raise KeyError(f"no such field: {name}")
+        return self.columns[name]
+
+    # list accessors
+
+    def nth(self, index: int) -> T:
+        """Returns the record at the given index."""
+        if 0 <= index < self.size():
+            return record_builder(self.record_type)(
+                *(column[index] for column in self.columns.values()),
+            )
+        raise IndexError("index out of range")
+
+    # list manipulations
+
+    def filter(self, f: Callable[[T], bool]) -> ColumnarRichSet[T]:
+        """Returns a new ColumnarRichSet with filtered records.
+
+        A field comparison such as F.price > 10 reads the column only,
+        like filter_where()."""
+        where = field_comparison(f)
+        if where is not None:
+            return self.filter_where(*where)
+        return self._take([i for i, r in enumerate(self) if f(r)])
+
+    def filter_where(
+        self,
+        field: str,
+        op: CompareOp,
+        value: object,
+    ) -> ColumnarRichSet[T]:
+        """Returns a new ColumnarRichSet with the records \
+whose field compares to value with op, e.g. filter_where("price", ">", 10).
+
+        This reads the column only and is vectorized with numpy."""
+        return self._take(self._where(field, op, value))
+
+    # sorting
+
+    def sorted(
+        self,
+        *,
+        key: str | Callable[[T], Comparable[S]],
+        reverse: bool = False,
+    ) -> ColumnarRichSet[T]:
+        """Returns a new ColumnarRichSet sorted by the given key.
+
+        key is a field name, a field expression such as F.price,
+        or a function of the record. The sort is stable, like
+        RichSet.sorted(). It is vectorized with numpy for int and float
+        fields."""
+        values = self._ndarray(key)
+        if values is not None:
+            return self._take(_numpy.argsort(values, reverse=reverse))
+        values = self._key_values(key)
+        order = sorted(
+            range(self.length),
+            key=values.__getitem__,
+            reverse=reverse,
+        )
+        return self._take(order)
+
+    # statistics
+
+    def is_empty(self) -> bool:
+        """Returns True if the ColumnarRichSet is empty."""
+        return self.length == 0
+
+    def size(self) -> int:
+        """Returns the number of records in the ColumnarRichSet."""
+        return self.length
+
+    def count(self, predicate: Callable[[T], bool]) -> int:
+        """Returns the number of records satisfying the predicate.
+
+        See filter for field comparisons."""
+        where = field_comparison(predicate)
+        if where is not None:
+            return self.count_where(*where)
+        return sum(1 for r in self if predicate(r))
+
+    def count_where(self, field: str, op: CompareOp, value: object) -> int:
+        """Returns the number of records whose field compares to value
+        with op. See filter_where."""
+        return len(self._where(field, op, value))
+
+    # groupings
+
+    @overload
+    def group_by(self, key: str) -> dict[Any, ColumnarRichSet[T]]: ...
+
+    @overload
+    def group_by(
+        self,
+        key: Callable[[T], Key],
+    ) -> dict[Key, ColumnarRichSet[T]]: ...
+
+    def group_by(
+        self,
+        key: str | Callable[[T], Key],
+    ) -> dict[Any, ColumnarRichSet[T]]:
+        """Returns a dict of ColumnarRichSets grouped by the given key.
+
+        key is a field name, a field expression or a function of the
+        record. Grouping by an int or float field is vectorized with
+        numpy."""
+        return {k: self._take(v) for k, v in self._group_positions(key)}
+
+    @overload
+    def size_of_group_by(self, key: str) -> dict[Any, int]: ...
+
+    @overload
+    def size_of_group_by(self, key: Callable[[T], Key]) -> dict[Key, int]: ...
+
+    def size_of_group_by(
+        self,
+        key: str | Callable[[T], Key],
+    ) -> dict[Any, int]:
+        """Returns a dict of sizes of groups by the given key.
+
+        See group_by for the meaning of key."""
+        values = self._ndarray(key)
+        if values is not None:
+            return _numpy.group_sizes(values)
+        return {k: len(v) for k, v in self._group_positions(key)}
+
+    def aggregate_by(
+        self,
+        *,
+        key: str | Callable[[T], Key],
+        fn: Callable[[S, T], S],
+        initial: S,
+    ) -> dict[Any, S]:
+        """Returns a dict of aggregated values grouped by the given key.
+
+        See group_by for the meaning of key."""
+        return {
+            k: functools.reduce(fn, self._take(v), initial)
+            for k, v in self._group_positions(key)
+        }
+
+
+__all__ = [
+    "Column",
+    "ColumnarRichSet",
+    "compact_column",
+    "field_names",
+    "record_builder",
+    "typecode",
+]
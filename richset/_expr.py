@@ -0,0 +1,323 @@
+from __future__ import annotations
+
+import operator
+from collections.abc import Callable, Hashable, Iterable
+from typing import Any, cast
+
+from ._numpy import COMPARE_OPS, CompareOp
+
+
+def const_identity(value: object) -> Hashable:
+    """Returns a hashable identity for a constant in an expression."""
+    try:
+        hash(value)
+    except TypeError:
+        return ("const_id", id(value))
+    return ("const", type(value).__qualname__, value)
+
+
+class Expr:
+    """A declarative key or predicate, such as F.price > 10.
+
+    An Expr is callable with a record, so it can be passed anywhere a key
+    function or predicate is accepted. Unlike a lambda it can be inspected,
+    and two expressions built the same way have the same identity, so
+    cached indexes can be matched and reused.
+
+    ==, !=, <, <=, > and >= build comparisons; &, | and ~ combine
+    predicates. Expressions have no truth value, so use & instead of
+    `and`."""
+
+    identity: Hashable
+
+    def __call__(self, record: Any) -> Any:  # noqa: ANN401
+        raise NotImplementedError  # pragma: no cover
+
+    def __bool__(self) -> bool:
+        raise TypeError(
+            f"{self!r} has no truth value; use &, | and ~ to combine",
+        )
+
+    def _compare(self, op: CompareOp, other: object) -> Compare:
+        return Compare(op, self, as_expr(other))
+
+    def __eq__(self, other: object) -> Compare:  # type: ignore[override]
+        return self._compare("==", other)
+
+    def __ne__(self, other: object) -> Compare:  # type: ignore[override]
+        return self._compare("!=", other)
+
+    def __lt__(self, other: object) -> Compare:
+        return self._compare("<", other)
+
+    def __le__(self, other: object) -> Compare:
+        return self._compare("<=", other)
+
+    def __gt__(self, other: object) -> Compare:
+        return self._compare(">", other)
+
+    def __ge__(self, other: object) -> Compare:
+        return self._compare(">=", other)
+
+    __hash__ = None  # type: ignore[assignment]
+
+    def __and__(self, other: Expr) -> And:
+        return And(self, other)
+
+    def __or__(self, other: Expr) -> Or:
+        return Or(self, other)
+
+    def __invert__(self) -> Not:
+        return Not(self)
+
+    def startswith(self, prefix: str) -> MethodCall:
+        """Returns an expression for str.startswith on the value."""
+        return MethodCall("startswith", self, (prefix,))
+
+    def endswith(self, suffix: str) -> MethodCall:
+        """Returns an expression for str.endswith on the value."""
+        return MethodCall("endswith", self, (suffix,))
+
+    def is_in(self, values: Iterable[Hashable]) -> IsIn:
+        """Returns an expression that is True if the value is in values."""
+        return IsIn(self, frozenset(values))
+
+
+def as_expr(value: object) -> Expr:
+    """Returns value itself if it is an Expr, otherwise a Const."""
+    if isinstance(value, Expr):
+        return value
+    return Const(value)
+
+
+class Field(Expr):
+    """The value of a (possibly nested) attribute of the record."""
+
+    def __init__(self, path: tuple[str, ...]) -> None:
+        self.path = path
+        self.identity = ("field", path)
+        self._get = operator.attrgetter(".".join(path))
+
+    def __call__(self, record: Any) -> Any:  # noqa: ANN401
+        return self._get(record)
+
+    def __getattr__(self, name: str) -> Field:
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return Field((*self.path, name))
+
+    def __repr__(self) -> str:
+        return "F." + ".".join(self.path)
+
+
+class Const(Expr):
+    """A constant value."""
+
+    def __init__(self, value: object) -> None:
+        self.value = value
+        self.identity = const_identity(value)
+
+    def __call__(self, record: Any) -> object:  # noqa: ANN401, ARG002
+        return self.value
+
+    def __repr__(self) -> str:
+        return repr(self.value)
+
+
+class Compare(Expr):
+    """A comparison of two expressions."""
+
+    def __init__(self, op: CompareOp, left: Expr, right: Expr) -> None:
+        self.op = op
+        self.left = left
+        self.right = right
+        self.identity = ("compare", op, left.identity, right.identity)
+        self._apply = COMPARE_OPS[op]
+
+    def __call__(self, record: Any) -> Any:  # noqa: ANN401
+        return self._apply(self.left(record), self.right(record))
+
+    def __repr__(self) -> str:
+        return f"({self.left!r} {self.op} {self.right!r})"
+
+
+class And(Expr):
+    """True if both predicates are true."""
+
+    def __init__(self, left: Expr, right: Expr) -> None:
+        self.left = left
+        self.right = right
+        self.identity = ("and", left.identity, right.identity)
+
+    def __call__(self, record: Any) -> bool:  # noqa: ANN401
+        return bool(self.left(record)) and bool(self.right(record))
+
+    def __repr__(self) -> str:
+        return f"({self.left!r} & {self.right!r})"
+
+
+class Or(Expr):
+    """True if either predicate is true."""
+
+    def __init__(self, left: Expr, right: Expr) -> None:
+        self.left = left
+        self.right = right
+        self.identity = ("or", left.identity, right.identity)
+
+    def __call__(self, record: Any) -> bool:  # noqa: ANN401
+        return bool(self.left(record)) or bool(self.right(record))
+
+    def __repr__(self) -> str:
+        return f"({self.left!r} | {self.right!r})"
+
+
+class Not(Expr):
+    """True if the predicate is false."""
+
+    def __init__(self, operand: Expr) -> None:
+        self.operand = operand
+        self.identity = ("not", operand.identity)
+
+    def __call__(self, record: Any) -> bool:  # noqa: ANN401
+        return not self.operand(record)
+
+    def __repr__(self) -> str:
+        return f"~{self.operand!r}"
+
+
+class MethodCall(Expr):
+    """A method called on the value of an expression."""
+
+    def __init__(
+        self,
+        method: str,
+        target: Expr,
+        args: tuple[Hashable, ...],
+    ) -> None:
+        self.method = method
+        self.target = target
+        self.args = args
+        self.identity = ("call", method, target.identity, args)
+        self._call: Callable[..., Any] = operator.methodcaller(method, *args)
+
+    def __call__(self, record: Any) -> Any:  # noqa: ANN401
+        return self._call(self.target(record))
+
+    def __repr__(self) -> str:
+        args = ", ".join(map(repr, self.args))
+        return f"{self.target!r}.{self.method}({args})"
+
+
+class IsIn(Expr):
+    """True if the value of an expression is one of the given values."""
+
+    def __init__(self, target: Expr, values: frozenset[Hashable]) -> None:
+        self.target = target
+        self.values = values
+        self.identity = ("is_in", target.identity, values)
+
+    def __call__(self, record: Any) -> bool:  # noqa: ANN401
+        return self.target(record) in self.values
+
+    def __repr__(self) -> str:
+        return f"{self.target!r}.is_in({set(self.values)!r})"
+
+
+class Composite(Expr):
+    """A tuple of the values of several expressions, for composite keys."""
+
+    def __init__(self, items: tuple[Expr, ...]) -> None:
+        self.items = items
+        self.identity = ("composite", tuple(i.identity for i in items))
+
+    def __call__(self, record: Any) -> tuple[Any, ...]:  # noqa: ANN401
+        return tuple(item(record) for item in self.items)
+
+    def __repr__(self) -> str:
+        return "F(" + ", ".join(map(repr, self.items)) + ")"
+
+
+class FieldFactory:
+    """Builds expressions: F.id is the id field of the record,
+    F.a.b a nested field and F(F.a, F.b) a composite key."""
+
+    def __getattr__(self, name: str) -> Field:
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return Field((name,))
+
+    def __call__(self, *items: Expr) -> Composite:
+        return Composite(items)
+
+    def __repr__(self) -> str:
+        return "F"
+
+
+F = FieldFactory()
+
+
+def key_identity(key: object) -> Hashable:
+    """Returns the identity under which derived data for a key is cached.
+
+    Expressions are matched by structure, other callables by identity."""
+    if isinstance(key, Expr):
+        return ("expr", key.identity)
+    return key
+
+
+def cacheable(key: object) -> bool:
+    """Returns True if derived data for key is worth caching: key is an
+    expression or a named function. A lambda is usually written inline
+    and is a new object on every call, so caching by it would only keep
+    one more copy per call."""
+    if isinstance(key, Expr):
+        return True
+    return getattr(key, "__name__", "<lambda>") != "<lambda>"
+
+
+def field_name(key: object) -> str | None:
+    """Returns the field name if key is a top-level field expression
+    or an operator.attrgetter of one top-level attribute."""
+    if isinstance(key, Field) and len(key.path) == 1:
+        return key.path[0]
+    if isinstance(key, operator.attrgetter):
+        return attrgetter_name(key)
+    return None
+
+
+def attrgetter_name(key: operator.attrgetter[Any]) -> str | None:
+    _, names = cast("tuple[Any, tuple[str, ...]]", key.__reduce__())
+    if len(names) == 1 and "." not in names[0]:
+        return names[0]
+    return None
+
+
+def field_comparison(key: object) -> tuple[str, CompareOp, object] | None:
+    """Returns (field, op, value) if key compares a top-level field
+    to a constant, such as F.price > 10."""
+    if not isinstance(key, Compare) or not isinstance(key.right, Const):
+        return None
+    name = field_name(key.left)
+    if name is None:
+        return None
+    return name, key.op, key.right.value
+
+
+__all__ = [
+    "And",
+    "Compare",
+    "Composite",
+    "Const",
+    "Expr",
+    "F",
+    "Field",
+    "FieldFactory",
+    "IsIn",
+    "MethodCall",
+    "Not",
+    "Or",
+    "cacheable",
+    "field_comparison",
+    "field_name",
+    "key_identity",
+]
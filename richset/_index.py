@@ -0,0 +1,207 @@
+from __future__ import annotations
+
+import bisect
+import dataclasses
+from collections.abc import Callable, Hashable, Iterable, Iterator, KeysView
+from dataclasses import dataclass
+from typing import Any, Generic, TypeVar, overload
+
+from ._join import ordered_key_types, totally_ordered
+from ._richset import RichSet
+from .comparable import Comparable
+
+T = TypeVar("T")
+S = TypeVar("S")
+Key = TypeVar("Key", bound=Hashable)
+
+
+@dataclass(frozen=True)
+class KeyIndex(Generic[Key, T]):
+    """A hash index of records by key.
+
+    Build it with RichSet.index_by(); lookups are O(1) per key."""
+
+    groups: dict[Key, RichSet[T]]
+
+    @classmethod
+    def build(
+        cls,
+        richset: RichSet[T],
+        key: Callable[[T], Key],
+    ) -> KeyIndex[Key, T]:
+        """Returns a new KeyIndex of the records of the RichSet."""
+        return cls(richset.group_by(key))
+
+    def __len__(self) -> int:
+        return len(self.groups)
+
+    def keys(self) -> KeysView[Key]:
+        """Returns the distinct keys in the index."""
+        return self.groups.keys()
+
+    @overload
+    def get(self, k: Key) -> T | None: ...
+
+    @overload
+    def get(self, k: Key, default: S) -> T | S: ...
+
+    def get(self, k: Key, default: S | None = None) -> T | S | None:
+        """Returns the first record with the given key
+        or default value (None) if there is no such record."""
+        if k in self.groups:
+            return self.groups[k].first()
+        return default
+
+    def get_all(self, k: Key) -> RichSet[T]:
+        """Returns a RichSet of all records with the given key.
+
+        The records keep their original order."""
+        if k in self.groups:
+            return self.groups[k]
+        return RichSet.from_empty()
+
+    def get_many(self, keys: Iterable[Key]) -> list[T | None]:
+        """Returns the first record for each of the given keys.
+
+        None is returned in place of keys that are not in the index."""
+        return [self.get(k) for k in keys]
+
+    def contains_key(self, k: Key) -> bool:
+        """Returns True if any record has the given key."""
+        return k in self.groups
+
+
+@dataclass(frozen=True)
+class SortedIndex(Generic[T]):
+    """Records sorted by key, with the extracted key column kept alongside.
+
+    Build it with RichSet.sorted_index(). Range queries bisect the key
+    column in O(log n) and return a narrowed SortedIndex that shares
+    the same storage, so they can be chained and paged without copying
+    the whole range."""
+
+    keys: list[Any]
+    records: tuple[T, ...]
+    start: int
+    stop: int
+    # positions of the records in the source RichSet
+    positions: list[int] = dataclasses.field(default_factory=list, repr=False)
+    # the group of _join.ORDERED_KEY_TYPES of the keys, None if the keys
+    # are not totally ordered and bisecting them may miss records
+    key_types: frozenset[type] | None = dataclasses.field(
+        default=None,
+        repr=False,
+    )
+
+    @classmethod
+    def build(
+        cls,
+        richset: RichSet[T],
+        key: Callable[[T], Comparable[Any]],
+    ) -> SortedIndex[T]:
+        """Returns a new SortedIndex of the records of the RichSet.
+
+        The sort is stable, like RichSet.sorted()."""
+        keys = [key(r) for r in richset.records]
+        order = sorted(range(len(keys)), key=keys.__getitem__)
+        return cls(
+            keys=[keys[i] for i in order],
+            records=tuple(richset.records[i] for i in order),
+            start=0,
+            stop=len(order),
+            positions=order,
+            key_types=ordered_key_types(keys),
+        )
+
+    def _narrowed(self, start: int, stop: int) -> SortedIndex[T]:
+        return dataclasses.replace(self, start=start, stop=max(start, stop))
+
+    def _left(self, x: object) -> int:
+        return bisect.bisect_left(self.keys, x, self.start, self.stop)
+
+    def _right(self, x: object) -> int:
+        return bisect.bisect_right(self.keys, x, self.start, self.stop)
+
+    def bisectable(self, x: object) -> bool:
+        """Returns True if the range queries for x find exactly the records
+        whose key compares to x that way: the keys and x are all of one
+        totally ordered group of types and none is NaN."""
+        if self.key_types is None or type(x) not in self.key_types:
+            return False
+        return totally_ordered([x])
+
+    # magic methods
+
+    def __iter__(self) -> Iterator[T]:
+        return iter(self.records[self.start : self.stop])
+
+    def __len__(self) -> int:
+        return self.stop - self.start
+
+    # conversions
+
+    def to_richset(self) -> RichSet[T]:
+        """Returns a RichSet of the records in key order."""
+        return RichSet.from_tuple(self.records[self.start : self.stop])
+
+    def to_list(self) -> list[T]:
+        """Returns a list of the records in key order."""
+        return list(self)
+
+    # range queries
+
+    def between(self, lo: object, hi: object) -> SortedIndex[T]:
+        """Returns the records whose key satisfies lo <= key <= hi."""
+        return self._narrowed(self._left(lo), self._right(hi))
+
+    def less_than(self, x: object) -> SortedIndex[T]:
+        """Returns the records whose key is less than x."""
+        return self._narrowed(self.start, self._left(x))
+
+    def less_equal(self, x: object) -> SortedIndex[T]:
+        """Returns the records whose key is less than or equal to x."""
+        return self._narrowed(self.start, self._right(x))
+
+    def greater_than(self, x: object) -> SortedIndex[T]:
+        """Returns the records whose key is greater than x."""
+        return self._narrowed(self._right(x), self.stop)
+
+    def greater_equal(self, x: object) -> SortedIndex[T]:
+        """Returns the records whose key is greater than or equal to x."""
+        return self._narrowed(self._left(x), self.stop)
+
+    def floor(self, x: object) -> T | None:
+        """Returns the last record with the greatest key <= x
+        or None if there is no such record."""
+        index = self._right(x) - 1
+        if index < self.start:
+            return None
+        return self.records[index]
+
+    def ceil(self, x: object) -> T | None:
+        """Returns the first record with the smallest key >= x
+        or None if there is no such record."""
+        index = self._left(x)
+        if index >= self.stop:
+            return None
+        return self.records[index]
+
+    # paging
+
+    def page(self, offset: int, limit: int) -> RichSet[T]:
+        """Returns a new RichSet with the records in the given page.
+
+        Only the records of the page are copied. See RichSet.page."""
+        if offset < 0:
+            raise ValueError(f"offset must be non-negative, got {offset}")
+        if limit < 0:
+            raise ValueError(f"limit must be non-negative, got {limit}")
+        start = self.start + offset
+        stop = min(start + limit, self.stop)
+        return RichSet.from_tuple(self.records[start:stop])
+
+
+__all__ = [
+    "KeyIndex",
+    "SortedIndex",
+]
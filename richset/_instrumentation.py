@@ -0,0 +1,472 @@
+from __future__ import annotations
+
+import functools
+import inspect
+import itertools
+import threading
+import time
+import tracemalloc
+from collections.abc import Callable, Sized
+from contextvars import ContextVar
+from dataclasses import dataclass
+from types import TracebackType
+from typing import Any, ParamSpec, TypeVar, cast, overload
+
+from ._expr import Expr
+
+P = ParamSpec("P")
+R = TypeVar("R")
+
+# Instrumentation is opt-in: the class keeps the plain methods decorated
+# with @instrumented while no hook is added, so calls cost nothing extra.
+# Adding the first hook installs a wrapper in place of each method, which
+# measures each call and passes its CallRecord to every hook; removing the
+# last hook puts the plain methods back. Methods looked up before the
+# first hook is added (such as a bound method kept in a variable) are not
+# instrumented.
+#
+# Key and predicate calls are counted by wrapping the arguments of the
+# parameters annotated as functions (Callable), such as key and predicate;
+# other arguments are passed as is, even if they are callable, since they
+# may be records. Expressions and classes are passed through unwrapped,
+# as are all arguments of methods that cache by key (such as index_by())
+# or pickle their functions, where a wrapper would defeat the cache.
+
+
+@dataclass(frozen=True)
+class CallRecord:
+    """The measurements of one call of a RichSet method.
+
+    output_size is len() of the result, if it has one. key_calls is the
+    number of calls of the function arguments, or None if they are not
+    counted. allocated_bytes is the traced memory above that at the start
+    of the call, or None unless tracemalloc is tracing: at its peak during
+    the call if the call raised the peak traced memory, otherwise at the
+    end of the call. The peak is never reset, so that it can still be
+    measured around the call.
+    depth is 0 for a call made outside of any other RichSet method.
+    parent_id is the call_id of the innermost call or tracing span in
+    progress when the call started, if any. start_ns is time.time_ns()
+    at the start of the call. error is the exception raised by the call,
+    as its type name and message, or None if the call returned; the
+    output_size of a failed call is None."""
+
+    method: str
+    seconds: float
+    input_size: int
+    output_size: int | None
+    key_calls: int | None
+    allocated_bytes: int | None
+    depth: int
+    call_id: int
+    parent_id: int | None
+    start_ns: int
+    error: str | None = None
+
+    @property
+    def end_ns(self) -> int:
+        return self.start_ns + round(self.seconds * 1e9)
+
+
+Hook = Callable[[CallRecord], object]
+
+
+@dataclass(frozen=True)
+class InstrumentedMethod:
+    """A method decorated with @instrumented and its wrapper."""
+
+    owner: type
+    name: str
+    method: Callable[..., object]
+    wrapper: Callable[..., object]
+
+    def install(self, active: bool) -> None:
+        """Puts the wrapper in the class if active, else the method."""
+        setattr(self.owner, self.name, self.wrapper if active else self.method)
+
+
+class HookRegistry:
+    """The hooks receiving the CallRecord of each instrumented call.
+
+    The wrappers of the instrumented methods are installed only while
+    there is at least one hook."""
+
+    def __init__(self) -> None:
+        self.hooks: tuple[Hook, ...] = ()
+        self.active = False
+        self.methods: list[InstrumentedMethod] = []
+        self._lock = threading.Lock()
+
+    def register(self, method: InstrumentedMethod) -> None:
+        with self._lock:
+            self.methods.append(method)
+            method.install(self.active)
+
+    def add(self, hook: Hook) -> None:
+        with self._lock:
+            self.hooks = (*self.hooks, hook)
+            self._activate(True)
+
+    def remove(self, hook: Hook) -> None:
+        """Removes the hook, which must have been added."""
+        with self._lock:
+            i = self.hooks.index(hook)
+            self.hooks = self.hooks[:i] + self.hooks[i + 1 :]
+            self._activate(bool(self.hooks))
+
+    def _activate(self, active: bool) -> None:
+        if active == self.active:
+            return
+        self.active = active
+        for method in self.methods:
+            method.install(active)
+
+    def emit(self, record: CallRecord) -> None:
+        for hook in self.hooks:
+            hook(record)
+
+
+hooks = HookRegistry()
+
+# the number of instrumented calls in progress in the current context
+_depth: ContextVar[int] = ContextVar("richset_call_depth", default=0)
+# the id of the innermost call or tracing span in progress
+current_parent_id: ContextVar[int | None] = ContextVar(
+    "richset_parent_id",
+    default=None,
+)
+_ids = itertools.count(1)
+
+
+def new_id() -> int:
+    """Returns a new id for a call or a tracing span."""
+    return next(_ids)
+
+
+def add_hook(hook: Hook) -> None:
+    """Calls hook with the CallRecord of every RichSet method call
+    until it is removed."""
+    hooks.add(hook)
+
+
+def remove_hook(hook: Hook) -> None:
+    hooks.remove(hook)
+
+
+POSITIONAL = (
+    inspect.Parameter.POSITIONAL_ONLY,
+    inspect.Parameter.POSITIONAL_OR_KEYWORD,
+)
+
+
+@dataclass(frozen=True)
+class FunctionParameters:
+    """The parameters of a method annotated as functions, by position
+    (for those that can be passed positionally) and by name."""
+
+    positions: frozenset[int]
+    names: frozenset[str]
+
+    @classmethod
+    @functools.cache
+    def of(cls, method: Callable[..., object]) -> FunctionParameters:
+        parameters = inspect.signature(method).parameters.values()
+        functions = [
+            (i, p)
+            for i, p in enumerate(parameters)
+            if "Callable[" in str(p.annotation)
+        ]
+        return cls(
+            frozenset(i for i, p in functions if p.kind in POSITIONAL),
+            frozenset(p.name for _, p in functions),
+        )
+
+
+class KeyCallCounter:
+    def __init__(self) -> None:
+        self.calls = 0
+
+    def wrap(self, arg: object) -> object:
+        """Returns arg, wrapped to count its calls if it is a function."""
+        if not callable(arg) or isinstance(arg, (type, Expr)):
+            return arg
+        f = arg
+
+        def counted(*args: Any, **kwargs: Any) -> Any:  # noqa: ANN401
+            self.calls += 1
+            return f(*args, **kwargs)
+
+        return counted
+
+    def wrap_functions(
+        self,
+        method: Callable[..., object],
+        args: tuple[Any, ...],
+        kwargs: dict[str, Any],
+    ) -> tuple[tuple[Any, ...], dict[str, Any]]:
+        """Returns args and kwargs with the arguments of the function
+        parameters of the method wrapped."""
+        functions = FunctionParameters.of(method)
+        args = tuple(
+            self.wrap(a) if i in functions.positions else a
+            for i, a in enumerate(args)
+        )
+        kwargs = {
+            k: self.wrap(v) if k in functions.names else v
+            for k, v in kwargs.items()
+        }
+        return args, kwargs
+
+
+class Measurement:
+    """Measures one call, from its creation to finish()."""
+
+    def __init__(self) -> None:
+        self.traced = tracemalloc.is_tracing()
+        if self.traced:
+            self.start_bytes, self.start_peak = tracemalloc.get_traced_memory()
+        self.start_ns = time.time_ns()
+        self.start = time.perf_counter()
+
+    def finish(self) -> tuple[float, int | None]:
+        """Returns the seconds and allocated bytes since the start."""
+        seconds = time.perf_counter() - self.start
+        if not self.traced:
+            return seconds, None
+        current, peak = tracemalloc.get_traced_memory()
+        reached = peak if peak > self.start_peak else current
+        return seconds, reached - self.start_bytes
+
+
+def error_text(error: BaseException) -> str:
+    """Returns the type name of the error, with its message if any."""
+    message = str(error)
+    name = type(error).__name__
+    return f"{name}: {message}" if message else name
+
+
+def size_of(result: object) -> int | None:
+    return len(result) if isinstance(result, Sized) else None
+
+
+def observe(
+    name: str,
+    method: Callable[..., R],
+    counter: KeyCallCounter | None,
+    args: tuple[Any, ...],
+    kwargs: dict[str, Any],
+) -> R:
+    """Calls the method, then emits its CallRecord to the hooks,
+    whether the call returns or raises."""
+    if counter is not None:
+        args, kwargs = counter.wrap_functions(method, args, kwargs)
+    depth = _depth.get()
+    parent_id = current_parent_id.get()
+    call_id = new_id()
+    depth_token = _depth.set(depth + 1)
+    parent_token = current_parent_id.set(call_id)
+    output_size: int | None = None
+    error: str | None = None
+    measurement = Measurement()
+    try:
+        result = method(*args, **kwargs)
+        output_size = size_of(result)
+    except BaseException as e:
+        error = error_text(e)
+        raise
+    finally:
+        _depth.reset(depth_token)
+        current_parent_id.reset(parent_token)
+        seconds, allocated_bytes = measurement.finish()
+        hooks.emit(
+            CallRecord(
+                method=name,
+                seconds=seconds,
+                input_size=len(args[0]),
+                output_size=output_size,
+                key_calls=None if counter is None else counter.calls,
+                allocated_bytes=allocated_bytes,
+                depth=depth,
+                call_id=call_id,
+                parent_id=parent_id,
+                start_ns=measurement.start_ns,
+                error=error,
+            ),
+        )
+    return result
+
+
+@overload
+def instrumented(method: Callable[P, R]) -> Callable[P, R]: ...
+
+
+@overload
+def instrumented(
+    *,
+    count_key_calls: bool = True,
+) -> Callable[[Callable[P, R]], Callable[P, R]]: ...
+
+
+def instrumented(
+    method: Callable[P, R] | None = None,
+    *,
+    count_key_calls: bool = True,
+) -> Callable[P, R] | Callable[[Callable[P, R]], Callable[P, R]]:
+    """Decorates a RichSet method to report its calls to the hooks.
+
+    The class gets the plain method back when it is created; the wrapper
+    is installed in its place while a hook is added."""
+
+    def decorate(method: Callable[P, R]) -> Callable[P, R]:
+        name = method.__name__
+
+        @functools.wraps(method)
+        def wrapper(*args: P.args, **kwargs: P.kwargs) -> R:
+            # a call that looked up the wrapper just before the last
+            # hook was removed
+            if not hooks.active:
+                return method(*args, **kwargs)
+            counter = KeyCallCounter() if count_key_calls else None
+            return observe(name, method, counter, args, kwargs)
+
+        return cast("Callable[P, R]", Registration(method, wrapper))
+
+    return decorate if method is None else decorate(method)
+
+
+class Registration:
+    """Stands for an instrumented method in a class body until the class
+    is created, then registers the method with the hooks."""
+
+    def __init__(
+        self,
+        method: Callable[..., object],
+        wrapper: Callable[..., object],
+    ) -> None:
+        self.method = method
+        self.wrapper = wrapper
+
+    def __set_name__(self, owner: type, name: str) -> None:
+        hooks.register(
+            InstrumentedMethod(owner, name, self.method, self.wrapper),
+        )
+
+
+# summaries
+
+
+@dataclass(frozen=True)
+class MethodSummary:
+    """The totals of the calls of one method."""
+
+    method: str
+    calls: int
+    seconds: float
+    max_seconds: float
+    input_size: int
+    output_size: int
+    key_calls: int
+    allocated_bytes: int | None
+
+    @property
+    def mean_seconds(self) -> float:
+        return self.seconds / self.calls
+
+
+def summarize(method: str, calls: list[CallRecord]) -> MethodSummary:
+    allocated = [
+        c.allocated_bytes for c in calls if c.allocated_bytes is not None
+    ]
+    return MethodSummary(
+        method=method,
+        calls=len(calls),
+        seconds=sum(c.seconds for c in calls),
+        max_seconds=max(c.seconds for c in calls),
+        input_size=sum(c.input_size for c in calls),
+        output_size=sum(c.output_size or 0 for c in calls),
+        key_calls=sum(c.key_calls or 0 for c in calls),
+        allocated_bytes=max(allocated) if allocated else None,
+    )
+
+
+def format_summary(summary: MethodSummary) -> str:
+    allocated = summary.allocated_bytes
+    allocated_text = "-" if allocated is None else str(allocated)
+    return (
+        f"{summary.method:<24} {summary.calls:>8} {summary.seconds:>12.6f} "
+        f"{summary.mean_seconds:>12.6f} {summary.max_seconds:>12.6f} "
+        f"{summary.input_size:>12} {summary.output_size:>12} "
+        f"{summary.key_calls:>12} {allocated_text:>12}"
+    )
+
+
+SUMMARY_HEADER = (
+    f"{'method':<24} {'calls':>8} {'total s':>12} {'mean s':>12} "
+    f"{'max s':>12} {'input':>12} {'output':>12} {'key calls':>12} "
+    f"{'peak bytes':>12}"
+)
+
+
+class Instrumentation:
+    """Collects the CallRecords of RichSet method calls while entered.
+
+    Only the calls made outside of other RichSet methods are collected,
+    unless nested. Each collected record is also passed to callback."""
+
+    def __init__(
+        self,
+        callback: Hook | None = None,
+        *,
+        nested: bool = False,
+    ) -> None:
+        self.callback = callback
+        self.nested = nested
+        self.calls: list[CallRecord] = []
+
+    def __call__(self, record: CallRecord) -> None:
+        if record.depth and not self.nested:
+            return
+        self.calls.append(record)
+        if self.callback is not None:
+            self.callback(record)
+
+    def __enter__(self) -> Instrumentation:
+        add_hook(self)
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        remove_hook(self)
+
+    def summary(self) -> list[MethodSummary]:
+        """Returns the totals of the collected calls by method,
+        the most time consuming first."""
+        by_method: dict[str, list[CallRecord]] = {}
+        for call in self.calls:
+            by_method.setdefault(call.method, []).append(call)
+        summaries = [summarize(m, calls) for m, calls in by_method.items()]
+        return sorted(summaries, key=lambda s: s.seconds, reverse=True)
+
+    def summary_table(self) -> str:
+        """Returns summary() as a text table."""
+        lines = [SUMMARY_HEADER, *map(format_summary, self.summary())]
+        return "\n".join(lines)
+
+
+__all__ = [
+    "CallRecord",
+    "Hook",
+    "HookRegistry",
+    "Instrumentation",
+    "MethodSummary",
+    "add_hook",
+    "current_parent_id",
+    "hooks",
+    "instrumented",
+    "new_id",
+    "remove_hook",
+]
@@ -0,0 +1,208 @@
+from __future__ import annotations
+
+import itertools
+import math
+import operator
+from collections.abc import Callable, Hashable, Iterable, Iterator, Sequence
+from typing import Any, Generic, TypeVar
+
+T = TypeVar("T")
+S = TypeVar("S")
+Key = TypeVar("Key", bound=Hashable)
+
+# Joins pair each left record with the right records of equal key. Every
+# join below is built on a generator of (left, matching rights) in left
+# order, produced by one of two strategies, with the key of each record
+# computed once:
+#
+# - a merge join, if the keys are ints and floats, strs or bytes (whose
+#   values are totally ordered, so that sorted runs of equal keys find
+#   the same matches as a hash table) and the records of both sides are
+#   already sorted by their keys: both sides are walked once, holding
+#   only the current run of equal right keys. Sortedness is checked with
+#   a pass over the keys that stops at the first key out of order.
+# - a hash join otherwise, with the hash table built on the smaller side.
+#   If the left side is smaller, the right side is scanned once and only
+#   the right records matching a left key are kept.
+
+# groups of key types that are mutually comparable and totally ordered
+# (floats only without NaN, see totally_ordered)
+ORDERED_KEY_TYPES: tuple[frozenset[type], ...] = (
+    frozenset({int, float}),
+    frozenset({str}),
+    frozenset({bytes}),
+)
+
+
+def ordered_key_types(keys: Sequence[Any]) -> frozenset[type] | None:
+    """Returns the group of ORDERED_KEY_TYPES that the keys are all of
+    (exactly, not subclasses) or None if there is no such group or a key
+    is NaN."""
+    types = set(map(type, keys))
+    group = next((g for g in ORDERED_KEY_TYPES if types <= g), None)
+    floats = (k for k in keys if type(k) is float)
+    if group is None or any(map(math.isnan, floats)):
+        return None
+    return group
+
+
+def totally_ordered(keys: Sequence[Any]) -> bool:
+    """Returns True if the keys are all of one group of ORDERED_KEY_TYPES
+    (exactly, not subclasses) and none is NaN."""
+    return ordered_key_types(keys) is not None
+
+
+def is_sorted(keys: Iterable[Any]) -> bool:
+    """Returns True if the keys are in ascending order."""
+    return all(not b < a for a, b in itertools.pairwise(keys))
+
+
+def mergeable(left_keys: Sequence[Key], right_keys: Sequence[Key]) -> bool:
+    """Returns True if a merge join of the keys is possible and finds
+    the same matches as a hash join."""
+    if not totally_ordered([*left_keys, *right_keys]):
+        return False
+    try:
+        return is_sorted(left_keys) and is_sorted(right_keys)
+    except TypeError:  # keys that cannot be ordered after all
+        return False
+
+
+class RunCursor(Generic[S, Key]):
+    """Walks the runs of equal keys of records sorted by key."""
+
+    def __init__(self, records: Iterable[S], keys: Iterable[Key]) -> None:
+        self.runs = itertools.groupby(
+            zip(keys, records, strict=True),
+            key=operator.itemgetter(0),
+        )
+        self.run: tuple[Key, list[S]] | None = None
+        self.advance()
+
+    def advance(self) -> None:
+        run = next(self.runs, None)
+        self.run = None if run is None else (run[0], [r for _, r in run[1]])
+
+    def matches(self, k: Key) -> list[S]:
+        """Returns the records with key k. Successive calls must be
+        made with ascending keys."""
+        while self.run is not None and self.run[0] < k:  # type: ignore[operator]
+            self.advance()
+        if self.run is None or self.run[0] != k:
+            return []
+        return self.run[1]
+
+
+def merge_matches(
+    left: Sequence[T],
+    right: Sequence[S],
+    left_keys: Sequence[Key],
+    right_keys: Sequence[Key],
+) -> Iterator[tuple[T, list[S]]]:
+    cursor = RunCursor(right, right_keys)
+    for r, k in zip(left, left_keys, strict=True):
+        yield r, cursor.matches(k)
+
+
+def hash_table(
+    right: Sequence[S],
+    left_keys: Sequence[Key],
+    right_keys: Sequence[Key],
+) -> dict[Key, list[S]]:
+    """Returns the right records by key, keeping only keys of the left
+    side if it is the smaller one."""
+    table: dict[Key, list[S]] = {}
+    if len(right_keys) <= len(left_keys):
+        for r, k in zip(right, right_keys, strict=True):
+            table.setdefault(k, []).append(r)
+        return table
+    table = {k: [] for k in left_keys}
+    for r, k in zip(right, right_keys, strict=True):
+        table.get(k, []).append(r)
+    return table
+
+
+def hash_matches(
+    left: Sequence[T],
+    right: Sequence[S],
+    left_keys: Sequence[Key],
+    right_keys: Sequence[Key],
+) -> Iterator[tuple[T, list[S]]]:
+    table = hash_table(right, left_keys, right_keys)
+    for r, k in zip(left, left_keys, strict=True):
+        yield r, table.get(k, [])
+
+
+def matches(
+    left: Sequence[T],
+    right: Sequence[S],
+    left_key: Callable[[T], Key],
+    right_key: Callable[[S], Key],
+) -> Iterator[tuple[T, list[S]]]:
+    """Yields each left record with its matching right records,
+    in the order of the left records and then the right records."""
+    left_keys = [left_key(r) for r in left]
+    right_keys = [right_key(r) for r in right]
+    if mergeable(left_keys, right_keys):
+        return merge_matches(left, right, left_keys, right_keys)
+    return hash_matches(left, right, left_keys, right_keys)
+
+
+def inner_join(
+    left: Sequence[T],
+    right: Sequence[S],
+    left_key: Callable[[T], Key],
+    right_key: Callable[[S], Key],
+) -> Iterator[tuple[T, S]]:
+    for r, rights in matches(left, right, left_key, right_key):
+        for s in rights:
+            yield r, s
+
+
+def left_outer_join(
+    left: Sequence[T],
+    right: Sequence[S],
+    left_key: Callable[[T], Key],
+    right_key: Callable[[S], Key],
+) -> Iterator[tuple[T, S | None]]:
+    for r, rights in matches(left, right, left_key, right_key):
+        if not rights:
+            yield r, None
+        for s in rights:
+            yield r, s
+
+
+def matched(
+    left: Sequence[T],
+    right: Sequence[S],
+    left_key: Callable[[T], Key],
+    right_key: Callable[[S], Key],
+    *,
+    keep: bool,
+) -> Iterator[T]:
+    """Yields the left records that have (or, unless keep, have not)
+    a matching right record."""
+    for r, rights in matches(left, right, left_key, right_key):
+        if bool(rights) is keep:
+            yield r
+
+
+def product(
+    left: Iterable[T],
+    right: Sequence[S],
+    where: Callable[[T, S], bool] | None = None,
+) -> Iterator[tuple[T, S]]:
+    """Yields the pairs of the cartesian product in order, skipping
+    those for which where(left, right) is false without building them."""
+    if where is None:
+        return itertools.product(left, right)
+    return ((a, b) for a in left for b in right if where(a, b))
+
+
+__all__ = [
+    "inner_join",
+    "left_outer_join",
+    "matched",
+    "matches",
+    "product",
+]
@@ -0,0 +1,184 @@
+from __future__ import annotations
+
+from collections.abc import Callable, Hashable, Iterator
+from dataclasses import dataclass
+from typing import Any, Generic, TypeVar, overload
+
+from ._planner import (
+    Filter,
+    Map,
+    Operation,
+    Page,
+    Plan,
+    Product,
+    Reversed,
+    Sorted,
+    Unique,
+    Zip,
+    ZipLongest,
+    plan,
+)
+from ._richset import OnDuplicateActions, RichSet
+from .comparable import Comparable
+
+T = TypeVar("T")
+S = TypeVar("S")
+Key = TypeVar("Key", bound=Hashable)
+Fill = TypeVar("Fill")
+
+
+@dataclass(frozen=True)
+class LazyRichSet(Generic[T]):
+    """A deferred chain of operations over a RichSet.
+
+    Operations are only recorded. When the result is iterated or
+    collected, a planner rewrites them into an equivalent but cheaper
+    plan, which runs fused in a single pass where possible; explain()
+    shows that plan. Keys and predicates are assumed to be pure."""
+
+    source: RichSet[Any]
+    operations: tuple[Operation, ...] = ()
+
+    def _then(self, operation: Operation) -> LazyRichSet[Any]:
+        return LazyRichSet(self.source, (*self.operations, operation))
+
+    def _plan(self) -> Plan:
+        return plan(self.source, self.operations)
+
+    # magic methods
+
+    def __iter__(self) -> Iterator[T]:
+        return self._plan().run()
+
+    # list functional manipulations
+
+    def filter(self, f: Callable[[T], bool]) -> LazyRichSet[T]:
+        """Returns a new LazyRichSet with a filter step appended."""
+        return self._then(Filter((f,)))
+
+    def unique(self, key: Callable[[T], Key]) -> LazyRichSet[T]:
+        """Returns a new LazyRichSet with a unique step appended.
+
+        Like RichSet.unique, the first occurrence of each key is kept."""
+        return self._then(Unique(key))
+
+    def map(self, f: Callable[[T], S]) -> LazyRichSet[S]:
+        """Returns a new LazyRichSet with a map step appended.
+
+        Filters are not moved across map steps, so filter first where
+        possible."""
+        return self._then(Map(f))
+
+    # set operations
+
+    def cartesian_product(
+        self,
+        other: RichSet[S],
+        *,
+        where: Callable[[T, S], bool] | None = None,
+    ) -> LazyRichSet[tuple[T, S]]:
+        """Returns a new LazyRichSet with a cartesian product step appended.
+
+        The pairs are generated one at a time, and with where only the
+        pairs satisfying where(r1, r2) are built; see
+        RichSet.cartesian_product."""
+        return self._then(Product(other.records, where))
+
+    def zip(self, other: RichSet[S]) -> LazyRichSet[tuple[T, S]]:
+        """Returns a new LazyRichSet with a zip step appended.
+
+        Like RichSet.zip, a ValueError is raised when the lengths turn
+        out to differ."""
+        return self._then(Zip(other.records))
+
+    @overload
+    def zip_longest(
+        self,
+        other: RichSet[S],
+        *,
+        fillvalue: Fill,
+    ) -> LazyRichSet[tuple[T | Fill, S | Fill]]: ...
+
+    @overload
+    def zip_longest(
+        self,
+        other: RichSet[S],
+    ) -> LazyRichSet[tuple[T | None, S | None]]: ...
+
+    def zip_longest(
+        self,
+        other: RichSet[S],
+        *,
+        fillvalue: Fill | None = None,
+    ) -> LazyRichSet[tuple[T | Fill, S | Fill]]:
+        """Returns a new LazyRichSet with a zip_longest step appended."""
+        return self._then(ZipLongest(other.records, fillvalue))
+
+    # sorting
+
+    def sorted(
+        self,
+        *,
+        key: Callable[[T], Comparable[S]],
+        reverse: bool = False,
+    ) -> LazyRichSet[T]:
+        """Returns a new LazyRichSet with a sort step appended.
+
+        The sort is stable, like RichSet.sorted()."""
+        return self._then(Sorted(key, reverse))
+
+    def reversed(self) -> LazyRichSet[T]:
+        """Returns a new LazyRichSet with a reverse step appended."""
+        return self._then(Reversed())
+
+    # paging
+
+    def page(self, offset: int, limit: int) -> LazyRichSet[T]:
+        """Returns a new LazyRichSet with a page step appended.
+
+        See RichSet.page for the meaning of offset and limit. A page
+        right after sorted() is computed as a top-k selection."""
+        if offset < 0:
+            raise ValueError(f"offset must be non-negative, got {offset}")
+        if limit < 0:
+            raise ValueError(f"limit must be non-negative, got {limit}")
+        return self._then(Page(offset, limit))
+
+    # plans
+
+    def explain(self) -> str:
+        """Returns the plan that would run now, one step per line.
+
+        The plan depends on which indexes of the source have been built
+        by index_by() and sorted_index() so far."""
+        return self._plan().explain()
+
+    # conversions
+
+    def collect(self) -> RichSet[T]:
+        """Runs the operations and returns the result as a RichSet."""
+        return RichSet.from_iterable(self)
+
+    def to_list(self) -> list[T]:
+        """Runs the operations and returns the result as a list."""
+        return list(self)
+
+    def to_tuple(self) -> tuple[T, ...]:
+        """Runs the operations and returns the result as a tuple."""
+        return tuple(self)
+
+    def to_dict(
+        self,
+        key: Callable[[T], Key],
+        *,
+        duplicated: (OnDuplicateActions | Callable[[list[T]], T]) = "error",
+    ) -> dict[Key, T]:
+        """Runs the operations and returns a dictionary mapping keys to values.
+
+        See RichSet.to_dict for the meaning of duplicated."""
+        return self.collect().to_dict(key, duplicated=duplicated)
+
+
+__all__ = [
+    "LazyRichSet",
+]
@@ -0,0 +1,381 @@
+from __future__ import annotations
+
+import array
+import json
+import mmap
+import os
+import pickle
+import struct
+import sys
+from collections.abc import Callable, Iterable, Iterator
+from dataclasses import dataclass, field
+from pathlib import Path
+from types import TracebackType
+from typing import IO, Any, Generic, Protocol, TypeAlias, TypeVar
+
+from ._richset import RichSet
+
+T = TypeVar("T")
+S = TypeVar("S")
+StrPath: TypeAlias = "str | os.PathLike[str]"
+
+# A mapped records file is laid out as:
+#
+#   MAGIC, the length of the header (uint32, little endian), the header
+#   (JSON), the encoded records one after another, the offsets of the
+#   records from the end of the header (size + 1 int64s, starting at
+#   a multiple of 8), then TRAILER: the size and the position of the
+#   offsets.
+#
+# Record i is codec.decode() of the bytes between offsets i and i + 1, so
+# any record is read in O(1) without reading the others. The offsets are
+# written last so that records can be written from an iterable without
+# holding them in memory. Reading maps the file, so processes reading the
+# same file share the OS page cache instead of holding private copies.
+
+MAGIC = b"\x93RSMAPPD"
+FORMAT_VERSION = 1
+_HEADER_LENGTH = struct.Struct("<I")
+TRAILER = struct.Struct("<QQ")
+# filter(), map() and count() decode this many records at a time
+PAGE_SIZE = 1024
+
+
+class Codec(Protocol[T]):
+    """Encodes records to bytes and back. name identifies the encoding
+    and is checked when the records are read."""
+
+    name: str
+
+    def encode(self, record: T) -> bytes: ...
+
+    def decode(self, data: memoryview) -> T: ...
+
+
+class PickleCodec:
+    """Encodes any picklable record with pickle."""
+
+    name = "pickle"
+
+    def encode(self, record: Any) -> bytes:  # noqa: ANN401
+        return pickle.dumps(record, protocol=5)
+
+    def decode(self, data: memoryview) -> Any:  # noqa: ANN401
+        return pickle.loads(data)  # noqa: S301
+
+
+class StructCodec:
+    """Encodes tuples of fixed width with struct.Struct(format)."""
+
+    def __init__(self, format: str) -> None:  # noqa: A002
+        self.format = format
+        self.struct = struct.Struct(format)
+        self.name = f"struct:{format}"
+
+    def __reduce__(self) -> tuple[type[StructCodec], tuple[str]]:
+        return StructCodec, (self.format,)
+
+    def encode(self, record: tuple[Any, ...]) -> bytes:
+        return self.struct.pack(*record)
+
+    def decode(self, data: memoryview) -> tuple[Any, ...]:
+        return self.struct.unpack(data)
+
+
+PICKLE_CODEC = PickleCodec()
+
+
+def header(codec: Codec[Any]) -> bytes:
+    encoded = json.dumps(
+        {
+            "version": FORMAT_VERSION,
+            "codec": codec.name,
+            "byteorder": sys.byteorder,
+        },
+    ).encode()
+    return MAGIC + _HEADER_LENGTH.pack(len(encoded)) + encoded
+
+
+def write_records(
+    f: IO[bytes],
+    records: Iterable[T],
+    codec: Codec[T],
+) -> None:
+    """Writes the records file to f, from its current position."""
+    base = f.tell()
+    prefix = header(codec)
+    f.write(prefix)
+    offsets = array.array("q", [0])
+    for r in records:
+        data = codec.encode(r)
+        f.write(data)
+        offsets.append(offsets[-1] + len(data))
+    position = f.tell() - base
+    padding = -position % 8
+    f.write(bytes(padding))
+    f.write(offsets.tobytes())
+    f.write(TRAILER.pack(len(offsets) - 1, position + padding))
+
+
+@dataclass(frozen=True, eq=False)
+class MappedRecords(Generic[T]):
+    """The records of a records file in a buffer."""
+
+    data: memoryview
+    offsets: memoryview
+    codec: Codec[T]
+    buffer: memoryview = field(repr=False)
+    # the mapped file, closed by close(), and its path, if any
+    owner: Any = field(default=None, repr=False)
+    path: str | None = None
+
+    @classmethod
+    def parse(
+        cls,
+        buffer: memoryview,
+        codec: Codec[T],
+        *,
+        owner: object = None,
+        path: str | None = None,
+    ) -> MappedRecords[T]:
+        start = len(MAGIC) + _HEADER_LENGTH.size
+        if len(buffer) < start or bytes(buffer[: len(MAGIC)]) != MAGIC:
+            raise ValueError("not a MappedRichSet records file")
+        (length,) = _HEADER_LENGTH.unpack(buffer[len(MAGIC) : start])
+        check_header(json.loads(bytes(buffer[start : start + length])), codec)
+        size, position = TRAILER.unpack(buffer[len(buffer) - TRAILER.size :])
+        offsets = buffer[position : position + 8 * (size + 1)].cast("q")
+        data = buffer[start + length : position]
+        return cls(data, offsets, codec, buffer, owner, path)
+
+    def record(self, index: int) -> T:
+        start, stop = self.offsets[index], self.offsets[index + 1]
+        return self.codec.decode(self.data[start:stop])
+
+    def close(self) -> None:
+        for view in (self.data, self.offsets, self.buffer):
+            view.release()
+        if self.owner is not None:
+            self.owner.close()
+
+
+def check_header(header: dict[str, Any], codec: Codec[Any]) -> None:
+    if header["version"] != FORMAT_VERSION:
+        raise ValueError("unsupported MappedRichSet records file version")
+    if header["codec"] != codec.name:
+        raise ValueError(f"records are encoded with {header['codec']!r}")
+    if header["byteorder"] != sys.byteorder:
+        raise ValueError(f"records file is {header['byteorder']}-endian")
+
+
+def reopen(
+    path: str,
+    codec: Codec[T],
+    indices: range,
+) -> MappedRichSet[T]:
+    return MappedRichSet.open(path, codec=codec)._view(indices)
+
+
+@dataclass(frozen=True, eq=False)
+class MappedRichSet(Generic[T]):
+    """A read-only RichSet of records read from a memory-mapped file.
+
+    Each record is decoded by the codec (pickle by default) when it is
+    accessed, so nth(), first(), last() and size() read one record at
+    most, and slice(), page() and reversed() return views over a range of
+    indices like RichSetView, reading nothing. filter(), map() and count()
+    stream through the records page by page. Write the file with write().
+
+    A MappedRichSet opened from a path is pickled as its path and range,
+    so sending it to another process sends no records."""
+
+    source: MappedRecords[T] = field(repr=False)
+    indices: range
+
+    # factory classmethods
+
+    @classmethod
+    def write(
+        cls,
+        path: StrPath,
+        records: Iterable[T],
+        *,
+        codec: Codec[T] = PICKLE_CODEC,
+    ) -> None:
+        """Writes the records to a records file, one at a time."""
+        with Path(path).open("wb") as f:
+            write_records(f, records, codec)
+
+    @classmethod
+    def open(
+        cls,
+        path: StrPath,
+        *,
+        codec: Codec[Any] = PICKLE_CODEC,
+    ) -> MappedRichSet[Any]:
+        """Returns a new MappedRichSet over a records file, which must
+        have been written with the same codec."""
+        with Path(path).open("rb") as f:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        source = MappedRecords.parse(
+            memoryview(mapped),
+            codec,
+            owner=mapped,
+            path=os.fspath(path),
+        )
+        return cls(source, range(len(source.offsets) - 1))
+
+    @classmethod
+    def from_buffer(
+        cls,
+        buffer: memoryview | bytes,
+        *,
+        codec: Codec[Any] = PICKLE_CODEC,
+    ) -> MappedRichSet[Any]:
+        """Returns a new MappedRichSet over the contents of a records
+        file in a buffer."""
+        source = MappedRecords.parse(memoryview(buffer), codec)
+        return cls(source, range(len(source.offsets) - 1))
+
+    def _view(self, indices: range) -> MappedRichSet[T]:
+        return MappedRichSet(self.source, indices)
+
+    def close(self) -> None:
+        """Unmaps the file. The MappedRichSet and all views of it
+        cannot be used afterwards."""
+        self.source.close()
+
+    # magic methods
+
+    def __enter__(self) -> MappedRichSet[T]:
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        self.close()
+
+    def __iter__(self) -> Iterator[T]:
+        return map(self.source.record, self.indices)
+
+    def __len__(self) -> int:
+        return self.size()
+
+    def __reduce__(
+        self,
+    ) -> tuple[Callable[..., MappedRichSet[T]], tuple[Any, ...]]:
+        if self.source.path is None:
+            raise TypeError("cannot pickle a MappedRichSet over a buffer")
+        return reopen, (self.source.path, self.source.codec, self.indices)
+
+    # conversions
+
+    def to_richset(self) -> RichSet[T]:
+        """Returns a new RichSet with the decoded records."""
+        return RichSet.from_tuple(self.to_tuple())
+
+    def to_list(self) -> list[T]:
+        """Returns a list of the decoded records."""
+        return list(self)
+
+    def to_tuple(self) -> tuple[T, ...]:
+        """Returns a tuple of the decoded records."""
+        return tuple(self)
+
+    # list accessors
+
+    def first(self) -> T:
+        """Returns the first record."""
+        if self.is_empty():
+            raise IndexError("MappedRichSet is empty")
+        return self.source.record(self.indices[0])
+
+    def last(self) -> T:
+        """Returns the last record."""
+        if self.is_empty():
+            raise IndexError("MappedRichSet is empty")
+        return self.source.record(self.indices[-1])
+
+    def nth(self, index: int) -> T:
+        """Returns the record at the given index."""
+        if 0 <= index < self.size():
+            return self.source.record(self.indices[index])
+        raise IndexError("index out of range")
+
+    # list manipulations
+
+    def slice(self, start: int, stop: int) -> MappedRichSet[T]:
+        """Returns a new view with sliced records."""
+        return self._view(self.indices[start:stop])
+
+    def filter(self, f: Callable[[T], bool]) -> RichSet[T]:
+        """Returns a new RichSet with the records satisfying f,
+        decoding one page of records at a time."""
+        return RichSet.from_iterable(
+            r for page in self.iter_pages(PAGE_SIZE) for r in page if f(r)
+        )
+
+    def map(self, f: Callable[[T], S]) -> RichSet[S]:
+        """Returns a new RichSet with f applied to each record,
+        decoding one page of records at a time."""
+        return RichSet.from_iterable(
+            f(r) for page in self.iter_pages(PAGE_SIZE) for r in page
+        )
+
+    # sorting
+
+    def reversed(self) -> MappedRichSet[T]:
+        """Returns a new view with reversed records."""
+        return self._view(self.indices[::-1])
+
+    # statistics
+
+    def is_empty(self) -> bool:
+        """Returns True if there are no records."""
+        return not self.indices
+
+    def size(self) -> int:
+        """Returns the number of records, without reading them."""
+        return len(self.indices)
+
+    def count(self, predicate: Callable[[T], bool]) -> int:
+        """Returns the number of records satisfying the predicate,
+        decoding one page of records at a time."""
+        return sum(
+            1
+            for page in self.iter_pages(PAGE_SIZE)
+            for r in page
+            if predicate(r)
+        )
+
+    # paging
+
+    def page(self, offset: int, limit: int) -> MappedRichSet[T]:
+        """Returns a new view with the records in the given page.
+
+        See RichSet.page for the meaning of offset and limit."""
+        if offset < 0:
+            raise ValueError(f"offset must be non-negative, got {offset}")
+        if limit < 0:
+            raise ValueError(f"limit must be non-negative, got {limit}")
+        return self.slice(offset, offset + limit)
+
+    def iter_pages(self, size: int) -> Iterator[RichSet[T]]:
+        """Yields RichSets of the decoded records, size at a time."""
+        if size <= 0:
+            raise ValueError(f"size must be a positive integer, got {size}")
+        return (
+            self.slice(offset, offset + size).to_richset()
+            for offset in range(0, self.size(), size)
+        )
+
+
+__all__ = [
+    "Codec",
+    "MappedRichSet",
+    "PickleCodec",
+    "StructCodec",
+]
@@ -0,0 +1,151 @@
+from __future__ import annotations
+
+import array
+import operator
+from collections.abc import Callable, Sequence
+from typing import TYPE_CHECKING, Any, Literal, TypeAlias
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover
+    np = None  # type: ignore[assignment,unused-ignore]
+
+if TYPE_CHECKING:  # pragma: no cover
+    from numpy.typing import NDArray
+
+    from ._columnar import Column
+
+# Vectorized execution for ColumnarRichSet, used when numpy is installed.
+# Only array columns (int and float fields, held in an array.array or in a
+# memoryview of a snapshot) are handled here; they are viewed as ndarrays
+# without copying. Callers fall back to pure Python otherwise, with the
+# same results.
+
+# positions of records, as computed by either path
+Indices: TypeAlias = "Sequence[int] | NDArray[Any]"
+
+INT64_MIN, INT64_MAX = -(2**63), 2**63 - 1
+
+CompareOp = Literal["==", "!=", "<", "<=", ">", ">="]
+
+# these work element-wise on ndarrays and on single values alike
+COMPARE_OPS: dict[CompareOp, Callable[[Any, Any], Any]] = {
+    "==": operator.eq,
+    "!=": operator.ne,
+    "<": operator.lt,
+    "<=": operator.le,
+    ">": operator.gt,
+    ">=": operator.ge,
+}
+
+
+def enabled() -> bool:
+    """Returns True if numpy is installed."""
+    return np is not None
+
+
+def as_ndarray(column: Column) -> NDArray[Any] | None:
+    """Returns a read-only ndarray sharing the memory of the column,
+    or None if numpy is not installed or the column is not an array."""
+    if np is None or isinstance(column, list):
+        return None
+    return np.frombuffer(column, dtype=memoryview(column).format)
+
+
+def take(column: Column, indices: Indices) -> Column | None:
+    """Returns the values of the column at the indices as a new array,
+    or None if this cannot be done with numpy."""
+    if np is None or not isinstance(indices, np.ndarray):
+        return None
+    if isinstance(column, list):
+        return None
+    taken = array.array(memoryview(column).format)
+    taken.frombytes(np.frombuffer(column, taken.typecode)[indices].tobytes())
+    return taken
+
+
+def argsort(values: NDArray[Any], *, reverse: bool) -> NDArray[Any]:
+    """Returns the indices that sort the values stably.
+
+    With reverse, equal values keep their original order too,
+    like sorted(..., reverse=True)."""
+    if not reverse:
+        return np.argsort(values, kind="stable")
+    last = len(values) - 1
+    return last - np.argsort(values[::-1], kind="stable")[::-1]
+
+
+def matching_indices(
+    values: NDArray[Any],
+    op: CompareOp,
+    value: object,
+) -> NDArray[Any] | None:
+    """Returns the indices of the values for which `values op value`,
+    or None if numpy might compare them differently from Python."""
+    if not exactly_comparable(values, value):
+        return None
+    return np.flatnonzero(COMPARE_OPS[op](values, value))
+
+
+def exactly_comparable(values: NDArray[Any], value: object) -> bool:
+    """Returns True if numpy compares the values to value exactly:
+    ints to an int that fits in 64 bits, or floats to a float.
+
+    numpy converts ints to floats to compare them, so 2**53 + 1 would
+    equal float(2**53), while Python compares them exactly."""
+    if values.dtype.kind == "f":
+        return type(value) is float
+    return type(value) is int and INT64_MIN <= value <= INT64_MAX
+
+
+def group_indices(values: NDArray[Any]) -> list[tuple[Any, NDArray[Any]]]:
+    """Returns (key, indices) pairs for each distinct value.
+
+    Groups are ordered by first occurrence and keyed by the first value
+    of each, like dict-based grouping; as there, each NaN is a group of
+    its own, since NaN != NaN (and the floats read from a column are
+    never the same object)."""
+    _, first, inverse, counts = np.unique(
+        values,
+        return_index=True,
+        return_inverse=True,
+        return_counts=True,
+        equal_nan=False,
+    )
+    order = np.argsort(inverse.reshape(-1), kind="stable")
+    groups = np.split(order, np.cumsum(counts)[:-1])
+    return [
+        (values[first[g]].item(), groups[g])
+        for g in np.argsort(first, kind="stable")
+    ]
+
+
+def group_sizes(values: NDArray[Any]) -> dict[Any, int]:
+    """Returns the number of occurrences of each distinct value.
+
+    Keys are ordered and chosen like group_indices()."""
+    uniques, first, inverse = np.unique(
+        values,
+        return_index=True,
+        return_inverse=True,
+        equal_nan=False,
+    )
+    counts = np.bincount(inverse.reshape(-1), minlength=len(uniques))
+    return {
+        values[first[g]].item(): int(counts[g])
+        for g in np.argsort(first, kind="stable")
+    }
+
+
+__all__ = [
+    "COMPARE_OPS",
+    "CompareOp",
+    "Indices",
+    "argsort",
+    "as_ndarray",
+    "enabled",
+    "group_indices",
+    "group_sizes",
+    "matching_indices",
+    "take",
+]
@@ -0,0 +1,481 @@
+from __future__ import annotations
+
+import dataclasses
+import heapq
+import itertools
+from collections.abc import Callable, Hashable, Iterable, Iterator, Sequence
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Protocol
+
+from ._expr import And, Compare, Const, Expr, key_identity
+from ._join import product
+
+if TYPE_CHECKING:  # pragma: no cover
+    from ._index import KeyIndex, SortedIndex
+    from ._richset import RichSet
+
+# The planner rewrites the operations recorded by LazyRichSet before they
+# run. Rewrites never change the result, only the work done:
+#
+# - filters move ahead of sorted() and reversed(), which do not change
+#   which records pass, and adjacent filters are merged into one step;
+# - a leading filter on an expression such as F.name == "a" or F.id > 10
+#   reads only the matching records from an index that index_by() or
+#   sorted_index() already built for that expression (a sorted index
+#   only if its keys and the constant are ints and floats, strs or bytes
+#   without NaN, whose order bisection relies on);
+# - sorted() by a key that has a cached sorted index reads the index in
+#   key order instead of sorting;
+# - sorted() followed by page() keeps only the top offset + limit records
+#   with a heap instead of sorting everything.
+#
+# Filters are never moved across map() or unique(): a map is an opaque
+# function and the planner cannot tell what a later predicate reads, and
+# unique() keeps the first record of each key, which depends on which
+# records came before it.
+
+
+def describe(f: object) -> str:
+    """Returns a short readable name for a key, predicate or function."""
+    if isinstance(f, Expr):
+        return repr(f)
+    return str(getattr(f, "__qualname__", f))
+
+
+class Operation(Protocol):  # pragma: no cover
+    def apply(self, records: Iterable[Any]) -> Iterable[Any]: ...
+
+    def describe(self) -> str: ...
+
+
+class Scan(Protocol):  # pragma: no cover
+    def records(self) -> Iterable[Any]: ...
+
+    def describe(self) -> str: ...
+
+
+# operations
+
+
+@dataclass(frozen=True)
+class Filter:
+    predicates: tuple[Callable[[Any], bool], ...]
+
+    def apply(self, records: Iterable[Any]) -> Iterable[Any]:
+        if len(self.predicates) == 1:
+            return filter(self.predicates[0], records)
+        return (r for r in records if all(p(r) for p in self.predicates))
+
+    def describe(self) -> str:
+        return f"filter({' & '.join(map(describe, self.predicates))})"
+
+
+@dataclass(frozen=True)
+class Map:
+    f: Callable[[Any], Any]
+
+    def apply(self, records: Iterable[Any]) -> Iterable[Any]:
+        return map(self.f, records)
+
+    def describe(self) -> str:
+        return f"map({describe(self.f)})"
+
+
+@dataclass(frozen=True)
+class Unique:
+    key: Callable[[Any], Hashable]
+
+    def apply(self, records: Iterable[Any]) -> Iterator[Any]:
+        seen = set()
+        for r in records:
+            key_ = self.key(r)
+            if key_ not in seen:
+                seen.add(key_)
+                yield r
+
+    def describe(self) -> str:
+        return f"unique({describe(self.key)})"
+
+
+@dataclass(frozen=True)
+class Sorted:
+    key: Callable[[Any], Any]
+    reverse: bool
+
+    def apply(self, records: Iterable[Any]) -> Iterable[Any]:
+        return sorted(records, key=self.key, reverse=self.reverse)
+
+    def describe(self) -> str:
+        return f"sorted(key={describe(self.key)}, reverse={self.reverse})"
+
+
+@dataclass(frozen=True)
+class Reversed:
+    def apply(self, records: Iterable[Any]) -> Iterable[Any]:
+        if not isinstance(records, Sequence):
+            records = list(records)
+        return reversed(records)
+
+    def describe(self) -> str:
+        return "reversed()"
+
+
+@dataclass(frozen=True)
+class Page:
+    offset: int
+    limit: int
+
+    def apply(self, records: Iterable[Any]) -> Iterable[Any]:
+        stop = self.offset + self.limit
+        return itertools.islice(records, self.offset, stop)
+
+    def describe(self) -> str:
+        return f"page(offset={self.offset}, limit={self.limit})"
+
+
+@dataclass(frozen=True)
+class TopK:
+    """sorted() followed by page(), keeping only offset + limit records."""
+
+    key: Callable[[Any], Any]
+    reverse: bool
+    offset: int
+    limit: int
+
+    def apply(self, records: Iterable[Any]) -> Iterable[Any]:
+        # both are stable, like sorted(records, ...)[:n]
+        select = heapq.nlargest if self.reverse else heapq.nsmallest
+        top = select(self.offset + self.limit, records, key=self.key)
+        return top[self.offset :]
+
+    def describe(self) -> str:
+        return (
+            f"top_k(key={describe(self.key)}, reverse={self.reverse}, "
+            f"offset={self.offset}, limit={self.limit})"
+        )
+
+
+@dataclass(frozen=True)
+class Product:
+    other: tuple[Any, ...]
+    where: Callable[[Any, Any], bool] | None
+
+    def apply(self, records: Iterable[Any]) -> Iterable[Any]:
+        return product(records, self.other, self.where)
+
+    def describe(self) -> str:
+        where = "" if self.where is None else f", where={describe(self.where)}"
+        return f"cartesian_product({len(self.other)} records{where})"
+
+
+@dataclass(frozen=True)
+class Zip:
+    other: tuple[Any, ...]
+
+    def apply(self, records: Iterable[Any]) -> Iterable[Any]:
+        return zip(records, self.other, strict=True)
+
+    def describe(self) -> str:
+        return f"zip({len(self.other)} records)"
+
+
+@dataclass(frozen=True)
+class ZipLongest:
+    other: tuple[Any, ...]
+    fillvalue: object
+
+    def apply(self, records: Iterable[Any]) -> Iterable[Any]:
+        return itertools.zip_longest(
+            records,
+            self.other,
+            fillvalue=self.fillvalue,
+        )
+
+    def describe(self) -> str:
+        return (
+            f"zip_longest({len(self.other)} records, "
+            f"fillvalue={self.fillvalue!r})"
+        )
+
+
+# scans
+
+
+@dataclass(frozen=True)
+class FullScan:
+    source: tuple[Any, ...]
+
+    def records(self) -> Iterable[Any]:
+        return self.source
+
+    def describe(self) -> str:
+        return f"scan({len(self.source)} records)"
+
+
+@dataclass(frozen=True)
+class HashLookup:
+    key: Expr
+    value: object
+    index: KeyIndex[Any, Any]
+
+    def records(self) -> Iterable[Any]:
+        return self.index.get_all(self.value).records
+
+    def describe(self) -> str:
+        return f"index_by({self.key!r}).get_all({self.value!r})"
+
+
+@dataclass(frozen=True)
+class SortedRange:
+    """Records of a (possibly narrowed) cached SortedIndex, either in key
+    order or restored to their order in the source."""
+
+    key: Callable[[Any], Any]
+    query: str
+    index: SortedIndex[Any]
+    source: tuple[Any, ...]
+    key_order: bool
+
+    def records(self) -> Iterable[Any]:
+        if self.key_order:
+            return self.index
+        index = self.index
+        positions = sorted(index.positions[index.start : index.stop])
+        return [self.source[i] for i in positions]
+
+    def describe(self) -> str:
+        order = "key order" if self.key_order else "source order"
+        query = f".{self.query}" if self.query else ""
+        return f"sorted_index({describe(self.key)}){query} in {order}"
+
+
+# the plan
+
+
+@dataclass(frozen=True)
+class Plan:
+    scan: Scan
+    operations: tuple[Operation, ...]
+
+    def run(self) -> Iterator[Any]:
+        records = self.scan.records()
+        for operation in self.operations:
+            records = operation.apply(records)
+        return iter(records)
+
+    def explain(self) -> str:
+        steps = [self.scan.describe()]
+        steps.extend(operation.describe() for operation in self.operations)
+        return "\n".join(f"{i}. {step}" for i, step in enumerate(steps, 1))
+
+
+def plan(source: RichSet[Any], operations: Sequence[Operation]) -> Plan:
+    """Returns the plan to run the operations over the source."""
+    operations = merge_filters(push_filters_down(operations))
+    scan, operations = choose_scan(source, operations)
+    scan, operations = use_sort_order(source, scan, operations)
+    return Plan(scan, fuse_top_k(operations))
+
+
+def _filter_position(operations: list[Operation]) -> int:
+    i = len(operations)
+    while i > 0 and isinstance(operations[i - 1], Sorted | Reversed):
+        i -= 1
+    return i
+
+
+def push_filters_down(
+    operations: Iterable[Operation],
+) -> tuple[Operation, ...]:
+    """Moves each filter ahead of the sorted() and reversed() before it."""
+    result: list[Operation] = []
+    for operation in operations:
+        if isinstance(operation, Filter):
+            result.insert(_filter_position(result), operation)
+        else:
+            result.append(operation)
+    return tuple(result)
+
+
+def merge_filters(operations: Iterable[Operation]) -> tuple[Operation, ...]:
+    """Merges adjacent filters into a single step."""
+    result: list[Operation] = []
+    for operation in operations:
+        last = result[-1] if result else None
+        if isinstance(operation, Filter) and isinstance(last, Filter):
+            result[-1] = Filter(last.predicates + operation.predicates)
+        else:
+            result.append(operation)
+    return tuple(result)
+
+
+def fuse_top_k(operations: Sequence[Operation]) -> tuple[Operation, ...]:
+    """Replaces sorted() followed by page() with a top-k selection."""
+    result: list[Operation] = []
+    for operation in operations:
+        last = result[-1] if result else None
+        if isinstance(operation, Page) and isinstance(last, Sorted):
+            result[-1] = TopK(
+                last.key,
+                last.reverse,
+                operation.offset,
+                operation.limit,
+            )
+        else:
+            result.append(operation)
+    return tuple(result)
+
+
+def conjuncts(
+    predicates: Iterable[Callable[[Any], bool]],
+) -> Iterator[Callable[[Any], bool]]:
+    """Yields the predicates with (a & b) expressions split into a, b."""
+    for p in predicates:
+        if isinstance(p, And):
+            yield from conjuncts((p.left, p.right))
+        else:
+            yield p
+
+
+def choose_scan(
+    source: RichSet[Any],
+    operations: tuple[Operation, ...],
+) -> tuple[Scan, tuple[Operation, ...]]:
+    """Returns an index scan for a leading filter if a cached index can
+    answer one of its conditions, with the remaining conditions."""
+    full = FullScan(source.records)
+    if not operations or not isinstance(operations[0], Filter):
+        return full, operations
+    predicates = tuple(conjuncts(operations[0].predicates))
+    for i, predicate in enumerate(predicates):
+        scan = index_scan(source, predicate)
+        if scan is not None:
+            rest = predicates[:i] + predicates[i + 1 :]
+            residual = (Filter(rest),) if rest else ()
+            return scan, residual + operations[1:]
+    return full, operations
+
+
+def constant_comparison(
+    predicate: object,
+) -> tuple[Expr, str, object] | None:
+    """Returns (expression, op, value) if the predicate compares an
+    expression to a constant, such as F.id > 10."""
+    if isinstance(predicate, Compare) and isinstance(predicate.right, Const):
+        return predicate.left, predicate.op, predicate.right.value
+    return None
+
+
+def index_scan(source: RichSet[Any], predicate: object) -> Scan | None:
+    """Returns a scan of a cached index answering the predicate."""
+    comparison = constant_comparison(predicate)
+    if comparison is None:
+        return None
+    return hash_lookup(source, *comparison) or sorted_range(
+        source,
+        *comparison,
+    )
+
+
+def hash_lookup(
+    source: RichSet[Any],
+    key: Expr,
+    op: str,
+    value: object,
+) -> HashLookup | None:
+    if op != "==" or not isinstance(value, Hashable):
+        return None
+    index = source._peek_cached(("index_by", key_identity(key)))
+    if index is None:
+        return None
+    return HashLookup(key, value, index)
+
+
+# SortedIndex methods answering `key op value`
+RANGE_QUERIES = {
+    "<": "less_than",
+    "<=": "less_equal",
+    ">": "greater_than",
+    ">=": "greater_equal",
+}
+
+
+def sorted_range(
+    source: RichSet[Any],
+    key: Expr,
+    op: str,
+    value: object,
+) -> SortedRange | None:
+    if op != "==" and op not in RANGE_QUERIES:
+        return None
+    index = source._peek_cached(("sorted_index", key_identity(key)))
+    if index is None or not index.bisectable(value):
+        return None
+    if op == "==":
+        narrowed = index.between(value, value)
+        query = f"between({value!r}, {value!r})"
+    else:
+        narrowed = getattr(index, RANGE_QUERIES[op])(value)
+        query = f"{RANGE_QUERIES[op]}({value!r})"
+    return SortedRange(key, query, narrowed, source.records, key_order=False)
+
+
+def use_sort_order(
+    source: RichSet[Any],
+    scan: Scan,
+    operations: tuple[Operation, ...],
+) -> tuple[Scan, tuple[Operation, ...]]:
+    """Drops an ascending sorted() that comes after filters only if the
+    scan can read its records in that key order from a cached index."""
+    i = next(
+        (i for i, o in enumerate(operations) if not isinstance(o, Filter)),
+        len(operations),
+    )
+    sort = operations[i] if i < len(operations) else None
+    if not isinstance(sort, Sorted) or sort.reverse:
+        return scan, operations
+    ordered = key_ordered(source, scan, sort.key)
+    if ordered is None:
+        return scan, operations
+    return ordered, operations[:i] + operations[i + 1 :]
+
+
+def key_ordered(
+    source: RichSet[Any],
+    scan: Scan,
+    key: Callable[[Any], Any],
+) -> SortedRange | None:
+    """Returns the scan reading the same records in key order, if any."""
+    if isinstance(scan, SortedRange):
+        return range_in_key_order(scan, key)
+    if isinstance(scan, FullScan):
+        index = source._peek_cached(("sorted_index", key_identity(key)))
+        if index is not None:
+            return SortedRange(key, "", index, scan.source, key_order=True)
+    return None
+
+
+def range_in_key_order(
+    scan: SortedRange,
+    key: Callable[[Any], Any],
+) -> SortedRange | None:
+    if key_identity(scan.key) != key_identity(key):
+        return None
+    return dataclasses.replace(scan, key_order=True)
+
+
+__all__ = [
+    "Filter",
+    "Map",
+    "Operation",
+    "Page",
+    "Plan",
+    "Product",
+    "Reversed",
+    "Sorted",
+    "TopK",
+    "Unique",
+    "Zip",
+    "ZipLongest",
+    "plan",
+]
@@ -1,24 +1,51 @@
 from __future__ import annotations
 
 import functools
+import heapq
 import itertools
+import operator
+import os
+import threading
 import warnings
-from collections.abc import Callable, Hashable, Iterable, Iterator
+from collections.abc import (
+    AsyncIterable,
+    Awaitable,
+    Callable,
+    Hashable,
+    Iterable,
+    Iterator,
+)
 from dataclasses import dataclass
 from typing import (
+    TYPE_CHECKING,
+    Any,
     Generic,
     Literal,
     TypeVar,
+    cast,
     overload,
 )
 
+from ._expr import cacheable, key_identity
+from ._instrumentation import instrumented
 from ._version import __version__
 from .comparable import Comparable
 
+if TYPE_CHECKING:  # pragma: no cover
+    from concurrent.futures import Executor
+
+    from ._builder import RichSetBuilder
+    from ._columnar import ColumnarRichSet
+    from ._index import KeyIndex, SortedIndex
+    from ._lazy import LazyRichSet
+    from ._parallel import ParallelMode
+    from ._view import RichSetView
+
 T = TypeVar("T")
 S = TypeVar("S")
 Key = TypeVar("Key", bound=Hashable)
 Fill = TypeVar("Fill")
+V = TypeVar("V")
 OnDuplicateActions = Literal["error", "first", "last"]
 
 
@@ -68,6 +95,11 @@ class RichSet(Generic[T]):
         """Returns an empty RichSet."""
         return cls(records=())
 
+    @classmethod
+    async def from_async_iterable(cls, itr: AsyncIterable[T]) -> RichSet[T]:
+        """Returns a new RichSet from an async iterable."""
+        return cls(tuple([r async for r in itr]))
+
     # magic methods
 
     def __iter__(self) -> Iterator[T]:
@@ -76,16 +108,66 @@ class RichSet(Generic[T]):
     def __len__(self) -> int:
         return self.size()
 
+    def __getstate__(self) -> dict[str, Any]:
+        # lazily built caches are left out: they are cheap to rebuild
+        # and may hold key functions that cannot be pickled
+        return {"records": self.records}
+
+    # caches
+
+    def _cached(self, cache_key: Hashable, build: Callable[[], V]) -> V:
+        """Returns the cached value for cache_key, building it on first use.
+
+        Cached values are derived from the records, which never change.
+        Reads take no lock; builds are serialized by a lock of this
+        RichSet, so that a RichSet shared between threads never builds
+        the same value twice, without blocking other RichSets."""
+        caches = self.__dict__.get("_caches")
+        if caches is not None and cache_key in caches:
+            return cast(V, caches[cache_key])
+        lock = self.__dict__.setdefault("_cache_lock", threading.RLock())
+        with lock:
+            caches = self.__dict__.setdefault("_caches", {})
+            if cache_key not in caches:
+                caches[cache_key] = build()
+            return cast(V, caches[cache_key])
+
+    def _cached_by_key(
+        self,
+        name: str,
+        key: Callable[[T], Any],
+        build: Callable[[], V],
+    ) -> V:
+        """Returns the value built for key, cached under (name, key) if
+        key is cacheable (see _expr.cacheable), otherwise built anew."""
+        if not cacheable(key):
+            return build()
+        return self._cached((name, key_identity(key)), build)
+
+    def _peek_cached(self, cache_key: Hashable) -> Any:  # noqa: ANN401
+        """Returns the cached value for cache_key, or None if it has not
+        been built (or cache_key is unhashable)."""
+        caches = self.__dict__.get("_caches")
+        if caches is None:
+            return None
+        try:
+            return caches.get(cache_key)
+        except TypeError:
+            return None
+
     # conversions
 
+    @instrumented
     def to_list(self) -> list[T]:
         """Returns a list of records."""
         return list(self.records)
 
+    @instrumented
     def to_tuple(self) -> tuple[T, ...]:
         """Returns a tuple of records."""
         return tuple(self.records)
 
+    @instrumented
     def to_set(
         self,
     ) -> set[T]:  # intersection of T & Hashable
@@ -95,12 +177,14 @@ class RichSet(Generic[T]):
                 raise TypeError(f"non-hashable record: {r}")
         return set(self.records)
 
+    @instrumented
     def to_frozenset(
         self,
     ) -> frozenset[T]:  # intersection of T & Hashable
         """Returns a frozenset of records."""
         return frozenset(self.to_set())
 
+    @instrumented
     def to_dict(
         self,
         key: Callable[[T], Key],
@@ -122,6 +206,7 @@ there are multiple records with the same key.
         selector = duplicate_value_selector(duplicated)
         return {k: selector(v) for k, v in base.items()}
 
+    @instrumented
     def to_dict_of_list(
         self,
         key: Callable[[T], Key],
@@ -135,6 +220,61 @@ there are multiple records with the same key.
             d[k].append(r)
         return d
 
+    @instrumented
+    def to_columnar(
+        self,
+        *,
+        record_type: type[T] | None = None,
+    ) -> ColumnarRichSet[T]:
+        """Returns a ColumnarRichSet storing the records field by field.
+
+        The records must be instances of the same dataclass;
+        record_type is required if the RichSet may be empty."""
+        from ._columnar import ColumnarRichSet
+
+        return ColumnarRichSet.from_richset(self, record_type=record_type)
+
+    # snapshots
+
+    @instrumented
+    def save(self, path: str | os.PathLike[str]) -> None:
+        """Writes the records to a binary snapshot file.
+
+        Ints and floats, and the int and float fields of dataclass
+        records of one type, are written as raw arrays that load() reads
+        without parsing; other records are pickled. See load()."""
+        from ._snapshot import encode_records, write
+
+        write(path, encode_records(self.records))
+
+    @classmethod
+    def load(
+        cls,
+        path: str | os.PathLike[str],
+        *,
+        mmap: bool = False,
+    ) -> RichSet[Any]:
+        """Returns a new RichSet of the records of a snapshot file.
+
+        With mmap, the file is memory-mapped and its arrays are read
+        in place, instead of being read into memory first. Snapshots are
+        pickles: only load files you trust. A snapshot of dataclasses
+        must be loaded with the same fields, or ValueError is raised."""
+        from ._snapshot import load_records
+
+        return cls.from_tuple(load_records(path, mmap=mmap))
+
+    # lazy evaluation
+
+    def lazy(self) -> LazyRichSet[T]:
+        """Returns a LazyRichSet that defers filter/map/unique.
+
+        The recorded operations are fused into a single pass over
+        the records when the result is collected."""
+        from ._lazy import LazyRichSet
+
+        return LazyRichSet(self)
+
     # list accessors
 
     @overload
@@ -243,10 +383,12 @@ there are multiple records with the same key.
 
     # list manipulations
 
+    @instrumented
     def filter(self, f: Callable[[T], bool]) -> RichSet[T]:
         """Returns a new RichSet with filtered records."""
         return RichSet.from_list(list(filter(f, self.records)))
 
+    @instrumented
     def unique(self, key: Callable[[T], Key]) -> RichSet[T]:
         """Returns a new RichSet with unique records.
 
@@ -263,10 +405,12 @@ there are multiple records with the same key.
                 seen.add(key_)
         return RichSet.from_list(new_records)
 
+    @instrumented
     def map(self, f: Callable[[T], S]) -> RichSet[S]:
         """Returns a new RichSet with mapped records."""
         return RichSet.from_list(list(map(f, self.records)))
 
+    @instrumented
     def reduce(
         self,
         fn: Callable[[S, T], S],
@@ -275,10 +419,20 @@ there are multiple records with the same key.
         """Returns a reduced value."""
         return functools.reduce(fn, self.records[:], initial)
 
+    @instrumented
     def slice(self, start: int, stop: int) -> RichSet[T]:
         """Returns a new RichSet with sliced records."""
         return RichSet.from_tuple(self.records[start:stop])
 
+    def view(self) -> RichSetView[T]:
+        """Returns a read-only RichSetView over the records.
+
+        Slicing, paging and reversing a view copy nothing."""
+        from ._view import RichSetView
+
+        return RichSetView.of(self)
+
+    @instrumented
     def divide_at(self, index: int) -> tuple[RichSet[T], RichSet[T]]:
         """Returns a tuple of two RichSets,
         where the first contains records before the index,
@@ -288,31 +442,48 @@ there are multiple records with the same key.
             self.slice(index, self.size()),
         )
 
+    @instrumented
     def pushed(self, record: T) -> RichSet[T]:
         """Returns a new RichSet with the given record pushed to the end."""
         return RichSet.from_tuple((*self.records, record))
 
+    @instrumented
     def pushed_all(self, records: Iterable[T]) -> RichSet[T]:
         """Returns a new RichSet with the given records pushed to the end."""
         return RichSet.from_tuple(self.records + tuple(records))
 
+    @instrumented
     def unshifted(self, record: T) -> RichSet[T]:
         """Returns a new RichSet with the given record \
 unshifted to the beginning."""
         return RichSet.from_tuple((record, *self.records))
 
+    @instrumented
     def unshifted_all(self, records: Iterable[T]) -> RichSet[T]:
         """Returns a new RichSet with the given records \
 unshifted to the beginning."""
         return RichSet.from_tuple(tuple(records) + self.records)
 
+    def builder(self) -> RichSetBuilder[T]:
+        """Returns a RichSetBuilder that starts from the records.
+
+        pushed()/unshifted() copy every record on each call, so prefer
+        the builder when adding records one by one in a loop."""
+        from ._builder import RichSetBuilder
+
+        return RichSetBuilder(self.records)
+
+    @instrumented
     def popped(self) -> tuple[T, RichSet[T]]:
-        """Returns a tuple of the popped record and a new RichSet."""
+        """Returns a tuple of the popped record and a new RichSet.
+
+        The remaining records are copied; use view().popped() to drain
+        records without copying."""
         if self.is_empty():
             raise IndexError("pop from empty RichSet")
-        copied = self.to_list()
-        return copied.pop(), RichSet.from_list(copied)
+        return self.records[-1], RichSet.from_tuple(self.records[:-1])
 
+    @instrumented
     def popped_n(self, n: int) -> tuple[RichSet[T], RichSet[T]]:
         """Returns a tuple of the popped records and a new RichSet.
 
@@ -326,13 +497,17 @@ unshifted to the beginning."""
         remains, popped_r = self.divide_at(-n)
         return popped_r.reversed(), remains
 
+    @instrumented
     def shifted(self) -> tuple[T, RichSet[T]]:
-        """Returns a tuple of the shifted record and a new RichSet."""
+        """Returns a tuple of the shifted record and a new RichSet.
+
+        The remaining records are copied; use view().shifted() to drain
+        records as a queue without copying."""
         if self.is_empty():
             raise IndexError("shift from empty RichSet")
-        copied = self.to_list()
-        return copied.pop(0), RichSet.from_list(copied)
+        return self.records[0], RichSet.from_tuple(self.records[1:])
 
+    @instrumented
     def shifted_n(self, n: int) -> tuple[RichSet[T], RichSet[T]]:
         """Returns a tuple of the shifted records and a new RichSet.
 
@@ -345,6 +520,7 @@ unshifted to the beginning."""
 
     # search
 
+    @instrumented
     def indexed_records(
         self,
         *,
@@ -358,6 +534,7 @@ unshifted to the beginning."""
             )
         return enumerate(self.records)
 
+    @instrumented
     def index_of(
         self,
         predicate: Callable[[T], bool],
@@ -372,18 +549,31 @@ unshifted to the beginning."""
                 return index
         return -1
 
+    @instrumented
     def contains(self, predicate: Callable[[T], bool]) -> bool:
         """Returns True if any record satisfies the predicate."""
         return self.index_of(predicate) != -1
 
+    @instrumented
     def has(self, record: T) -> bool:
-        """Returns True if the record is in the RichSet."""
-        return record in self.records
-
+        """Returns True if the record is in the RichSet.
+
+        Hashable records are looked up in a hash set that is built
+        on first use and reused for the lifetime of the RichSet."""
+        record_set = self._record_set
+        if record_set is None:
+            return record in self.records
+        try:
+            return record in record_set
+        except TypeError:  # unhashable record
+            return record in self.records
+
+    @instrumented
     def indices_of(self, predicate: Callable[[T], bool]) -> list[int]:
         """Returns a list of indices of records satisfying the predicate."""
         return [i for i, r in enumerate(self.records) if predicate(r)]
 
+    @instrumented
     def search_first(
         self,
         predicate: Callable[[T], bool],
@@ -396,6 +586,7 @@ unshifted to the beginning."""
             return (-1, None)
         return (idx, self.records[idx])
 
+    @instrumented
     def search_last(
         self,
         predicate: Callable[[T], bool],
@@ -408,6 +599,7 @@ unshifted to the beginning."""
             return (-1, None)
         return (idx, self.records[idx])
 
+    @instrumented
     def search_all(
         self,
         predicate: Callable[[T], bool],
@@ -419,8 +611,63 @@ unshifted to the beginning."""
         indices = self.indices_of(predicate)
         return [(i, self.records[i]) for i in indices]
 
+    # indexes
+
+    @instrumented(count_key_calls=False)
+    def index_by(self, key: Callable[[T], Key]) -> KeyIndex[Key, T]:
+        """Returns a KeyIndex of the records by the given key.
+
+        The index is built on first use and cached per key: per
+        structure for expressions such as F.id, per function object for
+        named functions, so pass the same function to reuse it. Indexes
+        by a lambda are not cached and are built on every call."""
+        from ._index import KeyIndex
+
+        return self._cached_by_key(
+            "index_by",
+            key,
+            lambda: KeyIndex.build(self, key),
+        )
+
+    @instrumented(count_key_calls=False)
+    def sorted_index(
+        self,
+        key: Callable[[T], Comparable[S]],
+    ) -> SortedIndex[T]:
+        """Returns a SortedIndex of the records by the given key.
+
+        The records are sorted once; range queries such as between()
+        then cost O(log n + k). The index is cached per key like
+        index_by(), so not for lambdas."""
+        from ._index import SortedIndex
+
+        return self._cached_by_key(
+            "sorted_index",
+            key,
+            lambda: SortedIndex.build(self, key),
+        )
+
     # set operations
 
+    def _hash_records(self) -> frozenset[T] | None:
+        try:
+            return frozenset(self.records)
+        except TypeError:
+            return None
+
+    @property
+    def _record_set(self) -> frozenset[T] | None:
+        """A hash set of the records, or None if any record is unhashable.
+
+        RichSet is immutable, so this is built once and cached."""
+        return self._cached(("record_set",), self._hash_records)
+
+    def _as_set(self) -> frozenset[T]:
+        if self._record_set is None:
+            return frozenset(self.records)  # raises the TypeError
+        return self._record_set
+
+    @instrumented
     def union(self, other: RichSet[T]) -> RichSet[T]:
         """Returns a new RichSet with the union of the records.
 
@@ -432,66 +679,86 @@ unshifted to the beginning."""
             seen[record] = None
         return RichSet.from_list(list(seen.keys()))
 
+    @instrumented
     def intersection(self, other: RichSet[T]) -> RichSet[T]:
         """Returns a new RichSet with the intersection of the records.
 
         The result preserves the order of records in self.
         """
-        other_set = set(other.records)
+        other_set = other._as_set()
         return RichSet.from_list([r for r in self.records if r in other_set])
 
+    @instrumented
     def difference(self, other: RichSet[T]) -> RichSet[T]:
         """Returns a new RichSet with the difference of the records.
 
         The result preserves the order of records in self.
         """
-        other_set = set(other.records)
+        other_set = other._as_set()
         return RichSet.from_list(
             [r for r in self.records if r not in other_set],
         )
 
+    @instrumented
     def symmetric_difference(self, other: RichSet[T]) -> RichSet[T]:
         """Returns a new RichSet with the symmetric difference of the records.
 
         Records in self but not in other appear first (in self's order),
         followed by records in other but not in self (in other's order).
         """
-        self_set = set(self.records)
-        other_set = set(other.records)
+        self_set = self._as_set()
+        other_set = other._as_set()
         result = [r for r in self.records if r not in other_set]
         result += [r for r in other.records if r not in self_set]
         return RichSet.from_list(result)
 
+    @instrumented
     def is_subset(self, other: RichSet[T]) -> bool:
         """Returns True if self is a subset of other."""
-        return set(self.records).issubset(set(other.records))
+        return self._as_set() <= other._as_set()
 
+    @instrumented
     def is_superset(self, other: RichSet[T]) -> bool:
         """Returns True if self is a superset of other."""
-        return set(self.records).issuperset(set(other.records))
+        return self._as_set() >= other._as_set()
 
+    @instrumented
     def is_disjoint(self, other: RichSet[T]) -> bool:
         """Returns True if self and other are disjoint."""
-        return set(self.records).isdisjoint(set(other.records))
+        return self._as_set().isdisjoint(other._as_set())
 
+    @instrumented
     def is_equal_as_set(self, other: RichSet[T]) -> bool:
         """Returns True if self and other are same set."""
-        return set(self.records) == set(other.records)
+        return self._as_set() == other._as_set()
 
-    def cartesian_product(self, other: RichSet[S]) -> RichSet[tuple[T, S]]:
-        """Returns a new RichSet with the cartesian product of the records."""
-        return RichSet.from_list(
-            [(r1, r2) for r1 in self.records for r2 in other.records],
+    @instrumented
+    def cartesian_product(
+        self,
+        other: RichSet[S],
+        *,
+        where: Callable[[T, S], bool] | None = None,
+    ) -> RichSet[tuple[T, S]]:
+        """Returns a new RichSet with the cartesian product of the records.
+
+        With where, only the pairs (r1, r2) for which where(r1, r2) is
+        true are kept; the others are never built. Use lazy() to iterate
+        the product without keeping it."""
+        from ._join import product
+
+        return RichSet.from_iterable(
+            product(self.records, other.records, where),
         )
 
+    @instrumented
     def zip(self, other: RichSet[S]) -> RichSet[tuple[T, S]]:
         """Returns a new RichSet with the zip of the records.
 
         Both RichSets must have the same number of elements;
         raises ValueError if their lengths differ.
         Use zip_longest() to pair sequences of unequal length."""
-        return RichSet.from_list(
-            list(zip(self.records, other.records, strict=True)),
+        return RichSet.from_iterable(
+            zip(self.records, other.records, strict=True),
         )
 
     @overload
@@ -508,6 +775,7 @@ unshifted to the beginning."""
         other: RichSet[S],
     ) -> RichSet[tuple[T | None, S | None]]: ...
 
+    @instrumented  # type: ignore[arg-type]  # overloaded
     def zip_longest(
         self,
         other: RichSet[S],
@@ -517,22 +785,104 @@ unshifted to the beginning."""
         """Returns a new RichSet with the zip_longest of the records.
 
         This performs like the zip_longest() function in Python."""
-        if fillvalue is not None:
-            return RichSet.from_list(
-                list(
-                    itertools.zip_longest(
-                        self.records,
-                        other.records,
-                        fillvalue=fillvalue,
-                    ),
-                ),
-            )
-        return RichSet.from_list(
-            list(itertools.zip_longest(self.records, other.records)),
+        return RichSet.from_iterable(
+            itertools.zip_longest(
+                self.records,
+                other.records,
+                fillvalue=cast(Fill, fillvalue),
+            ),
+        )
+
+    # joins
+
+    @instrumented
+    def join(
+        self,
+        other: RichSet[S],
+        *,
+        left_key: Callable[[T], Key],
+        right_key: Callable[[S], Key],
+    ) -> RichSet[tuple[T, S]]:
+        """Returns a new RichSet of (record, other record) pairs \
+with equal keys.
+
+        The pairs are in the same order as with cartesian_product()
+        followed by filter(), but the records are not compared pairwise:
+        if both sides are already sorted by their keys they are merged,
+        otherwise the smaller side is hashed by key."""
+        from ._join import inner_join
+
+        return RichSet.from_iterable(
+            inner_join(self.records, other.records, left_key, right_key),
+        )
+
+    @instrumented
+    def left_join(
+        self,
+        other: RichSet[S],
+        *,
+        left_key: Callable[[T], Key],
+        right_key: Callable[[S], Key],
+    ) -> RichSet[tuple[T, S | None]]:
+        """Returns a new RichSet like join(), where records without \
+a matching record in other are paired with None."""
+        from ._join import left_outer_join
+
+        pairs = left_outer_join(
+            self.records,
+            other.records,
+            left_key,
+            right_key,
+        )
+        return RichSet.from_iterable(pairs)
+
+    @instrumented
+    def semi_join(
+        self,
+        other: RichSet[S],
+        *,
+        left_key: Callable[[T], Key],
+        right_key: Callable[[S], Key],
+    ) -> RichSet[T]:
+        """Returns a new RichSet with the records that have a matching \
+record in other. See join."""
+        from ._join import matched
+
+        return RichSet.from_iterable(
+            matched(
+                self.records,
+                other.records,
+                left_key,
+                right_key,
+                keep=True,
+            ),
+        )
+
+    @instrumented
+    def anti_join(
+        self,
+        other: RichSet[S],
+        *,
+        left_key: Callable[[T], Key],
+        right_key: Callable[[S], Key],
+    ) -> RichSet[T]:
+        """Returns a new RichSet with the records that have no matching \
+record in other. See join."""
+        from ._join import matched
+
+        return RichSet.from_iterable(
+            matched(
+                self.records,
+                other.records,
+                left_key,
+                right_key,
+                keep=False,
+            ),
         )
 
     # sorting
 
+    @instrumented
     def sorted(
         self,
         *,
@@ -548,10 +898,42 @@ unshifted to the beginning."""
         sorted_ = tuple(sorted(self.records, key=key, reverse=reverse))
         return RichSet.from_tuple(sorted_)
 
+    @instrumented
     def reversed(self) -> RichSet[T]:
         """Returns a new RichSet with reversed records."""
         return RichSet.from_tuple(self.records[::-1])
 
+    @instrumented
+    def top_k(
+        self,
+        k: int,
+        *,
+        key: Callable[[T], Comparable[S]],
+    ) -> RichSet[T]:
+        """Returns a new RichSet with the k records with the largest keys.
+
+        Same as sorted(key=key, reverse=True).page(0, k), including the
+        order of equal keys, but takes O(n log k) time and O(k) memory."""
+        from ._topk import check_k
+
+        check_k(k)
+        return RichSet.from_list(heapq.nlargest(k, self.records, key=key))
+
+    @instrumented
+    def bottom_k(
+        self,
+        k: int,
+        *,
+        key: Callable[[T], Comparable[S]],
+    ) -> RichSet[T]:
+        """Returns a new RichSet with the k records with the smallest keys.
+
+        Same as sorted(key=key).page(0, k). See top_k."""
+        from ._topk import check_k
+
+        check_k(k)
+        return RichSet.from_list(heapq.nsmallest(k, self.records, key=key))
+
     # statistics
 
     def is_empty(self) -> bool:
@@ -566,12 +948,231 @@ unshifted to the beginning."""
         """Returns the number of records in the RichSet."""
         return len(self.records)
 
+    @instrumented
     def count(self, predicate: Callable[[T], bool]) -> int:
         """Returns the number of records satisfying the predicate."""
         return sum(1 for r in self.records if predicate(r))
 
+    # parallel execution
+
+    @instrumented(count_key_calls=False)
+    def parallel_map(
+        self,
+        f: Callable[[T], S],
+        *,
+        executor: Executor | None = None,
+        workers: int | None = None,
+        chunksize: int | None = None,
+        mode: ParallelMode = "process",
+    ) -> RichSet[S]:
+        """Returns a new RichSet with mapped records, computed in parallel.
+
+        Records are sent to the executor in chunks and the results keep
+        the original order. If no executor is given, a pool with at most
+        the given number of workers (default: CPU count) is created for
+        this call: a process pool, or a thread pool if mode is "thread".
+        Pass an executor to reuse a pool across calls.
+        f and the records must be picklable for a process pool."""
+        from ._parallel import parallel_apply
+
+        return RichSet.from_list(
+            parallel_apply(
+                f,
+                self.records,
+                executor=executor,
+                workers=workers,
+                chunksize=chunksize,
+                mode=mode,
+            ),
+        )
+
+    @instrumented(count_key_calls=False)
+    def parallel_filter(
+        self,
+        f: Callable[[T], bool],
+        *,
+        executor: Executor | None = None,
+        workers: int | None = None,
+        chunksize: int | None = None,
+        mode: ParallelMode = "process",
+    ) -> RichSet[T]:
+        """Returns a new RichSet with filtered records, \
+the predicate being evaluated in parallel.
+
+        See parallel_map for the meaning of the keyword arguments."""
+        flags = self.parallel_map(
+            f,
+            executor=executor,
+            workers=workers,
+            chunksize=chunksize,
+            mode=mode,
+        )
+        return RichSet.from_iterable(itertools.compress(self.records, flags))
+
+    @instrumented(count_key_calls=False)
+    def parallel_count(
+        self,
+        predicate: Callable[[T], bool],
+        *,
+        executor: Executor | None = None,
+        workers: int | None = None,
+        chunksize: int | None = None,
+        mode: ParallelMode = "process",
+    ) -> int:
+        """Returns the number of records satisfying the predicate, \
+the predicate being evaluated in parallel.
+
+        See parallel_map for the meaning of the keyword arguments."""
+        flags = self.parallel_map(
+            predicate,
+            executor=executor,
+            workers=workers,
+            chunksize=chunksize,
+            mode=mode,
+        )
+        return flags.count(bool)
+
+    @instrumented(count_key_calls=False)
+    def parallel_indices_of(
+        self,
+        predicate: Callable[[T], bool],
+        *,
+        executor: Executor | None = None,
+        workers: int | None = None,
+        chunksize: int | None = None,
+        mode: ParallelMode = "process",
+    ) -> list[int]:
+        """Returns a list of indices of records satisfying the predicate, \
+the predicate being evaluated in parallel.
+
+        See parallel_map for the meaning of the keyword arguments."""
+        flags = self.parallel_map(
+            predicate,
+            executor=executor,
+            workers=workers,
+            chunksize=chunksize,
+            mode=mode,
+        )
+        return flags.indices_of(bool)
+
+    @instrumented(count_key_calls=False)
+    def parallel_group_by(
+        self,
+        key: Callable[[T], Key],
+        *,
+        executor: Executor | None = None,
+        workers: int | None = None,
+        chunksize: int | None = None,
+        mode: ParallelMode = "process",
+    ) -> dict[Key, RichSet[T]]:
+        """Returns a dict of RichSets grouped by the given key, \
+the keys being computed in parallel.
+
+        See parallel_map for the meaning of the keyword arguments."""
+        keys = self.parallel_map(
+            key,
+            executor=executor,
+            workers=workers,
+            chunksize=chunksize,
+            mode=mode,
+        )
+        return self._group_by_keys(keys)
+
+    @instrumented(count_key_calls=False)
+    def parallel_aggregate_by(
+        self,
+        *,
+        key: Callable[[T], Key],
+        fn: Callable[[S, T], S],
+        initial: S,
+        executor: Executor | None = None,
+        workers: int | None = None,
+        chunksize: int | None = None,
+        mode: ParallelMode = "process",
+    ) -> dict[Key, S]:
+        """Returns a dict of aggregated values grouped by the given key, \
+the keys being computed in parallel.
+
+        fn is applied in record order in the calling thread.
+        See parallel_map for the meaning of the other keyword arguments."""
+        keys = self.parallel_map(
+            key,
+            executor=executor,
+            workers=workers,
+            chunksize=chunksize,
+            mode=mode,
+        )
+        d: dict[Key, S] = {}
+        for k, r in zip(keys, self.records, strict=True):
+            d[k] = fn(d.get(k, initial), r)
+        return d
+
+    # asynchronous execution
+
+    async def amap(
+        self,
+        f: Callable[[T], Awaitable[S]],
+        *,
+        concurrency: int | None = None,
+    ) -> RichSet[S]:
+        """Returns a new RichSet with records mapped by a coroutine function.
+
+        At most concurrency calls run at a time (unbounded if None),
+        and the results keep the original order."""
+        from ._async import bounded_map
+
+        return RichSet.from_list(
+            await bounded_map(f, self.records, concurrency=concurrency),
+        )
+
+    async def afilter(
+        self,
+        f: Callable[[T], Awaitable[bool]],
+        *,
+        concurrency: int | None = None,
+    ) -> RichSet[T]:
+        """Returns a new RichSet with records filtered by \
+a coroutine function.
+
+        See amap for the meaning of concurrency."""
+        flags = await self.amap(f, concurrency=concurrency)
+        return RichSet.from_iterable(itertools.compress(self.records, flags))
+
+    async def aforeach(
+        self,
+        f: Callable[[T], Awaitable[object]],
+        *,
+        concurrency: int | None = None,
+    ) -> None:
+        """Awaits a coroutine function for each record.
+
+        See amap for the meaning of concurrency."""
+        await self.amap(f, concurrency=concurrency)
+
+    async def agroup_by(
+        self,
+        key: Callable[[T], Awaitable[Key]],
+        *,
+        concurrency: int | None = None,
+    ) -> dict[Key, RichSet[T]]:
+        """Returns a dict of RichSets grouped by keys \
+computed by a coroutine function.
+
+        See amap for the meaning of concurrency."""
+        keys = await self.amap(key, concurrency=concurrency)
+        return self._group_by_keys(keys)
+
     # groupings
 
+    def _group_by_keys(self, keys: Iterable[Key]) -> dict[Key, RichSet[T]]:
+        """Returns a dict of RichSets grouped by precomputed keys,
+        given in the order of the records."""
+        d: dict[Key, list[T]] = {}
+        for k, r in zip(keys, self.records, strict=True):
+            d.setdefault(k, []).append(r)
+        return {k: RichSet.from_list(v) for k, v in d.items()}
+
+    @instrumented
     def group_by(
         self,
         key: Callable[[T], Key],
@@ -582,13 +1183,22 @@ unshifted to the beginning."""
             for k, v in self.to_dict_of_list(key).items()
         }
 
+    @instrumented
     def size_of_group_by(
         self,
         key: Callable[[T], Key],
     ) -> dict[Key, int]:
-        """Returns a dict of sizes of RichSets grouped by the given key."""
-        return {k: v.size() for k, v in self.group_by(key).items()}
+        """Returns a dict of sizes of RichSets grouped by the given key.
 
+        Like the other aggregations below, this reads the records once
+        and keeps one value per group, without building the groups."""
+        sizes: dict[Key, int] = {}
+        for r in self.records:
+            k = key(r)
+            sizes[k] = sizes.get(k, 0) + 1
+        return sizes
+
+    @instrumented
     def count_of_group_by(
         self,
         *,
@@ -597,8 +1207,13 @@ unshifted to the beginning."""
     ) -> dict[Key, int]:
         """Returns a dict of the number of records satisfying \
 the predicate grouped by the given key."""
-        return {k: v.count(predicate) for k, v in self.group_by(key).items()}
+        counts: dict[Key, int] = {}
+        for r in self.records:
+            k = key(r)
+            counts[k] = counts.get(k, 0) + bool(predicate(r))
+        return counts
 
+    @instrumented
     def aggregate_by(
         self,
         *,
@@ -607,13 +1222,101 @@ the predicate grouped by the given key."""
         initial: S,
     ) -> dict[Key, S]:
         """Returns a dict of aggregated values grouped by the given key."""
-        return {
-            k: v.reduce(fn, initial=initial)
-            for k, v in self.group_by(key).items()
-        }
+        aggregated: dict[Key, S] = {}
+        for r in self.records:
+            k = key(r)
+            aggregated[k] = fn(aggregated.get(k, initial), r)
+        return aggregated
+
+    def _reduce_by(
+        self,
+        key: Callable[[T], Key],
+        value: Callable[[T], V],
+        fn: Callable[[V, V], V],
+    ) -> dict[Key, V]:
+        """Returns a dict of the values of each group reduced with fn."""
+        reduced: dict[Key, V] = {}
+        for r in self.records:
+            k = key(r)
+            v = value(r)
+            reduced[k] = fn(reduced[k], v) if k in reduced else v
+        return reduced
+
+    @instrumented
+    def sum_by(
+        self,
+        *,
+        key: Callable[[T], Key],
+        value: Callable[[T], S],
+    ) -> dict[Key, S]:
+        """Returns a dict of sums of values grouped by the given key."""
+        return self._reduce_by(key, value, operator.add)
+
+    @instrumented
+    def min_by(
+        self,
+        *,
+        key: Callable[[T], Key],
+        value: Callable[[T], S],
+    ) -> dict[Key, S]:
+        """Returns a dict of minimum values grouped by the given key."""
+        return self._reduce_by(key, value, min)  # type: ignore[arg-type]
+
+    @instrumented
+    def max_by(
+        self,
+        *,
+        key: Callable[[T], Key],
+        value: Callable[[T], S],
+    ) -> dict[Key, S]:
+        """Returns a dict of maximum values grouped by the given key."""
+        return self._reduce_by(key, value, max)  # type: ignore[arg-type]
+
+    @instrumented
+    def mean_by(
+        self,
+        *,
+        key: Callable[[T], Key],
+        value: Callable[[T], float],
+    ) -> dict[Key, float]:
+        """Returns a dict of arithmetic means of values grouped by \
+the given key."""
+        totals = self._reduce_by(
+            key,
+            lambda r: (value(r), 1),
+            lambda a, b: (a[0] + b[0], a[1] + b[1]),
+        )
+        return {k: total / n for k, (total, n) in totals.items()}
+
+    @instrumented
+    def top_k_by(
+        self,
+        k: int,
+        *,
+        group_key: Callable[[T], Key],
+        key: Callable[[T], Comparable[S]],
+        reverse: bool = True,
+    ) -> dict[Key, RichSet[T]]:
+        """Returns a dict of the top k records of each group by group_key.
+
+        Each group is ordered like top_k(k, key=key), or like
+        bottom_k(k, key=key) if reverse is False. Only k records per group
+        are kept while the records are read."""
+        from ._topk import check_k, top_k_by_group
+
+        check_k(k)
+        groups = top_k_by_group(
+            self.records,
+            k,
+            group_key=group_key,
+            key=key,
+            reverse=reverse,
+        )
+        return {g: RichSet.from_list(v) for g, v in groups.items()}
 
     # Paging
 
+    @instrumented
     def page(
         self,
         offset: int,
@@ -636,6 +1339,7 @@ the predicate grouped by the given key."""
             raise ValueError(f"limit must be non-negative, got {limit}")
         return RichSet.from_tuple(self.records[offset : offset + limit])
 
+    @instrumented
     def split_into_pages(
         self,
         size: int,
@@ -659,6 +1363,60 @@ the predicate grouped by the given key."""
             for offset in range(0, self.size(), size)
         ]
 
+    def iter_pages(self, size: int) -> Iterator[RichSet[T]]:
+        """Yields RichSets of the records split into pages, one at a time.
+
+        Like split_into_pages(), but only the current page is held, so
+        pages can be streamed with constant extra memory."""
+        if size <= 0:
+            raise ValueError(
+                f"size must be a positive integer, got {size}",
+            )
+        return (
+            self.page(offset=offset, limit=size)
+            for offset in range(0, self.size(), size)
+        )
+
+    def batched(self, size: int) -> Iterator[tuple[T, ...]]:
+        """Yields tuples of at most size records, one at a time.
+
+        Like iter_pages(), with each page as a plain tuple."""
+        return (page.records for page in self.iter_pages(size))
+
+    @instrumented(count_key_calls=False)
+    def page_after(
+        self,
+        cursor: object,
+        limit: int,
+        *,
+        key: Callable[[T], Comparable[S]] | SortedIndex[T],
+    ) -> RichSet[T]:
+        """Returns a new RichSet with the first limit records whose key \
+is greater than cursor, in key order.
+
+        This is keyset (cursor) pagination: pass the key of the last
+        record of a page as the cursor of the next one. key is either
+        a SortedIndex of these records, from sorted_index(), or an
+        expression such as F.id, whose sorted_index() is cached by
+        structure; pages are then found by bisection, so deep pages
+        cost O(log n + limit) rather than O(offset). Any other function
+        is not cached, since a new lambda per page would build and keep
+        a new index per page: each page scans the records instead, in
+        O(n log limit). Keys should be unique, otherwise records sharing
+        the key of the cursor are skipped; use a composite key such as
+        F(F.created_at, F.id) if needed."""
+        from ._expr import Expr
+        from ._index import SortedIndex
+
+        if limit < 0:
+            raise ValueError(f"limit must be non-negative, got {limit}")
+        if isinstance(key, Expr):
+            key = self.sorted_index(key)
+        if isinstance(key, SortedIndex):
+            return key.greater_than(cursor).page(0, limit)
+        after = (r for r in self.records if key(r) > cursor)  # type: ignore[operator]
+        return RichSet.from_list(heapq.nsmallest(limit, after, key=key))
+
 
 __all__ = [
     "OnDuplicateActions",
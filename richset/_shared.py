@@ -0,0 +1,171 @@
+from __future__ import annotations
+
+import io
+import struct
+import sys
+from multiprocessing.shared_memory import SharedMemory
+from types import TracebackType
+from typing import Any, cast
+
+from . import _mapped, _snapshot
+from ._columnar import ColumnarRichSet
+from ._mapped import MappedRecords, MappedRichSet
+from ._richset import RichSet
+
+# A shared memory block holds the length of its contents (uint64, little
+# endian; blocks may be larger than requested) and then either a snapshot
+# (see _snapshot) of ints, floats or dataclasses, or a MappedRichSet
+# records file of any other records. Attached processes read both in
+# place: snapshot columns become memoryviews of the block and mapped
+# records are decoded on access, so nothing is copied on attach.
+#
+# The memoryviews handed out are tracked, and released on close, since
+# the block cannot be closed while they are alive.
+
+_LENGTH = struct.Struct("<Q")
+
+
+def lay_out(
+    records: RichSet[Any] | ColumnarRichSet[Any],
+) -> tuple[int, list[_snapshot.Chunk]]:
+    """Returns the size of the contents of a block holding the records
+    and its chunks, each with its position."""
+    if isinstance(records, ColumnarRichSet):
+        return _snapshot.lay_out(_snapshot.encode_columns(records))
+    encoded = _snapshot.encode_records(records.records)
+    if encoded.kind != "pickle":
+        return _snapshot.lay_out(encoded)
+    f = io.BytesIO()
+    _mapped.write_records(f, records, _mapped.PICKLE_CODEC)
+    data = f.getbuffer()
+    return data.nbytes, [(0, data)]
+
+
+def buffer_of(memory: SharedMemory) -> memoryview:
+    if memory.buf is None:
+        raise ValueError("shared memory is closed")
+    return memory.buf
+
+
+class SharedRichSet:
+    """Records published in a shared memory block, which other
+    processes attach to by name without copying the records.
+
+    Both publish() and attach() return a context manager: on exit, the
+    block is closed, and unlinked (freed) by the publisher. Records read
+    from the block must not be used after that. A SharedRichSet is
+    pickled as its name, so sending it to a process pool attaches the
+    workers to the block."""
+
+    def __init__(self, memory: SharedMemory, *, owner: bool) -> None:
+        self.memory = memory
+        self.owner = owner
+        buffer = buffer_of(memory)
+        (length,) = _LENGTH.unpack(buffer[: _LENGTH.size])
+        self.data = buffer[_LENGTH.size : _LENGTH.size + length]
+        self._views: list[memoryview] = []
+        self._sources: list[MappedRecords[Any]] = []
+
+    @classmethod
+    def publish(
+        cls,
+        records: RichSet[Any] | ColumnarRichSet[Any],
+        *,
+        name: str | None = None,
+    ) -> SharedRichSet:
+        """Returns a new SharedRichSet with the records copied into
+        a new shared memory block."""
+        size, chunks = lay_out(records)
+        memory = SharedMemory(name, create=True, size=_LENGTH.size + size)
+        buffer = buffer_of(memory)
+        buffer[: _LENGTH.size] = _LENGTH.pack(size)
+        for position, chunk in chunks:
+            start = _LENGTH.size + position
+            buffer[start : start + len(memoryview(chunk))] = chunk
+        del buffer
+        return cls(memory, owner=True)
+
+    @classmethod
+    def attach(cls, name: str) -> SharedRichSet:
+        """Returns a SharedRichSet over the block published as name."""
+        if sys.version_info >= (3, 13):
+            return cls(SharedMemory(name, track=False), owner=False)
+        return cls(SharedMemory(name), owner=False)
+
+    @property
+    def name(self) -> str:
+        return self.memory.name
+
+    @property
+    def kind(self) -> str:
+        """Returns how the records are stored: "records" for mapped
+        records, or the kind of the snapshot."""
+        if bytes(self.data[: len(_mapped.MAGIC)]) == _mapped.MAGIC:
+            return "records"
+        return _snapshot.parse_header(self.data).kind
+
+    def close(self) -> None:
+        """Releases the records read from the block, then closes it."""
+        for source in self._sources:
+            source.close()
+        for view in self._views:
+            view.release()
+        self.data.release()
+        self.memory.close()
+
+    # magic methods
+
+    def __enter__(self) -> SharedRichSet:
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        self.close()
+        if self.owner:
+            self.memory.unlink()
+
+    def __reduce__(self) -> tuple[Any, tuple[str]]:
+        return SharedRichSet.attach, (self.name,)
+
+    # conversions
+
+    def to_richset(self) -> RichSet[Any]:
+        """Returns a new RichSet with a copy of the records."""
+        if self.kind == "records":
+            return MappedRichSet.from_buffer(self.data).to_richset()
+        return RichSet.from_tuple(_snapshot.records_of(self.data))
+
+    def mapped(self) -> MappedRichSet[Any]:
+        """Returns a MappedRichSet over the records, which are decoded
+        from the block when accessed. Only for "records"."""
+        if self.kind != "records":
+            raise ValueError(f"records are stored as {self.kind}")
+        mapped = MappedRichSet.from_buffer(self.data)
+        self._sources.append(mapped.source)
+        return mapped
+
+    def columnar(self) -> ColumnarRichSet[Any]:
+        """Returns a ColumnarRichSet of the records, whose int and float
+        columns are memoryviews of the block. Only for "columns"."""
+        if self.kind != "columns":
+            raise ValueError(f"records are stored as {self.kind}")
+        return _snapshot.columns_of(self.data, copy=False, views=self._views)
+
+    def array(self) -> memoryview:
+        """Returns the ints or floats as a memoryview of the block.
+        Only for "array"."""
+        if self.kind != "array":
+            raise ValueError(f"records are stored as {self.kind}")
+        _, state = _snapshot.load_state(self.data)
+        views = self._views
+        column = _snapshot.decode_column(state, copy=False, views=views)
+        return cast(memoryview, column)
+
+
+__all__ = [
+    "SharedRichSet",
+]
@@ -0,0 +1,376 @@
+from __future__ import annotations
+
+import array
+import dataclasses
+import hashlib
+import json
+import mmap as mmap_
+import os
+import pickle
+import struct
+import sys
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Literal, TypeAlias
+
+from ._columnar import Column, ColumnarRichSet, compact_column, field_names
+
+StrPath: TypeAlias = "str | os.PathLike[str]"
+
+# A snapshot file is laid out as:
+#
+#   MAGIC, the length of the header (uint32, little endian), the header
+#   (JSON), then the sections, each starting at a multiple of ALIGNMENT:
+#   the pickle payload (protocol 5) and its out-of-band buffers.
+#
+# The records are stored in one of three ways (the kind of the header):
+#
+# - "array": ints (that fit in 64 bits) or floats, in one buffer;
+# - "columns": dataclass records of one type, field by field as in
+#   ColumnarRichSet, with int and float columns in buffers, if that keeps
+#   all that pickling would (see stored_faithfully); records are rebuilt
+#   from their field values without calling __init__;
+# - "pickle": any other records, pickled in the payload.
+#
+# The buffers are never parsed: they are read into arrays, or with mmap,
+# used as memoryviews of the mapped file, whose pages are only read when
+# accessed. Snapshots are pickles, so only load files you trust.
+
+MAGIC = b"\x93RICHSET"
+FORMAT_VERSION = 1
+ALIGNMENT = 8
+_HEADER_LENGTH = struct.Struct("<I")
+
+Kind = Literal["array", "columns", "pickle"]
+# (typecode, PickleBuffer) for an array column, ("", list) otherwise
+EncodedColumn: TypeAlias = "tuple[str, Any]"
+
+
+@dataclass(frozen=True)
+class SnapshotHeader:
+    """The header of a snapshot file.
+
+    kind is how the records are stored (see above) and schema is
+    a fingerprint of their type: for "columns", of the dataclass and its
+    fields, which load() checks against the current dataclass. sections
+    are the (offset, length) of the payload and the buffers from
+    data_offset."""
+
+    kind: Kind
+    size: int
+    schema: str
+    byteorder: str
+    sections: tuple[tuple[int, int], ...]
+    data_offset: int = 0
+
+    def to_json(self) -> bytes:
+        return json.dumps(
+            {
+                "version": FORMAT_VERSION,
+                "kind": self.kind,
+                "size": self.size,
+                "schema": self.schema,
+                "byteorder": self.byteorder,
+                "sections": self.sections,
+            },
+        ).encode()
+
+
+def fingerprint(description: str) -> str:
+    return hashlib.sha256(description.encode()).hexdigest()[:16]
+
+
+def record_schema(record_type: type[Any]) -> str:
+    """Returns the fingerprint of a dataclass stored as columns."""
+    names = ",".join(field_names(record_type))
+    name = f"{record_type.__module__}.{record_type.__qualname__}"
+    return fingerprint(f"columns:{name}({names})")
+
+
+def align(offset: int) -> int:
+    return -(-offset // ALIGNMENT) * ALIGNMENT
+
+
+# encoding
+
+
+@dataclass(frozen=True)
+class Encoded:
+    kind: Kind
+    size: int
+    schema: str
+    state: object
+
+
+def encode_column(column: Column) -> EncodedColumn:
+    if isinstance(column, list):
+        return ("", column)
+    return (memoryview(column).format, pickle.PickleBuffer(column))
+
+
+def encode_columns(columnar: ColumnarRichSet[Any]) -> Encoded:
+    columns = {
+        name: encode_column(column)
+        for name, column in columnar.columns.items()
+    }
+    return Encoded(
+        "columns",
+        columnar.length,
+        record_schema(columnar.record_type),
+        (columnar.record_type, columns),
+    )
+
+
+PICKLING_METHODS = (
+    "__reduce__",
+    "__reduce_ex__",
+    "__getstate__",
+    "__setstate__",
+)
+# added by @dataclass(slots=True); they pickle the fields
+DATACLASS_PICKLING = ("_dataclass_getstate", "_dataclass_setstate")
+
+
+def default_pickling(record_type: type[Any]) -> bool:
+    """Returns True if the class does not customize pickling."""
+    methods = [
+        vars(cls)[name]
+        for cls in record_type.__mro__[:-1]
+        for name in PICKLING_METHODS
+        if name in vars(cls)
+    ]
+    return all(
+        getattr(m, "__qualname__", None) in DATACLASS_PICKLING for m in methods
+    )
+
+
+def stored_faithfully(records: tuple[Any, ...]) -> bool:
+    """Returns True if storing the records as columns keeps all that
+    pickling them would: they are dataclasses that do not customize
+    pickling, and hold no attributes other than their fields (such as
+    ones set by __post_init__, or cached properties)."""
+    record_type = type(records[0])
+    if not dataclasses.is_dataclass(record_type):
+        return False
+    if not default_pickling(record_type):
+        return False
+    fields = len(dataclasses.fields(record_type))
+    return all(len(getattr(r, "__dict__", ())) <= fields for r in records)
+
+
+def as_columns(records: tuple[Any, ...]) -> ColumnarRichSet[Any] | None:
+    """Returns the records as columns, or None if they are not
+    dataclasses of one type stored faithfully as columns."""
+    if not records or not stored_faithfully(records):
+        return None
+    try:
+        return ColumnarRichSet.from_iterable(records)
+    except (TypeError, AttributeError):  # mixed types, unset fields
+        return None
+
+
+def encode_records(records: tuple[Any, ...]) -> Encoded:
+    """Returns the most compact encoding of the records."""
+    column = compact_column(list(records))
+    if isinstance(column, array.array):
+        state = encode_column(column)
+        return Encoded("array", len(records), fingerprint("array"), state)
+    columnar = as_columns(records)
+    if columnar is not None:
+        return encode_columns(columnar)
+    return Encoded("pickle", len(records), fingerprint("pickle"), records)
+
+
+Chunk: TypeAlias = "tuple[int, bytes | memoryview]"
+
+
+def lay_out(encoded: Encoded) -> tuple[int, list[Chunk]]:
+    """Returns the size of the snapshot of encoded and its chunks,
+    each with its position."""
+    buffers: list[pickle.PickleBuffer] = []
+    payload = pickle.dumps(
+        encoded.state,
+        protocol=5,
+        buffer_callback=buffers.append,
+    )
+    sections = [memoryview(payload), *(b.raw() for b in buffers)]
+    offsets = []
+    end = 0
+    for section in sections:
+        offsets.append((align(end), section.nbytes))
+        end = align(end) + section.nbytes
+    header = SnapshotHeader(
+        encoded.kind,
+        encoded.size,
+        encoded.schema,
+        sys.byteorder,
+        tuple(offsets),
+    ).to_json()
+    prefix = MAGIC + _HEADER_LENGTH.pack(len(header)) + header
+    data_offset = align(len(prefix))
+    chunks: list[Chunk] = [(0, prefix)]
+    for (offset, _), section in zip(offsets, sections, strict=True):
+        chunks.append((data_offset + offset, section))
+    return data_offset + end, chunks
+
+
+def write(path: StrPath, encoded: Encoded) -> None:
+    _, chunks = lay_out(encoded)
+    with Path(path).open("wb") as f:
+        for position, chunk in chunks:
+            f.write(bytes(position - f.tell()))
+            f.write(chunk)
+
+
+# decoding
+
+
+def header_length(prefix: bytes | memoryview) -> int:
+    """Returns the length of the header from the start of a file."""
+    start = len(MAGIC) + _HEADER_LENGTH.size
+    if len(prefix) < start or bytes(prefix[: len(MAGIC)]) != MAGIC:
+        raise ValueError("not a RichSet snapshot")
+    (length,) = _HEADER_LENGTH.unpack(prefix[len(MAGIC) : start])
+    return int(length)
+
+
+def parse_header(data: bytes | memoryview) -> SnapshotHeader:
+    """Returns the header at the start of data, which must hold
+    at least the whole header."""
+    start = len(MAGIC) + _HEADER_LENGTH.size
+    length = header_length(data)
+    header = json.loads(bytes(data[start : start + length]))
+    if header.pop("version") != FORMAT_VERSION:
+        raise ValueError("unsupported RichSet snapshot version")
+    return SnapshotHeader(
+        kind=header["kind"],
+        size=header["size"],
+        schema=header["schema"],
+        byteorder=header["byteorder"],
+        sections=tuple(tuple(s) for s in header["sections"]),
+        data_offset=align(start + length),
+    )
+
+
+def read_header(path: StrPath) -> SnapshotHeader:
+    """Returns the header of a snapshot file, reading nothing else."""
+    with Path(path).open("rb") as f:
+        prefix = f.read(len(MAGIC) + _HEADER_LENGTH.size)
+        return parse_header(prefix + f.read(header_length(prefix)))
+
+
+def read(path: StrPath, *, mmap: bool) -> memoryview:
+    """Returns the contents of a file, read whole or, with mmap,
+    mapped."""
+    with Path(path).open("rb") as f:
+        if mmap:
+            return memoryview(
+                mmap_.mmap(f.fileno(), 0, access=mmap_.ACCESS_READ),
+            )
+        return memoryview(f.read())
+
+
+def load_state(data: memoryview) -> tuple[SnapshotHeader, Any]:
+    """Returns the header and the unpickled payload of a snapshot,
+    with the buffers as memoryviews of data."""
+    header = parse_header(data)
+    if header.byteorder != sys.byteorder:
+        raise ValueError(f"snapshot is {header.byteorder}-endian")
+    start = header.data_offset
+    payload, *buffers = (
+        data[start + offset : start + offset + length]
+        for offset, length in header.sections
+    )
+    state = pickle.loads(payload, buffers=buffers)  # noqa: S301
+    return header, state
+
+
+def decode_column(
+    encoded: EncodedColumn,
+    *,
+    copy: bool,
+    views: list[memoryview] | None = None,
+) -> Column:
+    """Returns the column, as a memoryview of the snapshot unless copy.
+
+    views collects the memoryviews returned, to release them later."""
+    code, data = encoded
+    if not code:
+        return data  # type: ignore[no-any-return]
+    if not copy:
+        view: memoryview = memoryview(data).cast(code)  # type: ignore[call-overload]
+        if views is not None:
+            views.append(view)
+        return view
+    column = array.array(code)
+    column.frombytes(data)
+    return column
+
+
+def decode_columns(
+    header: SnapshotHeader,
+    state: tuple[type[Any], dict[str, EncodedColumn]],
+    *,
+    copy: bool,
+    views: list[memoryview] | None = None,
+) -> ColumnarRichSet[Any]:
+    record_type, columns = state
+    if record_schema(record_type) != header.schema:
+        raise ValueError(
+            f"snapshot schema does not match the fields of {record_type}",
+        )
+    return ColumnarRichSet(
+        record_type,
+        {
+            name: decode_column(column, copy=copy, views=views)
+            for name, column in columns.items()
+        },
+        header.size,
+    )
+
+
+def records_of(data: memoryview) -> tuple[Any, ...]:
+    """Returns the records of a snapshot of any kind."""
+    header, state = load_state(data)
+    if header.kind == "array":
+        return tuple(decode_column(state, copy=False))
+    if header.kind == "columns":
+        return tuple(decode_columns(header, state, copy=False))
+    return tuple(state)
+
+
+def columns_of(
+    data: memoryview,
+    *,
+    copy: bool,
+    views: list[memoryview] | None = None,
+) -> ColumnarRichSet[Any]:
+    """Returns the records of a snapshot of dataclasses as columns."""
+    header, state = load_state(data)
+    if header.kind != "columns":
+        raise ValueError(f"not a snapshot of dataclasses: {header.kind}")
+    return decode_columns(header, state, copy=copy, views=views)
+
+
+def load_records(path: StrPath, *, mmap: bool) -> tuple[Any, ...]:
+    return records_of(read(path, mmap=mmap))
+
+
+def load_columns(path: StrPath, *, mmap: bool) -> ColumnarRichSet[Any]:
+    return columns_of(read(path, mmap=mmap), copy=not mmap)
+
+
+__all__ = [
+    "SnapshotHeader",
+    "columns_of",
+    "decode_column",
+    "encode_columns",
+    "encode_records",
+    "lay_out",
+    "load_columns",
+    "load_records",
+    "load_state",
+    "read_header",
+    "records_of",
+    "write",
+]
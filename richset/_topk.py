@@ -0,0 +1,63 @@
+from __future__ import annotations
+
+import heapq
+from collections.abc import Callable, Hashable, Iterable
+from dataclasses import dataclass
+from typing import Any, TypeVar
+
+from .comparable import Comparable
+
+T = TypeVar("T")
+Key = TypeVar("Key", bound=Hashable)
+
+
+@dataclass(frozen=True)
+class Descending:
+    """Wraps a value so that it compares in reverse order."""
+
+    value: Any
+
+    def __lt__(self, other: Descending) -> bool:
+        return bool(other.value < self.value)
+
+
+def check_k(k: int) -> None:
+    if k < 0:
+        raise ValueError(f"k must be non-negative, got {k}")
+
+
+def top_k_by_group(
+    records: Iterable[T],
+    k: int,
+    *,
+    group_key: Callable[[T], Key],
+    key: Callable[[T], Comparable[Any]],
+    reverse: bool,
+) -> dict[Key, list[T]]:
+    """Returns the first k records of each group as sorted by key,
+    like sorted(group, key=key, reverse=reverse)[:k] per group.
+
+    Each group keeps a heap of at most k entries, so this takes one pass
+    and O(groups * k) memory. The root of a heap is the entry that would
+    be dropped first: the worst key, and the latest record among equal
+    keys, which keeps ties in their original order."""
+    heaps: dict[Key, list[tuple[Any, int, T]]] = {}
+    for i, r in enumerate(records):
+        k_ = key(r)
+        entry = (k_ if reverse else Descending(k_), -i, r)
+        heap = heaps.setdefault(group_key(r), [])
+        if len(heap) < k:
+            heapq.heappush(heap, entry)
+        else:
+            heapq.heappushpop(heap, entry)
+    return {
+        g: [r for _, _, r in sorted(heap, reverse=True)]
+        for g, heap in heaps.items()
+    }
+
+
+__all__ = [
+    "Descending",
+    "check_k",
+    "top_k_by_group",
+]
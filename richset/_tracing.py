@@ -0,0 +1,146 @@
+from __future__ import annotations
+
+import json
+import threading
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from types import TracebackType
+from typing import IO, Protocol
+
+from ._instrumentation import (
+    CallRecord,
+    add_hook,
+    current_parent_id,
+    error_text,
+    new_id,
+    remove_hook,
+)
+
+# A Tracer is an instrumentation hook that turns each RichSet method call
+# into a Span, so tracing shares the disabled path of instrumentation:
+# no wrapper is installed while no hook is added. Spans opened with
+# Tracer.span() become the parents of the calls made inside them, so a
+# pipeline of calls shows up as one tree. A span is exported when it
+# ends, so children are exported before their parents.
+
+
+@dataclass(frozen=True)
+class Span:
+    """A RichSet method call, or a span opened with Tracer.span().
+
+    Times are from time.time_ns(). The sizes are the numbers of records
+    of the input and of the result, and None for opened spans. error is
+    the exception that ended the span (see CallRecord.error), if any."""
+
+    name: str
+    span_id: int
+    parent_id: int | None
+    start_ns: int
+    end_ns: int
+    input_size: int | None = None
+    output_size: int | None = None
+    error: str | None = None
+
+    @classmethod
+    def from_call(cls, call: CallRecord) -> Span:
+        return cls(
+            name=call.method,
+            span_id=call.call_id,
+            parent_id=call.parent_id,
+            start_ns=call.start_ns,
+            end_ns=call.end_ns,
+            input_size=call.input_size,
+            output_size=call.output_size,
+            error=call.error,
+        )
+
+
+class SpanExporter(Protocol):
+    def export(self, span: Span) -> None: ...
+
+
+class InMemoryExporter:
+    """Keeps the exported spans in a list."""
+
+    def __init__(self) -> None:
+        self.spans: list[Span] = []
+
+    def export(self, span: Span) -> None:
+        self.spans.append(span)
+
+    def children(self, parent: Span | None = None) -> list[Span]:
+        """Returns the spans whose parent is parent (or the root spans),
+        in the order they started."""
+        parent_id = None if parent is None else parent.span_id
+        children = [s for s in self.spans if s.parent_id == parent_id]
+        return sorted(children, key=lambda s: (s.start_ns, s.span_id))
+
+    def clear(self) -> None:
+        self.spans.clear()
+
+
+class JsonLinesExporter:
+    """Writes each exported span to a text stream as a line of JSON."""
+
+    def __init__(self, stream: IO[str]) -> None:
+        self.stream = stream
+        self._lock = threading.Lock()
+
+    def export(self, span: Span) -> None:
+        line = json.dumps(asdict(span)) + "\n"
+        with self._lock:
+            self.stream.write(line)
+
+
+class Tracer:
+    """Exports a span for each RichSet method call made while entered."""
+
+    def __init__(self, exporter: SpanExporter) -> None:
+        self.exporter = exporter
+
+    def __call__(self, call: CallRecord) -> None:
+        self.exporter.export(Span.from_call(call))
+
+    def __enter__(self) -> Tracer:
+        add_hook(self)
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        remove_hook(self)
+
+    @contextmanager
+    def span(self, name: str) -> Iterator[None]:
+        """Opens a span, exported on exit, that is the parent of the
+        spans started inside it."""
+        span_id = new_id()
+        parent_id = current_parent_id.get()
+        start_ns = time.time_ns()
+        token = current_parent_id.set(span_id)
+        error = None
+        try:
+            yield
+        except BaseException as e:
+            error = error_text(e)
+            raise
+        finally:
+            current_parent_id.reset(token)
+            end_ns = time.time_ns()
+            self.exporter.export(
+                Span(name, span_id, parent_id, start_ns, end_ns, error=error),
+            )
+
+
+__all__ = [
+    "InMemoryExporter",
+    "JsonLinesExporter",
+    "Span",
+    "SpanExporter",
+    "Tracer",
+]
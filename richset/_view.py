@@ -0,0 +1,174 @@
+from __future__ import annotations
+
+from collections.abc import Iterator
+from dataclasses import dataclass, field
+from typing import Generic, TypeVar
+
+from ._richset import RichSet
+
+T = TypeVar("T")
+
+
+@dataclass(frozen=True, eq=False)
+class RichSetView(Generic[T]):
+    """A read-only window over the records of a RichSet.
+
+    A view references the parent records through a range of indices
+    (offset, length and stride), so slicing, paging and reversing a view
+    are O(1) and copy nothing. Records are only copied when the view is
+    converted with to_richset(), to_list() or to_tuple()."""
+
+    source: tuple[T, ...] = field(repr=False)
+    indices: range
+
+    @classmethod
+    def of(cls, richset: RichSet[T]) -> RichSetView[T]:
+        """Returns a new RichSetView over all records of the RichSet."""
+        return cls(richset.records, range(richset.size()))
+
+    def _view(self, indices: range) -> RichSetView[T]:
+        return RichSetView(self.source, indices)
+
+    # magic methods
+
+    def __iter__(self) -> Iterator[T]:
+        return map(self.source.__getitem__, self.indices)
+
+    def __len__(self) -> int:
+        return self.size()
+
+    # conversions
+
+    def to_richset(self) -> RichSet[T]:
+        """Returns a new RichSet with a copy of the records in the view."""
+        return RichSet.from_tuple(self.to_tuple())
+
+    def to_list(self) -> list[T]:
+        """Returns a list of the records in the view."""
+        return list(self)
+
+    def to_tuple(self) -> tuple[T, ...]:
+        """Returns a tuple of the records in the view."""
+        if self.indices.step == 1:
+            return self.source[self.indices.start : self.indices.stop]
+        return tuple(self)
+
+    # list accessors
+
+    def first(self) -> T:
+        """Returns the first record in the view."""
+        if self.is_empty():
+            raise IndexError("RichSetView is empty")
+        return self.source[self.indices[0]]
+
+    def last(self) -> T:
+        """Returns the last record in the view."""
+        if self.is_empty():
+            raise IndexError("RichSetView is empty")
+        return self.source[self.indices[-1]]
+
+    def nth(self, index: int) -> T:
+        """Returns the record at the given index."""
+        if 0 <= index < self.size():
+            return self.source[self.indices[index]]
+        raise IndexError("index out of range")
+
+    # list manipulations
+
+    def slice(self, start: int, stop: int) -> RichSetView[T]:
+        """Returns a new view with sliced records."""
+        return self._view(self.indices[start:stop])
+
+    def divide_at(self, index: int) -> tuple[RichSetView[T], RichSetView[T]]:
+        """Returns a tuple of two views,
+        where the first contains records before the index,
+        and the second contains records after the index."""
+        return (
+            self.slice(0, index),
+            self.slice(index, self.size()),
+        )
+
+    def popped(self) -> tuple[T, RichSetView[T]]:
+        """Returns a tuple of the popped record and the remaining view.
+
+        This is O(1): the remaining view shares the records."""
+        if self.is_empty():
+            raise IndexError("pop from empty RichSetView")
+        return self.last(), self.slice(0, -1)
+
+    def popped_n(self, n: int) -> tuple[RichSetView[T], RichSetView[T]]:
+        """Returns a tuple of the popped records and the remaining view.
+
+        similar to divide_at, but popped records are reversed."""
+        if n < 0:
+            raise ValueError("n must be non-negative")
+        if self.size() < n:
+            raise IndexError("pop more than size")
+        if n == 0:
+            return self.slice(0, 0), self
+        remains, popped_r = self.divide_at(-n)
+        return popped_r.reversed(), remains
+
+    def shifted(self) -> tuple[T, RichSetView[T]]:
+        """Returns a tuple of the shifted record and the remaining view.
+
+        This is O(1): the remaining view shares the records."""
+        if self.is_empty():
+            raise IndexError("shift from empty RichSetView")
+        return self.first(), self.slice(1, self.size())
+
+    def shifted_n(self, n: int) -> tuple[RichSetView[T], RichSetView[T]]:
+        """Returns a tuple of the shifted records and the remaining view.
+
+        (same as divide_at(n))"""
+        if n < 0:
+            raise ValueError("n must be non-negative")
+        if self.size() < n:
+            raise IndexError("shift more than size")
+        return self.divide_at(n)
+
+    # sorting
+
+    def reversed(self) -> RichSetView[T]:
+        """Returns a new view with reversed records."""
+        return self._view(self.indices[::-1])
+
+    # statistics
+
+    def is_empty(self) -> bool:
+        """Returns True if the view is empty."""
+        return not self.indices
+
+    def size(self) -> int:
+        """Returns the number of records in the view."""
+        return len(self.indices)
+
+    # paging
+
+    def page(self, offset: int, limit: int) -> RichSetView[T]:
+        """Returns a new view with the records in the given page.
+
+        See RichSet.page for the meaning of offset and limit."""
+        if offset < 0:
+            raise ValueError(f"offset must be non-negative, got {offset}")
+        if limit < 0:
+            raise ValueError(f"limit must be non-negative, got {limit}")
+        return self.slice(offset, offset + limit)
+
+    def split_into_pages(self, size: int) -> list[RichSetView[T]]:
+        """Returns a list of views with the records split into pages.
+
+        Each page is a view, so no records are copied."""
+        if size <= 0:
+            raise ValueError(
+                f"size must be a positive integer, got {size}",
+            )
+        return [
+            self.page(offset=offset, limit=size)
+            for offset in range(0, self.size(), size)
+        ]
+
+
+__all__ = [
+    "RichSetView",
+]
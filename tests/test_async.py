@@ -0,0 +1,110 @@
+import asyncio
+from collections.abc import AsyncIterator
+from dataclasses import dataclass
+
+import pytest
+
+from richset import RichSet
+
+
+@dataclass(frozen=True)
+class Something:
+    id: int
+    name: str
+
+
+def make_richset(size: int) -> RichSet[Something]:
+    return RichSet.from_list([Something(i, str(i)) for i in range(size)])
+
+
+async def get_name(r: Something) -> str:
+    await asyncio.sleep(0.001 * (r.id % 3))
+    return r.name
+
+
+async def is_even(r: Something) -> bool:
+    await asyncio.sleep(0)
+    return r.id % 2 == 0
+
+
+def test_richset_from_async_iterable() -> None:
+    async def generate() -> AsyncIterator[int]:
+        for i in range(3):
+            await asyncio.sleep(0)
+            yield i
+
+    rs = asyncio.run(RichSet.from_async_iterable(generate()))
+    assert rs == RichSet.from_list([0, 1, 2])
+
+
+def test_richset_amap() -> None:
+    rs = make_richset(20)
+    expected = rs.map(lambda r: r.name)
+    assert asyncio.run(rs.amap(get_name)) == expected
+    assert asyncio.run(rs.amap(get_name, concurrency=3)) == expected
+    assert asyncio.run(rs.amap(get_name, concurrency=100)) == expected
+    assert (
+        asyncio.run(RichSet[Something].from_empty().amap(get_name))
+        == RichSet.from_empty()
+    )
+    with pytest.raises(ValueError, match="concurrency must be a positive"):
+        asyncio.run(rs.amap(get_name, concurrency=0))
+
+
+def test_richset_amap_bounds_concurrency() -> None:
+    running = 0
+    peak = 0
+
+    async def track(r: Something) -> int:
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.001)
+        running -= 1
+        return r.id
+
+    rs = make_richset(20)
+    assert asyncio.run(rs.amap(track, concurrency=4)) == rs.map(
+        lambda r: r.id,
+    )
+    assert peak == 4
+
+
+def test_richset_amap_propagates_errors() -> None:
+    async def fail_on_three(r: Something) -> int:
+        await asyncio.sleep(0)
+        if r.id == 3:
+            raise RuntimeError("three")
+        return r.id
+
+    with pytest.raises(RuntimeError, match="three"):
+        asyncio.run(make_richset(10).amap(fail_on_three, concurrency=2))
+
+
+def test_richset_afilter() -> None:
+    rs = make_richset(10)
+    assert asyncio.run(rs.afilter(is_even, concurrency=3)) == rs.filter(
+        lambda r: r.id % 2 == 0,
+    )
+
+
+def test_richset_aforeach() -> None:
+    seen: list[int] = []
+
+    async def visit(r: Something) -> None:
+        await asyncio.sleep(0)
+        seen.append(r.id)
+
+    asyncio.run(make_richset(5).aforeach(visit, concurrency=2))
+    assert sorted(seen) == [0, 1, 2, 3, 4]
+
+
+def test_richset_agroup_by() -> None:
+    async def get_parity(r: Something) -> int:
+        await asyncio.sleep(0)
+        return r.id % 2
+
+    rs = make_richset(10)
+    assert asyncio.run(rs.agroup_by(get_parity, concurrency=3)) == (
+        rs.group_by(lambda r: r.id % 2)
+    )
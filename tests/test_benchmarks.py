@@ -0,0 +1,108 @@
+import dataclasses
+import inspect
+from pathlib import Path
+
+import pytest
+
+from benchmarks import CASES, Fixture, load, regressions, run, save
+from benchmarks.__main__ import main
+from benchmarks.fixtures import SHAPES, Shape
+from benchmarks.runner import HEADER
+from richset import RichSet
+
+
+@pytest.mark.parametrize("shape", SHAPES)
+def test_benchmarks_cases_run(shape: Shape) -> None:
+    for i, hit_ratio in enumerate([0.0, 0.5, 1.0]):
+        fixture = Fixture.build(shape, 200, hit_ratio)
+        for case in CASES:
+            if case.measured_at(shape, first_hit_ratio=i == 0):
+                case.run(fixture.richset(), fixture)
+
+
+def test_benchmarks_cover_public_methods() -> None:
+    methods = {
+        name
+        for name, _ in inspect.getmembers(RichSet, callable)
+        if not name.startswith("_")
+    }
+    benchmarked = {case.name.split(".", 1)[1] for case in CASES}
+    assert methods - benchmarked == set()
+    assert len({case.name for case in CASES}) == len(CASES)
+
+
+def test_benchmarks_fixture_hit_ratio() -> None:
+    fixture = Fixture.build("dataclass", 100, 0.3)
+    records = set(fixture.records)
+    assert len(records) == 100
+    assert sum(r in records for r in fixture.other) == 30
+    keys = {fixture.key(r) for r in fixture.records}
+    assert sum(k in keys for k in fixture.probes) == 3
+
+
+def test_benchmarks_run_save_and_compare(tmp_path: Path) -> None:
+    cases = [c for c in CASES if c.name in ("sorting.sorted", "search.has")]
+    results = list(
+        run(
+            cases,
+            sizes=[10, 20],
+            shapes=["int"],
+            hit_ratios=[0.5, 1.0],
+            min_time=0.0,
+        ),
+    )
+    assert [(r.case, r.size, r.hit_ratio) for r in results] == [
+        ("search.has", 10, 0.5),
+        ("sorting.sorted", 10, 0.5),
+        ("search.has", 10, 1.0),
+        ("search.has", 20, 0.5),
+        ("sorting.sorted", 20, 0.5),
+        ("search.has", 20, 1.0),
+    ]
+    path = tmp_path / "results.json"
+    save(path, results)
+    assert load(path) == results
+    assert regressions(results, results) == []
+    slower = [
+        dataclasses.replace(r, seconds=r.seconds * 2 + 1) for r in results
+    ]
+    assert len(regressions(results, slower)) == len(results)
+    bigger = [
+        dataclasses.replace(r, peak_bytes=r.peak_bytes + 10**6)
+        for r in results
+    ]
+    found = regressions(results, bigger)
+    assert {r.metric for r in found} == {"peak memory"}
+
+
+def test_benchmarks_main(
+    tmp_path: Path,
+    capsys: pytest.CaptureFixture[str],
+) -> None:
+    path = tmp_path / "results.json"
+    args = ["paging.page", "--sizes", "1e2", "--shapes", "tuple"]
+    args += ["--min-time", "0"]
+    assert main([*args, "--output", str(path)]) == 0
+    assert [r.case for r in load(path)] == ["paging.page"]
+    capsys.readouterr()
+    assert main([*args, "--compare", str(path), "--threshold", "1e9"]) == 0
+    lines = capsys.readouterr().out.splitlines()
+    assert lines[0] == HEADER
+    assert [line.split()[:3] for line in lines[1:]] == [
+        ["paging.page", "tuple", "100"],
+    ]
+    faster = [
+        dataclasses.replace(r, seconds=r.seconds / 1e6) for r in load(path)
+    ]
+    save(path, faster)
+    assert main([*args, "--compare", str(path)]) == 1
+    regression = capsys.readouterr().out.splitlines()[-1]
+    assert regression.startswith(
+        "REGRESSION paging.page [tuple, size=100, hit_ratio=0.5]: time x",
+    )
+    assert main(["--list", "paging"]) == 0
+    assert capsys.readouterr().out.split() == [
+        case.name for case in CASES if case.group == "paging"
+    ]
+    assert main(["no-such-case"]) == 1
+    assert capsys.readouterr().out == "\n"
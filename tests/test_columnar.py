@@ -0,0 +1,177 @@
+import array
+from dataclasses import dataclass, field
+
+import pytest
+
+from richset import ColumnarRichSet, RichSet
+
+
+@dataclass(frozen=True)
+class Something:
+    id: int
+    name: str
+
+
+@dataclass(frozen=True)
+class Item:
+    id: int
+    price: float
+    name: str
+
+
+@dataclass(frozen=True)
+class Empty:
+    pass
+
+
+def make_items() -> RichSet[Item]:
+    return RichSet.from_list(
+        [
+            Item(3, 30.0, "c"),
+            Item(1, 10.0, "a"),
+            Item(2, 20.0, "b"),
+            Item(4, 10.0, "d"),
+        ],
+    )
+
+
+def test_columnar_from_iterable() -> None:
+    rs = make_items()
+    columnar = ColumnarRichSet.from_iterable(rs)
+    assert columnar.record_type is Item
+    assert columnar.size() == 4
+    assert len(columnar) == 4
+    assert not columnar.is_empty()
+    assert columnar.to_richset() == rs
+    assert columnar.to_list() == rs.to_list()
+    assert columnar.to_tuple() == rs.to_tuple()
+    assert rs.to_columnar().to_richset() == rs
+
+
+def test_columnar_columns() -> None:
+    columnar = make_items().to_columnar()
+    assert columnar.column("id") == array.array("q", [3, 1, 2, 4])
+    assert columnar.column("price") == array.array(
+        "d",
+        [30.0, 10.0, 20.0, 10.0],
+    )
+    assert columnar.column("name") == ["c", "a", "b", "d"]
+    with pytest.raises(KeyError):
+        columnar.column("unknown")
+
+
+def test_columnar_keeps_wide_ints_and_mixed_values_in_lists() -> None:
+    rs = RichSet.from_list([Something(2**70, "big"), Something(1, "one")])
+    assert rs.to_columnar().column("id") == [2**70, 1]
+    assert rs.to_columnar().to_richset() == rs
+    mixed = RichSet.from_list([Item(1, 1, "int"), Item(2, 2.5, "float")])
+    assert mixed.to_columnar().column("price") == [1, 2.5]
+    assert mixed.to_columnar().to_richset() == mixed
+
+
+def test_columnar_from_iterable_errors() -> None:
+    with pytest.raises(ValueError, match="record_type is required"):
+        ColumnarRichSet.from_iterable([])
+    with pytest.raises(TypeError, match="not a dataclass"):
+        ColumnarRichSet.from_iterable([1, 2])
+    with pytest.raises(TypeError, match="record is not a"):
+        ColumnarRichSet.from_iterable([Something(1, "one"), 2])
+
+
+@dataclass(frozen=True, kw_only=True)
+class KeywordOnly:
+    id: int
+    name: str
+
+
+@dataclass
+class Incremented:
+    x: int
+
+    def __post_init__(self) -> None:
+        self.x += 1
+
+
+@dataclass(frozen=True)
+class Derived:
+    id: int
+    double: int = field(init=False)
+
+    def __post_init__(self) -> None:
+        object.__setattr__(self, "double", self.id * 2)
+
+
+@dataclass(frozen=True, slots=True)
+class Slotted:
+    id: int
+    name: str
+
+
+@pytest.mark.parametrize(
+    "records",
+    [
+        [KeywordOnly(id=1, name="one"), KeywordOnly(id=2, name="two")],
+        [Incremented(1), Incremented(2)],
+        [Derived(1), Derived(2)],
+        [Slotted(1, "one"), Slotted(2, "two")],
+    ],
+)
+def test_columnar_records_are_rebuilt_as_stored(records: list[object]) -> None:
+    columnar = ColumnarRichSet.from_iterable(records)
+    assert columnar.to_list() == records
+    assert columnar.nth(1) == records[1]
+    reversed_ = columnar.sorted(key=lambda r: -records.index(r))
+    assert reversed_.to_list() == records[::-1]
+
+
+def test_columnar_empty() -> None:
+    columnar = RichSet[Item].from_empty().to_columnar(record_type=Item)
+    assert columnar.is_empty()
+    assert columnar.to_list() == []
+    assert columnar.sorted(key="id").to_list() == []
+    assert columnar.group_by("id") == {}
+    fieldless = ColumnarRichSet.from_iterable([Empty(), Empty()])
+    assert fieldless.to_list() == [Empty(), Empty()]
+
+
+def test_columnar_nth() -> None:
+    columnar = make_items().to_columnar()
+    assert columnar.nth(1) == Item(1, 10.0, "a")
+    with pytest.raises(IndexError):
+        columnar.nth(4)
+
+
+def test_columnar_filter() -> None:
+    rs = make_items()
+    columnar = rs.to_columnar()
+    filtered = columnar.filter(lambda r: r.price > 10)
+    assert filtered.to_richset() == rs.filter(lambda r: r.price > 10)
+    assert filtered.column("id") == array.array("q", [3, 2])
+
+
+def test_columnar_sorted() -> None:
+    rs = make_items()
+    columnar = rs.to_columnar()
+    for reverse in (False, True):
+        assert columnar.sorted(
+            key="price",
+            reverse=reverse,
+        ).to_richset() == rs.sorted(key=lambda r: r.price, reverse=reverse)
+        assert columnar.sorted(
+            key=lambda r: r.name,
+            reverse=reverse,
+        ).to_richset() == rs.sorted(key=lambda r: r.name, reverse=reverse)
+
+
+def test_columnar_group_by() -> None:
+    rs = make_items()
+    columnar = rs.to_columnar()
+    by_field = {
+        k: v.to_richset() for k, v in columnar.group_by("price").items()
+    }
+    assert by_field == rs.group_by(lambda r: r.price)
+    by_function = {
+        k: v.to_richset()
+        for k, v in columnar.group_by(lambda r: r.id % 2).items()
+    }
+    assert by_function == rs.group_by(lambda r: r.id % 2)
@@ -0,0 +1,143 @@
+from dataclasses import dataclass
+
+import pytest
+
+from richset import ColumnarRichSet, F, RichSet
+
+
+@dataclass(frozen=True)
+class Something:
+    id: int
+    name: str
+
+
+@dataclass(frozen=True)
+class Wrapper:
+    inner: Something
+
+
+def make_richset() -> RichSet[Something]:
+    return RichSet.from_list(
+        [
+            Something(1, "john"),
+            Something(2, "jane"),
+            Something(3, "john"),
+        ],
+    )
+
+
+def test_expr_field() -> None:
+    assert F.id(Something(1, "john")) == 1
+    assert F.inner.name(Wrapper(Something(1, "john"))) == "john"
+    assert repr(F.inner.name) == "F.inner.name"
+
+
+def test_expr_compare() -> None:
+    r = Something(2, "jane")
+    assert (F.id == 2)(r)
+    assert (F.id != 1)(r)
+    assert (F.id < 3)(r)
+    assert (F.id <= 2)(r)
+    assert (F.id > 1)(r)
+    assert (F.id >= 2)(r)
+    assert not (F.id > 2)(r)
+    assert (1 < F.id)(r)  # noqa: SIM300
+    assert (F.name == F.name)(r)
+    assert repr(F.id > 1) == "(F.id > 1)"
+
+
+def test_expr_logical() -> None:
+    r = Something(2, "jane")
+    assert ((F.id > 1) & (F.name == "jane"))(r)
+    assert not ((F.id > 2) & (F.name == "jane"))(r)
+    assert ((F.id > 2) | (F.name == "jane"))(r)
+    assert (~(F.id > 2))(r)
+    assert repr(~(F.id > 2) | (F.id == 1)) == "(~(F.id > 2) | (F.id == 1))"
+
+
+def test_expr_methods() -> None:
+    r = Something(2, "jane")
+    assert F.name.startswith("ja")(r)
+    assert not F.name.endswith("ja")(r)
+    assert F.id.is_in([1, 2])(r)
+    assert not F.id.is_in([3])(r)
+    assert repr(F.name.startswith("ja")) == "F.name.startswith('ja')"
+
+
+def test_expr_composite() -> None:
+    assert F(F.name, F.id)(Something(2, "jane")) == ("jane", 2)
+    assert repr(F(F.name, F.id)) == "F(F.name, F.id)"
+
+
+def test_expr_no_truth_value() -> None:
+    with pytest.raises(TypeError):
+        bool(F.id > 1)
+    with pytest.raises(TypeError):
+        hash(F.id)
+
+
+def test_expr_identity() -> None:
+    assert (F.id > 1).identity == (F.id > 1).identity
+    assert (F.id > 1).identity != (F.id > 2).identity
+    assert (F.id > 1).identity != (F.id >= 1).identity
+    assert F(F.a, F.b).identity != F(F.b, F.a).identity
+    assert (F.id == 1).identity != (F.id == True).identity  # noqa: E712
+
+
+def test_expr_private_names() -> None:
+    with pytest.raises(AttributeError):
+        F._id  # noqa: B018
+    with pytest.raises(AttributeError):
+        F.id._name  # noqa: B018
+
+
+def test_richset_accepts_expr() -> None:
+    rs = make_richset()
+    assert rs.filter(F.name == "john").to_list() == [
+        Something(1, "john"),
+        Something(3, "john"),
+    ]
+    assert rs.index_of(F.id == 2) == 1
+    assert rs.sorted(key=F(F.name, F.id), reverse=True).to_list() == [
+        Something(3, "john"),
+        Something(1, "john"),
+        Something(2, "jane"),
+    ]
+    assert rs.map(F.name).to_list() == ["john", "jane", "john"]
+    assert rs.unique(F.name).to_list() == [
+        Something(1, "john"),
+        Something(2, "jane"),
+    ]
+    assert rs.size_of_group_by(F.name) == {"john": 2, "jane": 1}
+    assert rs.to_dict(F.id)[2] == Something(2, "jane")
+    assert rs.lazy().filter(F.id > 1).map(F.name).to_list() == [
+        "jane",
+        "john",
+    ]
+
+
+def test_richset_index_by_expr_is_cached_by_structure() -> None:
+    rs = make_richset()
+    assert rs.index_by(F.name) is rs.index_by(F.name)
+    assert rs.index_by(F.name) is not rs.index_by(F.id)
+    assert rs.sorted_index(F.id) is rs.sorted_index(F.id)
+    assert rs.index_by(F.name).get_all("john").size() == 2
+
+
+def test_columnar_accepts_expr() -> None:
+    columnar = ColumnarRichSet.from_richset(make_richset())
+    assert columnar.filter(F.id > 1).to_list() == [
+        Something(2, "jane"),
+        Something(3, "john"),
+    ]
+    assert columnar.filter(F.name.startswith("ja")).to_list() == [
+        Something(2, "jane"),
+    ]
+    assert columnar.count(F.name == "john") == 2
+    assert columnar.count(F.id >= F.id) == 3
+    assert columnar.sorted(key=F.id, reverse=True).to_list() == [
+        Something(3, "john"),
+        Something(2, "jane"),
+        Something(1, "john"),
+    ]
+    assert columnar.size_of_group_by(F.name) == {"john": 2, "jane": 1}
@@ -1,5 +1,7 @@
 from dataclasses import dataclass
 
+import pytest
+
 from richset import RichSet
 
 
@@ -89,3 +91,108 @@ def test_richset_aggregate_by() -> None:
         0: "two",
         1: "onethree",
     }
+
+
+def test_richset_top_k_by() -> None:
+    rs = RichSet.from_list(
+        [Something(i % 5, f"g{i % 2}") for i in range(20)],
+    )
+
+    def group_key(r: Something) -> str:
+        return r.name
+
+    def key(r: Something) -> int:
+        return r.id
+
+    for k in range(6):
+        groups = rs.group_by(group_key)
+        assert rs.top_k_by(k, group_key=group_key, key=key) == {
+            g: v.top_k(k, key=key) for g, v in groups.items()
+        }
+        assert rs.top_k_by(
+            k,
+            group_key=group_key,
+            key=key,
+            reverse=False,
+        ) == {g: v.bottom_k(k, key=key) for g, v in groups.items()}
+    assert list(rs.top_k_by(2, group_key=group_key, key=key)) == ["g0", "g1"]
+    assert rs.top_k_by(1, group_key=group_key, key=key)["g1"].to_list() == [
+        Something(4, "g1"),
+    ]
+    with pytest.raises(ValueError):
+        rs.top_k_by(-1, group_key=group_key, key=key)
+
+
+def test_richset_aggregations_do_not_build_groups(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    def fail(*_: object, **__: object) -> None:
+        raise AssertionError("groups were built")
+
+    monkeypatch.setattr(RichSet, "group_by", fail)
+    monkeypatch.setattr(RichSet, "to_dict_of_list", fail)
+    calls: list[int] = []
+
+    def key(r: Something) -> int:
+        calls.append(r.id)
+        return r.id % 2
+
+    rs = RichSet.from_list([Something(i, str(i)) for i in range(5)])
+    assert rs.size_of_group_by(key) == {0: 3, 1: 2}
+    assert calls == [0, 1, 2, 3, 4]
+    assert rs.count_of_group_by(
+        key=key,
+        predicate=lambda r: r.id > 2,
+    ) == {0: 1, 1: 1}
+    assert rs.aggregate_by(
+        key=key,
+        fn=lambda a, r: a + r.name,
+        initial="",
+    ) == {0: "024", 1: "13"}
+
+
+def test_richset_sum_by() -> None:
+    rs = RichSet.from_list([Something(i, str(i)) for i in range(5)])
+    assert rs.sum_by(key=lambda r: r.id % 2, value=lambda r: r.id) == {
+        0: 6,
+        1: 4,
+    }
+    assert rs.sum_by(key=lambda r: r.id % 2, value=lambda r: r.name) == {
+        0: "024",
+        1: "13",
+    }
+    assert RichSet.from_list([]).sum_by(key=len, value=len) == {}
+
+
+def test_richset_min_by_max_by() -> None:
+    rs = RichSet.from_list(
+        [
+            Something(3, "a"),
+            Something(1, "b"),
+            Something(2, "a"),
+            Something(5, "b"),
+        ],
+    )
+    assert rs.min_by(key=lambda r: r.name, value=lambda r: r.id) == {
+        "a": 2,
+        "b": 1,
+    }
+    assert rs.max_by(key=lambda r: r.name, value=lambda r: r.id) == {
+        "a": 3,
+        "b": 5,
+    }
+
+
+def test_richset_mean_by() -> None:
+    rs = RichSet.from_list(
+        [
+            Something(3, "a"),
+            Something(1, "b"),
+            Something(2, "a"),
+            Something(6, "b"),
+        ],
+    )
+    assert rs.mean_by(key=lambda r: r.name, value=lambda r: r.id) == {
+        "a": 2.5,
+        "b": 3.5,
+    }
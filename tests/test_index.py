@@ -0,0 +1,148 @@
+import pickle
+from dataclasses import dataclass
+
+import pytest
+
+from richset import F, KeyIndex, RichSet, SortedIndex
+
+
+@dataclass(frozen=True)
+class Something:
+    id: int
+    name: str
+
+
+def get_name(r: Something) -> str:
+    return r.name
+
+
+def get_id(r: Something) -> int:
+    return r.id
+
+
+def test_richset_index_by() -> None:
+    rs = RichSet.from_list(
+        [
+            Something(1, "john"),
+            Something(2, "john"),
+            Something(3, "jane"),
+        ],
+    )
+    index = rs.index_by(get_name)
+    assert isinstance(index, KeyIndex)
+    assert len(index) == 2
+    assert set(index.keys()) == {"john", "jane"}
+    assert index.get("john") == Something(1, "john")
+    assert index.get("jane") == Something(3, "jane")
+    assert index.get("bob") is None
+    assert index.get("bob", Something(-1, "default")) == Something(
+        -1,
+        "default",
+    )
+    assert index.get_all("john").to_list() == [
+        Something(1, "john"),
+        Something(2, "john"),
+    ]
+    assert index.get_all("bob").to_list() == []
+    assert index.contains_key("jane")
+    assert not index.contains_key("bob")
+    assert index.get_many(["jane", "bob", "john"]) == [
+        Something(3, "jane"),
+        None,
+        Something(1, "john"),
+    ]
+
+
+def test_richset_index_by_is_cached() -> None:
+    rs = RichSet.from_list([Something(1, "john"), Something(2, "jane")])
+    assert rs.index_by(get_name) is rs.index_by(get_name)
+
+    assert rs.index_by(get_id) is rs.index_by(get_id)
+    assert rs.index_by(get_id).get(2) == Something(2, "jane")
+
+
+def test_richset_index_by_lambda_is_not_cached() -> None:
+    rs = RichSet.from_list([Something(i, str(i)) for i in range(20)])
+    for _ in range(50):
+        assert rs.index_by(lambda r: r.id % 7).get(3) == Something(3, "3")
+        assert rs.sorted_index(lambda r: -r.id).floor(-5) == Something(5, "5")
+    assert rs.__dict__.get("_caches", {}) == {}
+    assert rs.index_by(get_id) is rs.index_by(get_id)
+    assert rs.sorted_index(F.id) is rs.sorted_index(F.id)
+    assert len(rs.__dict__["_caches"]) == 2
+
+
+def test_richset_index_by_empty() -> None:
+    index = RichSet[Something].from_empty().index_by(get_name)
+    assert len(index) == 0
+    assert index.get("john") is None
+
+
+def test_richset_pickle_drops_indexes() -> None:
+    rs = RichSet.from_list([Something(1, "john"), Something(2, "jane")])
+
+    def key(r: Something) -> int:
+        return r.id
+
+    rs.index_by(key)
+    restored = pickle.loads(pickle.dumps(rs))  # noqa: S301
+    assert restored == rs
+    assert restored.index_by(get_name).get("jane") == Something(2, "jane")
+
+
+def test_richset_sorted_index() -> None:
+    rs = RichSet.from_list(
+        [
+            Something(5, "five"),
+            Something(1, "one"),
+            Something(3, "three"),
+            Something(3, "three again"),
+            Something(8, "eight"),
+        ],
+    )
+    index = rs.sorted_index(get_id)
+    assert isinstance(index, SortedIndex)
+    assert index is rs.sorted_index(get_id)
+    assert len(index) == 5
+    assert index.to_list() == rs.sorted(key=get_id).to_list()
+    assert index.to_richset() == rs.sorted(key=get_id)
+    assert [r.id for r in index.between(3, 5)] == [3, 3, 5]
+    assert [r.id for r in index.between(4, 4)] == []
+    assert [r.id for r in index.between(6, 2)] == []
+    assert [r.id for r in index.less_than(3)] == [1]
+    assert [r.id for r in index.less_equal(3)] == [1, 3, 3]
+    assert [r.id for r in index.greater_than(3)] == [5, 8]
+    assert [r.id for r in index.greater_equal(3)] == [3, 3, 5, 8]
+    assert [r.id for r in index.greater_equal(3).less_than(8)] == [3, 3, 5]
+
+
+def test_richset_sorted_index_floor_ceil() -> None:
+    rs = RichSet.from_list(
+        [
+            Something(1, "one"),
+            Something(3, "three"),
+            Something(3, "three again"),
+            Something(5, "five"),
+        ],
+    )
+    index = rs.sorted_index(get_id)
+    assert index.floor(3) == Something(3, "three again")
+    assert index.floor(4) == Something(3, "three again")
+    assert index.floor(0) is None
+    assert index.ceil(3) == Something(3, "three")
+    assert index.ceil(2) == Something(3, "three")
+    assert index.ceil(6) is None
+    assert index.greater_than(1).floor(1) is None
+    assert index.less_than(5).ceil(4) is None
+
+
+def test_richset_sorted_index_page() -> None:
+    rs = RichSet.from_list([Something(i, str(i)) for i in range(10)])
+    window = rs.sorted_index(get_id).between(2, 7)
+    assert [r.id for r in window.page(0, 2)] == [2, 3]
+    assert [r.id for r in window.page(4, 3)] == [6, 7]
+    assert window.page(10, 3).to_list() == []
+    with pytest.raises(ValueError, match="offset must be non-negative"):
+        window.page(-1, 2)
+    with pytest.raises(ValueError, match="limit must be non-negative"):
+        window.page(0, -1)
@@ -0,0 +1,222 @@
+import tracemalloc
+from dataclasses import dataclass
+
+import pytest
+
+from richset import (
+    CallRecord,
+    F,
+    Instrumentation,
+    RichSet,
+    add_hook,
+    remove_hook,
+)
+from richset._instrumentation import hooks
+
+
+@dataclass(frozen=True)
+class Something:
+    id: int
+    name: str
+
+
+def make_richset() -> RichSet[Something]:
+    return RichSet.from_list(
+        [
+            Something(1, "one"),
+            Something(2, "two"),
+            Something(3, "three"),
+            Something(4, "four"),
+        ],
+    )
+
+
+def test_richset_instrumentation() -> None:
+    rs = make_richset()
+    with Instrumentation() as stats:
+        filtered = rs.filter(lambda r: r.id % 2 == 0)
+        filtered.map(lambda r: r.name)
+    assert [c.method for c in stats.calls] == ["filter", "map"]
+    first, second = stats.calls
+    assert first.input_size == 4
+    assert first.output_size == 2
+    assert first.key_calls == 4
+    assert first.allocated_bytes is None
+    assert first.depth == 0
+    assert first.seconds >= 0
+    assert second.input_size == 2
+    assert second.key_calls == 2
+    assert not hooks.active
+
+
+def test_richset_instrumentation_disabled() -> None:
+    rs = make_richset()
+    stats = Instrumentation()
+    rs.filter(lambda r: r.id % 2 == 0)
+    assert stats.calls == []
+    assert not hooks.active
+
+
+def test_richset_instrumentation_installs_wrappers() -> None:
+    rs = make_richset()
+    # no wrapper at all while no hook is added
+    assert not hasattr(RichSet.has, "__wrapped__")
+    has = rs.has
+    with Instrumentation() as stats:
+        assert hasattr(RichSet.has, "__wrapped__")
+        with Instrumentation() as inner:
+            rs.has(Something(1, "one"))
+        assert hasattr(RichSet.has, "__wrapped__")
+        # looked up before the hook was added
+        has(Something(1, "one"))
+    assert not hasattr(RichSet.has, "__wrapped__")
+    assert [c.method for c in stats.calls] == ["has"]
+    assert [c.method for c in inner.calls] == ["has"]
+    assert rs.has(Something(1, "one"))
+
+
+def test_richset_instrumentation_nested() -> None:
+    rs = make_richset()
+    with Instrumentation() as outer, Instrumentation(nested=True) as inner:
+        rs.group_by(lambda r: r.id % 2)
+    assert [c.method for c in outer.calls] == ["group_by"]
+    assert [(c.method, c.depth) for c in inner.calls] == [
+        ("to_dict_of_list", 1),
+        ("group_by", 0),
+    ]
+    assert outer.calls[0].key_calls == 4
+    assert outer.calls[0].output_size == 2
+
+
+def test_richset_instrumentation_key_calls_not_counted() -> None:
+    rs = make_richset()
+
+    def key(r: Something) -> int:
+        return r.id
+
+    with Instrumentation() as stats:
+        rs.index_by(key)
+        rs.index_by(key)
+        rs.filter(F.id > 2)
+    assert [c.key_calls for c in stats.calls] == [None, None, 0]
+    # the key is passed unwrapped, so the index is cached by it
+    assert rs.index_by(key) is rs.index_by(key)
+
+
+def test_richset_instrumentation_allocated_bytes() -> None:
+    rs = RichSet.from_list(list(range(1000)))
+    tracemalloc.start()
+    try:
+        with Instrumentation() as stats:
+            rs.map(lambda r: [r])
+    finally:
+        tracemalloc.stop()
+    allocated = stats.calls[0].allocated_bytes
+    assert allocated is not None
+    assert allocated > 1000 * 8
+
+
+def test_richset_instrumentation_keeps_caller_peak() -> None:
+    rs = RichSet.from_list(list(range(1000)))
+    tracemalloc.start()
+    try:
+        big = [[i] for i in range(10000)]
+        del big
+        peak = tracemalloc.get_traced_memory()[1]
+        with Instrumentation(nested=True) as stats:
+            rs.map(lambda r: r + 1)
+            rs.group_by(lambda r: r % 2)
+        assert tracemalloc.get_traced_memory()[1] == peak
+    finally:
+        tracemalloc.stop()
+    # below the peak, the memory held at the end of each call is reported
+    allocated = [c.allocated_bytes for c in stats.calls]
+    assert all(a is not None and a > 0 for a in allocated)
+    assert [c.method for c in stats.calls] == [
+        "map",
+        "to_dict_of_list",
+        "group_by",
+    ]
+
+
+def test_richset_instrumentation_callable_records() -> None:
+    def f(_: int) -> int:
+        return 0
+
+    def g(_: int) -> int:
+        return 1
+
+    rs = RichSet.from_list([f, g])
+    with Instrumentation() as stats:
+        assert rs.has(f)
+        assert rs.pushed(f).records[-1] is f
+        assert rs.unshifted_all([g]).first() is g
+        assert rs.index_of(lambda h: h is g) == 1
+    assert [c.key_calls for c in stats.calls] == [0, 0, 0, 2]
+
+
+def test_richset_instrumentation_exception() -> None:
+    rs = make_richset()
+
+    def fail(_: Something) -> bool:
+        raise ValueError("bad record")
+
+    with Instrumentation() as stats:
+        with pytest.raises(ValueError, match="bad record"):
+            rs.filter(fail)
+        rs.filter(lambda r: r.id == 1)
+    assert [c.method for c in stats.calls] == ["filter", "filter"]
+    failed, succeeded = stats.calls
+    assert failed.error == "ValueError: bad record"
+    assert failed.output_size is None
+    assert failed.key_calls == 1
+    assert failed.input_size == 4
+    assert succeeded.error is None
+    assert succeeded.depth == 0
+
+
+def test_richset_instrumentation_callback() -> None:
+    rs = make_richset()
+    received: list[CallRecord] = []
+    with Instrumentation(received.append) as stats:
+        rs.sorted(key=lambda r: r.name)
+    assert received == stats.calls
+    assert received[0].method == "sorted"
+
+
+def test_richset_instrumentation_summary() -> None:
+    rs = make_richset()
+    with Instrumentation() as stats:
+        rs.filter(lambda r: r.id > 1)
+        rs.filter(lambda r: r.id > 2)
+        rs.count(lambda r: r.id > 3)
+    summaries = {s.method: s for s in stats.summary()}
+    assert set(summaries) == {"filter", "count"}
+    summary = summaries["filter"]
+    assert summary.calls == 2
+    assert summary.input_size == 8
+    assert summary.output_size == 5
+    assert summary.key_calls == 8
+    assert summary.allocated_bytes is None
+    assert summary.max_seconds <= summary.seconds
+    assert summary.mean_seconds == summary.seconds / 2
+    assert summaries["count"].output_size == 0
+    lines = stats.summary_table().splitlines()
+    assert lines[0].split()[:3] == ["method", "calls", "total"]
+    assert sorted(line.split()[0] for line in lines[1:]) == [
+        "count",
+        "filter",
+    ]
+
+
+def test_richset_add_hook() -> None:
+    rs = make_richset()
+    received: list[CallRecord] = []
+    add_hook(received.append)
+    try:
+        rs.to_list()
+    finally:
+        remove_hook(received.append)
+    rs.to_list()
+    assert [c.method for c in received] == ["to_list"]
+    assert not hooks.active
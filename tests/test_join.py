@@ -0,0 +1,168 @@
+from dataclasses import dataclass
+
+import pytest
+
+from richset import RichSet, _join
+
+
+@dataclass(frozen=True)
+class Something:
+    id: int
+    name: str
+
+
+@dataclass(frozen=True)
+class Foo:
+    something_id: int
+    value: str
+
+
+def get_id(r: Something) -> int:
+    return r.id
+
+
+def get_something_id(r: Foo) -> int:
+    return r.something_id
+
+
+def make_sides(
+    left_ids: list[int],
+    right_ids: list[int],
+) -> tuple[RichSet[Something], RichSet[Foo]]:
+    left = RichSet.from_list(
+        [Something(i, f"s{n}") for n, i in enumerate(left_ids)],
+    )
+    right = RichSet.from_list(
+        [Foo(i, f"f{n}") for n, i in enumerate(right_ids)],
+    )
+    return left, right
+
+
+SHAPES = [
+    ([1, 2, 2, 3, 5], [2, 2, 3, 4]),  # both sorted
+    ([5, 3, 2, 1, 2], [2, 4, 3, 2]),  # neither sorted
+    ([1, 2], [3, 2, 2, 1, 1, 0, 2]),  # left is smaller
+    ([2, 1, 2, 0, 3, 3, 9], [2, 1]),  # right is smaller
+    ([], [1, 2]),
+    ([1, 2], []),
+]
+
+
+@pytest.mark.parametrize(("left_ids", "right_ids"), SHAPES)
+def test_richset_join(left_ids: list[int], right_ids: list[int]) -> None:
+    left, right = make_sides(left_ids, right_ids)
+    expected = left.cartesian_product(right).filter(
+        lambda p: p[0].id == p[1].something_id,
+    )
+    joined = left.join(right, left_key=get_id, right_key=get_something_id)
+    assert joined == expected
+
+
+@pytest.mark.parametrize(("left_ids", "right_ids"), SHAPES)
+def test_richset_left_join(left_ids: list[int], right_ids: list[int]) -> None:
+    left, right = make_sides(left_ids, right_ids)
+    expected: list[tuple[Something, Foo | None]] = []
+    for r in left:
+        matches = [s for s in right if s.something_id == r.id]
+        if not matches:
+            expected.append((r, None))
+        expected.extend((r, s) for s in matches)
+    joined = left.left_join(
+        right,
+        left_key=get_id,
+        right_key=get_something_id,
+    )
+    assert joined.to_list() == expected
+
+
+@pytest.mark.parametrize(("left_ids", "right_ids"), SHAPES)
+def test_richset_semi_join_anti_join(
+    left_ids: list[int],
+    right_ids: list[int],
+) -> None:
+    left, right = make_sides(left_ids, right_ids)
+    right_ids_ = set(right_ids)
+    assert left.semi_join(
+        right,
+        left_key=get_id,
+        right_key=get_something_id,
+    ) == left.filter(lambda r: r.id in right_ids_)
+    assert left.anti_join(
+        right,
+        left_key=get_id,
+        right_key=get_something_id,
+    ) == left.filter(lambda r: r.id not in right_ids_)
+
+
+def test_richset_join_merges_sorted_sides(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    def fail(*_: object) -> None:
+        raise AssertionError("hash join used")
+
+    monkeypatch.setattr(_join, "hash_matches", fail)
+    left, right = make_sides([1, 2, 2, 3], [0, 2, 2, 3, 3])
+    joined = left.join(right, left_key=get_id, right_key=get_something_id)
+    assert [(r.name, s.value) for r, s in joined] == [
+        ("s1", "f1"),
+        ("s1", "f2"),
+        ("s2", "f1"),
+        ("s2", "f2"),
+        ("s3", "f3"),
+        ("s3", "f4"),
+    ]
+
+
+def test_richset_join_unorderable_keys() -> None:
+    left = RichSet.from_list([1, "a", None])
+    right = RichSet.from_list([None, 1, 1])
+    joined = left.join(right, left_key=lambda x: x, right_key=lambda x: x)
+    assert joined.to_list() == [(1, 1), (1, 1), (None, None)]
+
+
+@pytest.mark.parametrize(
+    ("left", "right"),
+    [
+        ([None], [1, 2]),
+        ([1, 2], [None]),
+        ([1, 2], ["1", "2"]),
+        ([b"a", b"b"], ["a", "b"]),
+        ([1, True], [1, 2]),
+        ([1.0, 2.0, float("nan")], [1, 2, 3]),
+        ([frozenset({1}), frozenset({2})], [frozenset({1}), frozenset({2})]),
+        ([frozenset({1}), frozenset({1, 2})], [frozenset({1, 2})]),
+        ([(1, "a"), (1, "b")], [(1, "b")]),
+    ],
+)
+def test_richset_join_keys_without_total_order(
+    left: list[object],
+    right: list[object],
+) -> None:
+    def key(x: object) -> object:
+        return x
+
+    lrs, rrs = RichSet.from_list(left), RichSet.from_list(right)
+    expected = lrs.cartesian_product(rrs, where=lambda a, b: a == b)
+    assert lrs.join(rrs, left_key=key, right_key=key) == expected
+    assert lrs.left_join(rrs, left_key=key, right_key=key).to_list() == [
+        (a, b) for a in left for b in [b for b in right if a == b] or [None]
+    ]
+    assert lrs.semi_join(rrs, left_key=key, right_key=key) == lrs.filter(
+        lambda a: a in right,
+    )
+
+
+def test_richset_join_computes_each_key_once() -> None:
+    left, right = make_sides([1, 2, 2, 3], [0, 2, 2, 3, 3])
+    calls: list[int] = []
+
+    def count_id(r: Something) -> int:
+        calls.append(r.id)
+        return r.id
+
+    def count_something_id(r: Foo) -> int:
+        calls.append(r.something_id)
+        return r.something_id
+
+    left.join(right, left_key=count_id, right_key=count_something_id)
+    assert len(calls) == left.size() + right.size()
@@ -0,0 +1,322 @@
+from dataclasses import dataclass
+
+import pytest
+
+from richset import F, LazyRichSet, RichSet
+
+
+@dataclass(frozen=True)
+class Something:
+    id: int
+    name: str
+
+
+@dataclass(frozen=True)
+class Reading:
+    v: float
+
+
+def test_richset_lazy() -> None:
+    rs = RichSet.from_list(
+        [
+            Something(1, "one"),
+            Something(2, "two"),
+            Something(3, "three"),
+        ],
+    )
+    lazy = rs.lazy()
+    assert isinstance(lazy, LazyRichSet)
+    assert lazy.collect() == rs
+    assert lazy.to_list() == rs.to_list()
+    assert lazy.to_tuple() == rs.to_tuple()
+
+
+def test_richset_lazy_defers_operations() -> None:
+    calls: list[int] = []
+    rs = RichSet.from_list([1, 2, 3])
+
+    def record(x: int) -> int:
+        calls.append(x)
+        return x
+
+    lazy = rs.lazy().map(record)
+    assert calls == []
+    assert lazy.to_list() == [1, 2, 3]
+    assert calls == [1, 2, 3]
+
+
+def test_richset_lazy_fuses_in_a_single_pass() -> None:
+    calls: list[str] = []
+    rs = RichSet.from_list([1, 2, 3])
+
+    def is_odd(x: int) -> bool:
+        calls.append(f"filter {x}")
+        return x % 2 == 1
+
+    def double(x: int) -> int:
+        calls.append(f"map {x}")
+        return x * 2
+
+    assert rs.lazy().filter(is_odd).map(double).to_list() == [2, 6]
+    assert calls == [
+        "filter 1",
+        "map 1",
+        "filter 2",
+        "filter 3",
+        "map 3",
+    ]
+
+
+def test_richset_lazy_matches_eager() -> None:
+    rs = RichSet.from_list(
+        [
+            Something(1, "one"),
+            Something(2, "two"),
+            Something(3, "three"),
+            Something(4, "two"),
+        ],
+    )
+    eager = (
+        rs.filter(lambda r: r.id > 1)
+        .unique(lambda r: r.name)
+        .map(lambda r: r.name)
+    )
+    lazy = (
+        rs.lazy()
+        .filter(lambda r: r.id > 1)
+        .unique(lambda r: r.name)
+        .map(lambda r: r.name)
+    )
+    assert lazy.collect() == eager
+    assert lazy.collect() == lazy.collect()
+
+
+def test_richset_lazy_to_dict() -> None:
+    rs = RichSet.from_list(
+        [
+            Something(1, "one"),
+            Something(2, "two"),
+            Something(3, "two"),
+        ],
+    )
+    lazy = rs.lazy().filter(lambda r: r.id > 1)
+    assert lazy.to_dict(lambda r: r.id) == {
+        2: Something(2, "two"),
+        3: Something(3, "two"),
+    }
+    assert lazy.to_dict(lambda r: r.name, duplicated="last") == {
+        "two": Something(3, "two"),
+    }
+    with pytest.raises(ValueError):
+        lazy.to_dict(lambda r: r.name)
+
+
+def make_records() -> RichSet[Something]:
+    return RichSet.from_list(
+        [Something(i % 7, f"n{i % 3}") for i in range(30)],
+    )
+
+
+def get_id(r: Something) -> int:
+    return r.id
+
+
+def test_richset_lazy_sorted_reversed_page() -> None:
+    rs = make_records()
+    lazy = rs.lazy().sorted(key=get_id, reverse=True)
+    assert lazy.to_list() == rs.sorted(key=get_id, reverse=True).to_list()
+    assert lazy.reversed().to_list() == list(
+        reversed(rs.sorted(key=get_id, reverse=True).to_list()),
+    )
+    assert rs.lazy().page(3, 4).to_list() == rs.page(3, 4).to_list()
+    with pytest.raises(ValueError):
+        rs.lazy().page(-1, 4)
+    with pytest.raises(ValueError):
+        rs.lazy().page(0, -1)
+
+
+def test_richset_lazy_explain_merges_and_pushes_filters() -> None:
+    rs = make_records()
+    lazy = (
+        rs.lazy()
+        .sorted(key=F.id)
+        .filter(F.id > 2)
+        .reversed()
+        .filter(F.name == "n1")
+    )
+    assert lazy.explain() == "\n".join(
+        [
+            "1. scan(30 records)",
+            "2. filter((F.id > 2) & (F.name == 'n1'))",
+            "3. sorted(key=F.id, reverse=False)",
+            "4. reversed()",
+        ],
+    )
+    expected = (
+        rs.sorted(key=get_id)
+        .filter(lambda r: r.id > 2)
+        .reversed()
+        .filter(lambda r: r.name == "n1")
+    )
+    assert lazy.to_list() == expected.to_list()
+
+
+def test_richset_lazy_does_not_move_filters_across_map() -> None:
+    rs = RichSet.from_list([1, 2, 3])
+    lazy = rs.lazy().map(lambda x: x * 10).filter(lambda x: x > 10)
+    assert lazy.explain() == "\n".join(
+        [
+            "1. scan(3 records)",
+            "2. map(test_richset_lazy_does_not_move_filters_across_map.<locals>.<lambda>)",  # noqa: E501
+            "3. filter(test_richset_lazy_does_not_move_filters_across_map.<locals>.<lambda>)",  # noqa: E501
+        ],
+    )
+    assert lazy.to_list() == [20, 30]
+
+
+def test_richset_lazy_top_k() -> None:
+    rs = make_records()
+    lazy = rs.lazy().sorted(key=F.id, reverse=True).page(2, 5)
+    assert lazy.explain().splitlines()[-1] == (
+        "2. top_k(key=F.id, reverse=True, offset=2, limit=5)"
+    )
+    expected = rs.sorted(key=get_id, reverse=True).page(2, 5)
+    assert lazy.to_list() == expected.to_list()
+    lazy = rs.lazy().sorted(key=F.id).page(0, 5)
+    assert lazy.to_list() == rs.sorted(key=get_id).page(0, 5).to_list()
+
+
+def test_richset_lazy_uses_hash_index() -> None:
+    rs = make_records()
+    lazy = rs.lazy().filter((F.name == "n1") & (F.id > 2))
+    assert lazy.explain().startswith("1. scan(30 records)")
+    expected = rs.filter(lambda r: r.name == "n1" and r.id > 2).to_list()
+    assert lazy.to_list() == expected
+    rs.index_by(F.name)
+    assert lazy.explain() == "\n".join(
+        [
+            "1. index_by(F.name).get_all('n1')",
+            "2. filter((F.id > 2))",
+        ],
+    )
+    assert lazy.to_list() == expected
+
+
+def test_richset_lazy_uses_sorted_index() -> None:
+    rs = make_records()
+    rs.sorted_index(F.id)
+    lazy = rs.lazy().filter(F.id >= 5)
+    assert lazy.explain() == (
+        "1. sorted_index(F.id).greater_equal(5) in source order"
+    )
+    assert lazy.to_list() == rs.filter(lambda r: r.id >= 5).to_list()
+    for predicate in [F.id < 3, F.id <= 3, F.id > 3, F.id == 3, F.id != 3]:
+        expected = [r for r in rs.to_list() if predicate(r)]
+        assert rs.lazy().filter(predicate).to_list() == expected
+
+
+def test_richset_lazy_sorted_index_incomparable_constant() -> None:
+    rs = make_records()
+    rs.sorted_index(F.name)
+    for predicate in [F.name == 1, F.name < 1, F.name >= 1]:
+        lazy = rs.lazy().filter(predicate)
+        assert lazy.explain().startswith("1. scan(30 records)")
+    assert rs.lazy().filter(F.name == 1).to_list() == []
+    with pytest.raises(TypeError):
+        rs.lazy().filter(F.name < 1).to_list()
+
+
+def test_richset_lazy_sorted_index_nan() -> None:
+    nan = float("nan")
+    rs = RichSet.from_list([Reading(0.5), Reading(1.0), Reading(0.25)])
+    rs.sorted_index(F.v)
+    for predicate in [F.v == nan, F.v <= nan, F.v > nan]:
+        lazy = rs.lazy().filter(predicate)
+        assert lazy.explain().startswith("1. scan(3 records)")
+        assert lazy.to_list() == []
+    rs = RichSet.from_list([Reading(1.0), Reading(nan), Reading(0.5)])
+    rs.sorted_index(F.v)
+    lazy = rs.lazy().filter(F.v > 0.7)
+    assert lazy.explain().startswith("1. scan(3 records)")
+    assert lazy.to_list() == [Reading(1.0)]
+    assert rs.lazy().filter(F.v < 0.7).to_list() == [Reading(0.5)]
+
+
+def test_richset_lazy_reads_sorted_index_in_key_order() -> None:
+    rs = make_records()
+    rs.sorted_index(F.id)
+    lazy = rs.lazy().filter(F.id < 3).sorted(key=F.id).page(0, 4)
+    assert lazy.explain() == "\n".join(
+        [
+            "1. sorted_index(F.id).less_than(3) in key order",
+            "2. page(offset=0, limit=4)",
+        ],
+    )
+    expected = rs.filter(lambda r: r.id < 3).sorted(key=get_id).page(0, 4)
+    assert lazy.to_list() == expected.to_list()
+    lazy = rs.lazy().filter(F.name == "n2").sorted(key=F.id)
+    assert lazy.explain() == "\n".join(
+        [
+            "1. sorted_index(F.id) in key order",
+            "2. filter((F.name == 'n2'))",
+        ],
+    )
+    expected = rs.filter(lambda r: r.name == "n2").sorted(key=get_id)
+    assert lazy.to_list() == expected.to_list()
+    lazy = rs.lazy().sorted(key=F.id, reverse=True)
+    assert lazy.explain().startswith("1. scan(30 records)")
+
+
+def test_richset_lazy_cartesian_product() -> None:
+    rs1 = RichSet.from_list([1, 2, 3])
+    rs2 = RichSet.from_list(["a", "b"])
+    lazy = rs1.lazy().cartesian_product(rs2)
+    assert lazy.to_list() == rs1.cartesian_product(rs2).to_list()
+    assert lazy.page(0, 3).to_list() == [(1, "a"), (1, "b"), (2, "a")]
+
+    def where(a: int, b: str) -> bool:
+        return a % 2 == 1 and b == "b"
+
+    lazy = (
+        rs1.lazy().filter(lambda x: x > 1).cartesian_product(rs2, where=where)
+    )
+    assert lazy.to_list() == [(3, "b")]
+    assert lazy.explain().splitlines()[-1] == (
+        "3. cartesian_product(2 records, where="
+        "test_richset_lazy_cartesian_product.<locals>.where)"
+    )
+
+
+def test_richset_lazy_product_is_streamed() -> None:
+    calls: list[int] = []
+
+    def count(x: int) -> int:
+        calls.append(x)
+        return x
+
+    rs = RichSet.from_list(list(range(1000)))
+    lazy = rs.lazy().cartesian_product(rs).map(lambda p: count(p[1]))
+    assert lazy.page(0, 2).to_list() == [0, 1]
+    assert calls == [0, 1]
+
+
+def test_richset_lazy_zip() -> None:
+    rs1 = RichSet.from_list([1, 2, 3])
+    rs2 = RichSet.from_list(["a", "b"])
+    assert rs1.lazy().page(0, 2).zip(rs2).to_list() == [(1, "a"), (2, "b")]
+    with pytest.raises(ValueError):
+        rs1.lazy().zip(rs2).to_list()
+    assert rs1.lazy().zip_longest(rs2).to_list() == [
+        (1, "a"),
+        (2, "b"),
+        (3, None),
+    ]
+    assert rs2.lazy().zip_longest(rs1, fillvalue="-").to_list() == [
+        ("a", 1),
+        ("b", 2),
+        ("-", 3),
+    ]
+    assert (
+        rs1.lazy().zip(rs1).explain()
+        == "1. scan(3 records)\n2. zip(3 records)"
+    )
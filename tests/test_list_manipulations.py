@@ -2,7 +2,7 @@ from dataclasses import dataclass
 
 import pytest
 
-from richset import RichSet
+from richset import RichSet, RichSetBuilder
 
 
 @dataclass(frozen=True)
@@ -259,3 +259,45 @@ def test_richset_divide_at() -> None:
         Something(3, "three"),
     ]
     assert rs3.to_list() == []
+
+
+def test_richset_builder() -> None:
+    rs = RichSet.from_list([Something(2, "two")])
+    builder = rs.builder()
+    assert isinstance(builder, RichSetBuilder)
+    assert builder.build() == rs
+    built = (
+        builder.pushed(Something(3, "three"))
+        .unshifted(Something(1, "one"))
+        .pushed_all([Something(4, "four"), Something(5, "five")])
+        .unshifted_all([Something(-1, "minus one"), Something(0, "zero")])
+    )
+    assert len(built) == 7
+    assert built.size() == 7
+    assert built.build().to_list() == [
+        Something(-1, "minus one"),
+        Something(0, "zero"),
+        Something(1, "one"),
+        Something(2, "two"),
+        Something(3, "three"),
+        Something(4, "four"),
+        Something(5, "five"),
+    ]
+
+
+def test_richset_builder_is_persistent() -> None:
+    base = RichSet[int].from_empty().builder().pushed(1)
+    left = base.pushed(2)
+    right = base.pushed(3).unshifted(0)
+    assert base.build().to_list() == [1]
+    assert left.build().to_list() == [1, 2]
+    assert right.build().to_list() == [0, 1, 3]
+
+
+def test_richset_builder_matches_pushed() -> None:
+    rs = RichSet[int].from_empty()
+    builder = rs.builder()
+    for i in range(100):
+        rs = rs.pushed(i).unshifted(-i)
+        builder = builder.pushed(i).unshifted(-i)
+    assert builder.build() == rs
@@ -0,0 +1,180 @@
+import io
+import pickle
+from collections.abc import Iterator
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+
+import pytest
+
+from richset import MappedRichSet, RichSet, StructCodec
+from richset._mapped import write_records
+
+
+@dataclass(frozen=True)
+class Something:
+    id: int
+    name: str
+
+
+RECORDS = [
+    Something(1, "one"),
+    Something(2, "two"),
+    Something(3, "three"),
+    Something(4, "four"),
+    Something(5, "five"),
+]
+
+
+@pytest.fixture
+def mapped(tmp_path: Path) -> Iterator[MappedRichSet[Something]]:
+    path = tmp_path / "records.map"
+    MappedRichSet.write(path, iter(RECORDS))
+    with MappedRichSet.open(path) as rs:
+        yield rs
+
+
+def test_richset_mapped(mapped: MappedRichSet[Something]) -> None:
+    assert mapped.size() == 5
+    assert len(mapped) == 5
+    assert not mapped.is_empty()
+    assert mapped.to_list() == RECORDS
+    assert mapped.to_richset() == RichSet.from_list(RECORDS)
+    assert mapped.first() == Something(1, "one")
+    assert mapped.last() == Something(5, "five")
+    assert mapped.nth(2) == Something(3, "three")
+    with pytest.raises(IndexError):
+        mapped.nth(5)
+    with pytest.raises(IndexError):
+        mapped.nth(-1)
+
+
+def test_richset_mapped_views(mapped: MappedRichSet[Something]) -> None:
+    assert mapped.slice(1, 3).to_list() == RECORDS[1:3]
+    assert mapped.slice(-2, 10).to_tuple() == tuple(RECORDS[-2:])
+    assert mapped.page(2, 2).to_list() == RECORDS[2:4]
+    assert mapped.page(4, 2).to_list() == RECORDS[4:]
+    assert mapped.reversed().page(0, 2).to_list() == [
+        Something(5, "five"),
+        Something(4, "four"),
+    ]
+    assert mapped.reversed().first() == Something(5, "five")
+    empty = mapped.page(10, 2)
+    assert empty.is_empty()
+    with pytest.raises(IndexError):
+        empty.first()
+    with pytest.raises(IndexError):
+        empty.last()
+    with pytest.raises(ValueError):
+        mapped.page(-1, 2)
+    with pytest.raises(ValueError):
+        mapped.page(0, -1)
+
+
+def test_richset_mapped_streaming(
+    mapped: MappedRichSet[Something],
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.setattr("richset._mapped.PAGE_SIZE", 2)
+    assert mapped.filter(lambda r: r.id % 2 == 1).to_list() == [
+        Something(1, "one"),
+        Something(3, "three"),
+        Something(5, "five"),
+    ]
+    assert mapped.map(lambda r: r.name).to_list() == [
+        "one",
+        "two",
+        "three",
+        "four",
+        "five",
+    ]
+    assert mapped.count(lambda r: r.id > 2) == 3
+    assert mapped.slice(1, 4).count(lambda r: r.id > 2) == 2
+    assert [page.to_list() for page in mapped.iter_pages(2)] == [
+        RECORDS[0:2],
+        RECORDS[2:4],
+        RECORDS[4:],
+    ]
+    with pytest.raises(ValueError):
+        mapped.iter_pages(0)
+
+
+def test_richset_mapped_pickle(mapped: MappedRichSet[Something]) -> None:
+    page = mapped.page(1, 2)
+    pickled = pickle.dumps(page)
+    assert b"two" not in pickled
+    restored = pickle.loads(pickled)  # noqa: S301
+    assert restored.to_list() == RECORDS[1:3]
+    restored.close()
+
+
+def count_odd_ids(rs: MappedRichSet[Something]) -> int:
+    with rs:
+        return rs.count(lambda r: r.id % 2 == 1)
+
+
+def test_richset_mapped_in_process_pool(
+    mapped: MappedRichSet[Something],
+) -> None:
+    with ProcessPoolExecutor(max_workers=2) as pool:
+        pages = [mapped.page(0, 3), mapped.page(3, 2)]
+        assert list(pool.map(count_odd_ids, pages)) == [2, 1]
+
+
+def test_richset_mapped_close(tmp_path: Path) -> None:
+    path = tmp_path / "records.map"
+    MappedRichSet.write(path, RECORDS)
+    rs = MappedRichSet.open(path)
+    page = rs.page(0, 2)
+    rs.close()
+    with pytest.raises(ValueError):
+        page.first()
+
+
+def test_richset_mapped_from_buffer(tmp_path: Path) -> None:
+    path = tmp_path / "records.map"
+    MappedRichSet.write(path, RECORDS)
+    rs = MappedRichSet.from_buffer(path.read_bytes())
+    assert rs.to_list() == RECORDS
+    with pytest.raises(TypeError):
+        pickle.dumps(rs)
+
+
+def test_richset_mapped_empty(tmp_path: Path) -> None:
+    path = tmp_path / "records.map"
+    MappedRichSet.write(path, [])
+    with MappedRichSet.open(path) as rs:
+        assert rs.is_empty()
+        assert rs.to_list() == []
+        assert rs.count(lambda _: True) == 0
+
+
+def test_richset_mapped_struct_codec(tmp_path: Path) -> None:
+    path = tmp_path / "records.map"
+    codec = StructCodec("<qd")
+    MappedRichSet.write(path, ((i, i / 2) for i in range(1000)), codec=codec)
+    with MappedRichSet.open(path, codec=codec) as rs:
+        assert rs.size() == 1000
+        assert rs.nth(999) == (999, 499.5)
+        assert rs.count(lambda r: r[1] < 10) == 20
+        restored = pickle.loads(pickle.dumps(rs.page(10, 2)))  # noqa: S301
+        assert restored.to_list() == [(10, 5.0), (11, 5.5)]
+        restored.close()
+    with pytest.raises(ValueError, match="encoded with 'struct:<qd'"):
+        MappedRichSet.open(path)
+
+
+def test_richset_mapped_not_a_records_file(tmp_path: Path) -> None:
+    path = tmp_path / "records.map"
+    RichSet.from_list(RECORDS).save(path)
+    with pytest.raises(ValueError, match="not a MappedRichSet records file"):
+        MappedRichSet.open(path)
+
+
+def test_richset_mapped_write_records_at_position() -> None:
+    f = io.BytesIO()
+    f.write(b"prefix")
+    codec = StructCodec("<q")
+    write_records(f, [(1,), (2,), (3,)], codec)
+    rs = MappedRichSet.from_buffer(f.getvalue()[6:], codec=codec)
+    assert rs.to_list() == [(1,), (2,), (3,)]
@@ -0,0 +1,177 @@
+import array
+import operator
+from dataclasses import dataclass
+
+import pytest
+
+from richset import RichSet, _numpy
+
+
+@dataclass(frozen=True)
+class Item:
+    id: int
+    price: float
+    name: str
+
+
+@pytest.fixture(params=["numpy", "python"])
+def engine(
+    request: pytest.FixtureRequest,
+    monkeypatch: pytest.MonkeyPatch,
+) -> str:
+    if request.param == "numpy":
+        pytest.importorskip("numpy")
+    else:
+        monkeypatch.setattr(_numpy, "np", None)
+    return str(request.param)
+
+
+pytestmark = pytest.mark.usefixtures("engine")
+
+
+def make_items() -> RichSet[Item]:
+    return RichSet.from_list(
+        [
+            Item(3, 30.0, "c"),
+            Item(1, 10.0, "a"),
+            Item(2, 20.0, "b"),
+            Item(4, 10.0, "d"),
+            Item(1, 30.0, "e"),
+        ],
+    )
+
+
+def test_numpy_enabled(engine: str) -> None:
+    assert _numpy.enabled() == (engine == "numpy")
+    column = make_items().to_columnar().column("id")
+    assert (_numpy.as_ndarray(column) is not None) == (engine == "numpy")
+
+
+@pytest.mark.parametrize("field", ["id", "price", "name"])
+@pytest.mark.parametrize("reverse", [False, True])
+def test_columnar_sorted_by_field(
+    field: str,
+    reverse: bool,
+) -> None:
+    rs = make_items()
+    sorted_ = rs.to_columnar().sorted(key=field, reverse=reverse)
+    assert sorted_.to_richset() == rs.sorted(
+        key=operator.attrgetter(field),
+        reverse=reverse,
+    )
+    assert isinstance(sorted_.column("id"), array.array)
+
+
+@pytest.mark.parametrize("field", ["id", "price", "name"])
+def test_columnar_group_by_field(field: str) -> None:
+    rs = make_items()
+    columnar = rs.to_columnar()
+    groups = columnar.group_by(field)
+    expected = rs.group_by(operator.attrgetter(field))
+    assert list(groups) == list(expected)
+    assert {k: v.to_richset() for k, v in groups.items()} == expected
+    assert all(type(k) is type(getattr(rs.first(), field)) for k in groups)
+    sizes = columnar.size_of_group_by(field)
+    assert sizes == rs.size_of_group_by(operator.attrgetter(field))
+    assert list(sizes) == list(expected)
+
+
+def test_columnar_group_by_nan() -> None:
+    nan = float("nan")
+    rs = RichSet.from_list(
+        [
+            Item(1, nan, "a"),
+            Item(2, 0.0, "b"),
+            Item(3, nan, "c"),
+            Item(4, -0.0, "d"),
+        ],
+    )
+    columnar = rs.to_columnar()
+    groups = columnar.group_by("price")
+    # each NaN read from the column is a group of its own
+    assert [[r.name for r in g] for g in groups.values()] == [
+        ["a"],
+        ["b", "d"],
+        ["c"],
+    ]
+    assert [str(k) for k in groups] == ["nan", "0.0", "nan"]
+    sizes = columnar.size_of_group_by("price")
+    assert list(sizes.values()) == [1, 2, 1]
+    assert [str(k) for k in sizes] == ["nan", "0.0", "nan"]
+
+
+def test_columnar_size_of_group_by_function() -> None:
+    rs = make_items()
+    assert rs.to_columnar().size_of_group_by(
+        lambda r: r.id % 2,
+    ) == rs.size_of_group_by(lambda r: r.id % 2)
+
+
+def test_columnar_aggregate_by() -> None:
+    rs = make_items()
+    expected = rs.aggregate_by(
+        key=lambda r: r.price,
+        fn=lambda a, b: a + b.name,
+        initial="",
+    )
+    assert (
+        rs.to_columnar().aggregate_by(
+            key="price",
+            fn=lambda a, b: a + b.name,
+            initial="",
+        )
+        == expected
+    )
+
+
+@pytest.mark.parametrize("op", ["==", "!=", "<", "<=", ">", ">="])
+def test_columnar_filter_where(op: _numpy.CompareOp) -> None:
+    rs = make_items()
+    columnar = rs.to_columnar()
+    compare = _numpy.COMPARE_OPS[op]
+    for field, value in [("id", 2), ("price", 20.0), ("name", "c")]:
+        get = operator.attrgetter(field)
+        expected = rs.filter(lambda r: compare(get(r), value))  # noqa: B023
+        filtered = columnar.filter_where(field, op, value)
+        assert filtered.to_richset() == expected
+        assert columnar.count_where(field, op, value) == expected.size()
+
+
+@pytest.mark.parametrize(
+    ("field", "value", "expected"),
+    [
+        ("id", float(2**53), 0),
+        ("id", 2**53 + 1, 1),
+        ("id", 2**64, 0),
+        ("id", True, 0),
+        ("price", 2**53 + 1, 0),
+        ("price", float(2**53), 1),
+    ],
+)
+def test_columnar_count_where_mixed_int_float(
+    field: str,
+    value: object,
+    expected: int,
+) -> None:
+    columnar = RichSet.from_list(
+        [Item(2**53 + 1, float(2**53), "a"), Item(2, 2.0, "b")],
+    ).to_columnar()
+    assert columnar.count_where(field, "==", value) == expected
+
+
+def test_columnar_attrgetter_key(engine: str) -> None:
+    rs = make_items()
+    columnar = rs.to_columnar()
+    by_id = operator.attrgetter("id")
+    vectorized = columnar._ndarray(by_id) is not None
+    assert vectorized == (engine == "numpy")
+    assert columnar.sorted(key=by_id).to_richset() == rs.sorted(key=by_id)
+    assert columnar.size_of_group_by(by_id) == rs.size_of_group_by(by_id)
+    assert columnar._ndarray(operator.attrgetter("id", "price")) is None
+
+
+def test_columnar_count() -> None:
+    rs = make_items()
+    assert rs.to_columnar().count(lambda r: r.id > 1) == rs.count(
+        lambda r: r.id > 1,
+    )
@@ -2,7 +2,7 @@ from dataclasses import dataclass
 
 import pytest
 
-from richset import RichSet
+from richset import F, RichSet
 
 
 @dataclass(frozen=True)
@@ -156,3 +156,56 @@ def test_richset_split_into_pages_invalid_size() -> None:
     empty = RichSet[Something].from_empty()
     with pytest.raises(ValueError, match="size must be a positive integer"):
         empty.split_into_pages(0)
+
+
+def test_richset_iter_pages() -> None:
+    rs = RichSet.from_list([Something(i, str(i)) for i in range(5)])
+    pages = rs.iter_pages(2)
+    assert next(pages) == rs.page(0, 2)
+    assert list(pages) == rs.split_into_pages(2)[1:]
+    assert list(RichSet[Something].from_empty().iter_pages(2)) == []
+    with pytest.raises(ValueError, match="size must be a positive integer"):
+        rs.iter_pages(0)
+
+
+def test_richset_batched() -> None:
+    rs = RichSet.from_list([1, 2, 3, 4, 5])
+    assert list(rs.batched(2)) == [(1, 2), (3, 4), (5,)]
+    assert list(rs.batched(5)) == [(1, 2, 3, 4, 5)]
+    with pytest.raises(ValueError, match="size must be a positive integer"):
+        rs.batched(-1)
+
+
+def test_richset_page_after() -> None:
+    rs = RichSet.from_list([Something(i * 7 % 10, str(i)) for i in range(10)])
+    first = rs.sorted_index(F.id).page(0, 3)
+    assert [r.id for r in first] == [0, 1, 2]
+    second = rs.page_after(first.last().id, 3, key=F.id)
+    assert [r.id for r in second] == [3, 4, 5]
+    assert [r.id for r in rs.page_after(8, 3, key=F.id)] == [9]
+    assert rs.page_after(9, 3, key=F.id).to_list() == []
+    assert [r.id for r in rs.page_after(-1, 2, key=F.id)] == [0, 1]
+    assert rs.sorted_index(F.id) is rs.sorted_index(F.id)
+    with pytest.raises(ValueError):
+        rs.page_after(0, -1, key=F.id)
+
+
+def test_richset_page_after_sorted_index() -> None:
+    rs = RichSet.from_list([Something(i * 7 % 10, str(i)) for i in range(10)])
+    index = rs.sorted_index(lambda r: r.id)
+    assert [r.id for r in rs.page_after(2, 3, key=index)] == [3, 4, 5]
+    assert [r.id for r in rs.page_after(8, 3, key=index)] == [9]
+
+
+def test_richset_page_after_function_is_not_cached() -> None:
+    rs = RichSet.from_list([Something(i * 7 % 10, str(i)) for i in range(10)])
+    pages = []
+    cursor = -1
+    while page := rs.page_after(cursor, 3, key=lambda r: r.id):
+        pages.append([r.id for r in page])
+        cursor = page.last().id
+    assert pages == [[0, 1, 2], [3, 4, 5], [6, 7, 8], [9]]
+    assert not rs.__dict__.get("_caches")
+    assert rs.page_after(0, 0, key=lambda r: r.id).to_list() == []
+    with pytest.raises(ValueError):
+        rs.page_after(0, -1, key=lambda r: r.id)
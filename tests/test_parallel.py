@@ -0,0 +1,165 @@
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass
+
+from richset import RichSet
+from richset._parallel import auto_chunksize
+
+
+@dataclass(frozen=True)
+class Something:
+    id: int
+    name: str
+
+
+def get_name(r: Something) -> str:
+    return r.name
+
+
+def is_even(r: Something) -> bool:
+    return r.id % 2 == 0
+
+
+def make_richset(size: int) -> RichSet[Something]:
+    return RichSet.from_list([Something(i, str(i)) for i in range(size)])
+
+
+def test_auto_chunksize() -> None:
+    assert auto_chunksize(0, 4) == 1
+    assert auto_chunksize(10, 4) == 1
+    assert auto_chunksize(1000, 4) == 63
+    assert auto_chunksize(1000, 1) == 250
+
+
+def test_richset_parallel_map() -> None:
+    rs = make_richset(100)
+    assert rs.parallel_map(get_name, workers=2) == rs.map(get_name)
+    assert rs.parallel_map(get_name, workers=2, chunksize=7) == rs.map(
+        get_name,
+    )
+    assert RichSet[Something].from_empty().parallel_map(
+        get_name,
+        workers=2,
+    ) == RichSet.from_empty()
+
+
+def test_richset_parallel_with_shared_executor() -> None:
+    rs = make_richset(100)
+    with ProcessPoolExecutor(max_workers=2) as pool:
+        assert rs.parallel_map(get_name, executor=pool) == rs.map(get_name)
+        assert rs.parallel_filter(is_even, executor=pool) == rs.filter(
+            is_even,
+        )
+        assert rs.parallel_count(is_even, executor=pool) == rs.count(is_even)
+        assert rs.parallel_indices_of(
+            is_even,
+            executor=pool,
+        ) == rs.indices_of(is_even)
+
+
+def test_richset_parallel_with_thread_executor() -> None:
+    rs = make_richset(100)
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        assert rs.parallel_map(
+            lambda r: r.id * 2,
+            executor=pool,
+        ) == rs.map(lambda r: r.id * 2)
+        assert rs.parallel_filter(
+            lambda r: r.id > 90,
+            executor=pool,
+        ) == rs.filter(lambda r: r.id > 90)
+
+
+def get_parity(r: Something) -> int:
+    return r.id % 2
+
+
+def test_richset_parallel_thread_mode() -> None:
+    rs = make_richset(100)
+    assert rs.parallel_map(
+        lambda r: r.id * 2,
+        mode="thread",
+        workers=4,
+    ) == rs.map(lambda r: r.id * 2)
+    assert rs.parallel_count(
+        lambda r: r.id > 90,
+        mode="thread",
+    ) == rs.count(lambda r: r.id > 90)
+
+
+def test_richset_parallel_group_by() -> None:
+    rs = make_richset(100)
+    assert rs.parallel_group_by(get_parity, workers=2) == rs.group_by(
+        get_parity,
+    )
+    assert rs.parallel_group_by(
+        lambda r: r.id % 3,
+        mode="thread",
+    ) == rs.group_by(lambda r: r.id % 3)
+
+
+def test_richset_parallel_aggregate_by() -> None:
+    rs = make_richset(10)
+    expected = rs.aggregate_by(
+        key=get_parity,
+        fn=lambda a, b: a + b.name,
+        initial="",
+    )
+    assert (
+        rs.parallel_aggregate_by(
+            key=get_parity,
+            fn=lambda a, b: a + b.name,
+            initial="",
+            workers=2,
+        )
+        == expected
+    )
+    assert (
+        rs.parallel_aggregate_by(
+            key=get_parity,
+            fn=lambda a, b: a + b.name,
+            initial="",
+            mode="thread",
+        )
+        == expected
+    )
+
+
+def test_richset_caches_are_built_once_across_threads() -> None:
+    rs = make_richset(1000)
+    calls = []
+    lock = threading.Lock()
+
+    def get_id(r: Something) -> int:
+        with lock:
+            calls.append(r.id)
+        return r.id
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        indexes = list(pool.map(lambda _: rs.index_by(get_id), range(32)))
+        record_sets = list(pool.map(lambda _: rs._record_set, range(32)))
+    assert all(index is indexes[0] for index in indexes)
+    assert all(s is record_sets[0] for s in record_sets)
+    assert len(calls) == rs.size()
+
+
+def test_richset_cache_builds_do_not_block_other_richsets() -> None:
+    slow, fast = make_richset(10), make_richset(10)
+    started, release = threading.Event(), threading.Event()
+
+    def get_id_slowly(r: Something) -> int:
+        started.set()
+        release.wait(timeout=10)
+        return r.id
+
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        future = pool.submit(slow.index_by, get_id_slowly)
+        started.wait(timeout=10)
+        try:
+            # the other RichSet builds its index while the slow build waits
+            index = fast.index_by(lambda r: r.id)
+            assert index.get(3) == Something(3, "3")
+            assert not future.done()
+        finally:
+            release.set()
+        assert future.result().get(3) == Something(3, "3")
@@ -122,3 +122,21 @@ def test_richset_has() -> None:
     assert rs.has(Something(1, "one"))
     assert rs.has(Something(2, "two"))
     assert not rs.has(Something(3, "three"))
+
+
+def test_richset_has_unhashable() -> None:
+    rs = RichSet.from_list([[1], [2]])
+    assert rs.has([1])
+    assert not rs.has([3])
+
+    rs2 = RichSet.from_list([1, 2])
+    assert not rs2.has([1])  # type: ignore[arg-type]
+
+
+def test_richset_has_reuses_hash_set() -> None:
+    rs = RichSet.from_list([Something(1, "one"), Something(2, "two")])
+    assert rs.has(Something(1, "one"))
+    record_set = rs._record_set
+    assert record_set == frozenset(rs.records)
+    assert rs.has(Something(2, "two"))
+    assert rs._record_set is record_set
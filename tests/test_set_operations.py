@@ -221,6 +221,26 @@ def test_richset_cartesian_product() -> None:
     }
 
 
+def test_richset_cartesian_product_where() -> None:
+    rs1 = RichSet.from_list([Something(i, str(i)) for i in range(4)])
+    rs2 = RichSet.from_list([Foo(i, str(i)) for i in range(3)])
+    calls: list[tuple[int, int]] = []
+
+    def where(a: Something, b: Foo) -> bool:
+        calls.append((a.id, b.id))
+        return a.id + b.id == 3
+
+    assert rs1.cartesian_product(rs2, where=where).to_list() == [
+        (Something(1, "1"), Foo(2, "2")),
+        (Something(2, "2"), Foo(1, "1")),
+        (Something(3, "3"), Foo(0, "0")),
+    ]
+    assert calls == [(a, b) for a in range(4) for b in range(3)]
+    assert rs1.cartesian_product(rs2).to_list() == [
+        (a, b) for a in rs1 for b in rs2
+    ]
+
+
 def test_richset_zip() -> None:
     rs1 = RichSet.from_list(
         [
@@ -349,3 +369,21 @@ def test_richset_symmetric_difference_order() -> None:
         Something(2, "two"),
         Something(3, "three"),
     )
+
+
+def test_richset_set_operations_unhashable() -> None:
+    rs = RichSet.from_list([[1], [2]])
+    with pytest.raises(TypeError):
+        rs.is_subset(rs)
+    with pytest.raises(TypeError):
+        rs.intersection(rs)
+
+
+def test_richset_set_operations_reuse_hash_set() -> None:
+    reference = RichSet.from_list([1, 2, 3])
+    assert RichSet.from_list([1, 2]).is_subset(reference)
+    record_set = reference._record_set
+    assert RichSet.from_list([3, 4]).intersection(reference).to_list() == [3]
+    assert RichSet.from_list([3, 4]).difference(reference).to_list() == [4]
+    assert not reference.is_disjoint(RichSet.from_list([3]))
+    assert reference._record_set is record_set
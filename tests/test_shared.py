@@ -0,0 +1,103 @@
+import pickle
+from collections.abc import Iterator
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+
+import pytest
+
+from richset import RichSet, SharedRichSet
+
+
+@dataclass(frozen=True)
+class Something:
+    id: int
+    name: str
+
+
+RECORDS = [
+    Something(1, "one"),
+    Something(2, "two"),
+    Something(3, "three"),
+]
+
+
+@pytest.fixture
+def shared() -> Iterator[SharedRichSet]:
+    with SharedRichSet.publish(RichSet.from_list(RECORDS)) as shared:
+        yield shared
+
+
+def test_richset_shared_columns(shared: SharedRichSet) -> None:
+    assert shared.kind == "columns"
+    assert shared.to_richset() == RichSet.from_list(RECORDS)
+    columnar = shared.columnar()
+    ids = columnar.column("id")
+    assert isinstance(ids, memoryview)
+    assert list(ids) == [1, 2, 3]
+    assert columnar.column("name") == ["one", "two", "three"]
+    assert columnar.to_list() == RECORDS
+    with pytest.raises(ValueError, match="stored as columns"):
+        shared.array()
+    with pytest.raises(ValueError, match="stored as columns"):
+        shared.mapped()
+
+
+def test_richset_shared_array() -> None:
+    with SharedRichSet.publish(RichSet.from_list([3, 1, 2])) as shared:
+        assert shared.kind == "array"
+        assert list(shared.array()) == [3, 1, 2]
+        assert shared.to_richset() == RichSet.from_list([3, 1, 2])
+        with pytest.raises(ValueError, match="stored as array"):
+            shared.columnar()
+
+
+def test_richset_shared_records() -> None:
+    records = RichSet.from_list([1, "one", None, (2, 3)])
+    with SharedRichSet.publish(records) as shared:
+        assert shared.kind == "records"
+        assert shared.to_richset() == records
+        mapped = shared.mapped()
+        assert mapped.nth(1) == "one"
+        assert mapped.page(2, 2).to_list() == [None, (2, 3)]
+        with pytest.raises(ValueError, match="stored as records"):
+            shared.array()
+
+
+def test_richset_shared_columnar_richset() -> None:
+    columnar = RichSet.from_list(RECORDS).to_columnar()
+    with SharedRichSet.publish(columnar) as shared:
+        assert shared.kind == "columns"
+        assert shared.columnar().to_list() == RECORDS
+
+
+def test_richset_shared_attach(shared: SharedRichSet) -> None:
+    with SharedRichSet.attach(shared.name) as attached:
+        assert not attached.owner
+        assert attached.columnar().to_list() == RECORDS
+    # detaching does not free the block
+    assert shared.to_richset() == RichSet.from_list(RECORDS)
+
+
+def test_richset_shared_pickle(shared: SharedRichSet) -> None:
+    pickled = pickle.dumps(shared)
+    assert b"three" not in pickled
+    with pickle.loads(pickled) as restored:  # noqa: S301
+        assert restored.name == shared.name
+        assert restored.to_richset() == RichSet.from_list(RECORDS)
+
+
+def sum_ids(shared: SharedRichSet) -> int:
+    with shared:
+        return sum(shared.columnar().column("id"))
+
+
+def test_richset_shared_in_process_pool(shared: SharedRichSet) -> None:
+    with ProcessPoolExecutor(max_workers=2) as pool:
+        assert list(pool.map(sum_ids, [shared, shared])) == [6, 6]
+
+
+def test_richset_shared_unlink() -> None:
+    with SharedRichSet.publish(RichSet.from_list([1, 2, 3])) as shared:
+        name = shared.name
+    with pytest.raises(FileNotFoundError):
+        SharedRichSet.attach(name)
@@ -0,0 +1,205 @@
+import dataclasses
+import pickle
+import sys
+from dataclasses import dataclass
+from pathlib import Path
+
+import pytest
+
+from richset import ColumnarRichSet, RichSet
+from richset._snapshot import MAGIC, read_header
+
+
+@dataclass(frozen=True)
+class Something:
+    id: int
+    name: str
+    score: float
+
+
+@dataclass(frozen=True)
+class Changing:
+    id: int
+
+
+@dataclass(frozen=True, kw_only=True)
+class KeywordOnly:
+    id: int
+    name: str
+
+
+@dataclass
+class Incremented:
+    x: int
+
+    def __post_init__(self) -> None:
+        self.x += 1
+
+
+@dataclass(frozen=True, slots=True)
+class Slotted:
+    id: int
+
+
+@dataclass
+class WithExtra:
+    id: int
+
+    def __post_init__(self) -> None:
+        self.double = self.id * 2
+
+
+@dataclass(frozen=True)
+class Reduced:
+    id: int
+
+    def __reduce__(self) -> tuple[type["Reduced"], tuple[int]]:
+        return Reduced, (self.id + 1,)
+
+
+def make_richset() -> RichSet[Something]:
+    return RichSet.from_list(
+        [
+            Something(1, "one", 0.5),
+            Something(2, "two", 1.5),
+            Something(3, "three", 2.5),
+        ],
+    )
+
+
+@pytest.mark.parametrize("mmap", [False, True])
+@pytest.mark.parametrize(
+    ("records", "kind"),
+    [
+        ((3, 1, 2, -(2**63)), "array"),
+        ((0.5, -1.0, float("inf")), "array"),
+        (make_richset().records, "columns"),
+        ((1, "one", None, (2, 3)), "pickle"),
+        ((2**64, 1), "pickle"),
+        ((), "pickle"),
+    ],
+)
+def test_richset_save_load(
+    tmp_path: Path,
+    records: tuple[object, ...],
+    kind: str,
+    mmap: bool,
+) -> None:
+    path = tmp_path / "records.snap"
+    RichSet.from_tuple(records).save(path)
+    loaded = RichSet.load(path, mmap=mmap)
+    assert loaded.records == records
+    assert type(loaded.records) is tuple
+    header = read_header(path)
+    assert header.kind == kind
+    assert header.size == len(records)
+    assert header.byteorder == sys.byteorder
+
+
+def test_richset_save_load_str_path(tmp_path: Path) -> None:
+    path = str(tmp_path / "records.snap")
+    make_richset().save(path)
+    assert RichSet.load(path) == make_richset()
+
+
+def test_richset_load_not_a_snapshot(tmp_path: Path) -> None:
+    path = tmp_path / "records.snap"
+    path.write_bytes(b"not a snapshot")
+    with pytest.raises(ValueError, match="not a RichSet snapshot"):
+        RichSet.load(path)
+    path.write_bytes(MAGIC)
+    with pytest.raises(ValueError, match="not a RichSet snapshot"):
+        read_header(path)
+
+
+def test_richset_load_schema_mismatch(
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    path = tmp_path / "records.snap"
+    RichSet.from_list([Changing(1), Changing(2)]).save(path)
+    changed = dataclasses.make_dataclass(
+        "Changing",
+        [("id", int), ("name", str)],
+        frozen=True,
+    )
+    changed.__module__ = __name__
+    monkeypatch.setattr(sys.modules[__name__], "Changing", changed)
+    with pytest.raises(ValueError, match="schema does not match"):
+        RichSet.load(path)
+
+
+def test_richset_columnar_save_load(tmp_path: Path) -> None:
+    path = tmp_path / "records.snap"
+    columnar = make_richset().to_columnar()
+    columnar.save(path)
+    loaded = ColumnarRichSet.load(path)
+    assert loaded.to_list() == make_richset().to_list()
+    assert loaded.column("id") == columnar.column("id")
+    assert loaded.column("name") == ["one", "two", "three"]
+    assert RichSet.load(path) == make_richset()
+
+
+def test_richset_columnar_load_mmap(tmp_path: Path) -> None:
+    path = tmp_path / "records.snap"
+    make_richset().save(path)
+    loaded = ColumnarRichSet.load(path, mmap=True)
+    ids = loaded.column("id")
+    assert isinstance(ids, memoryview)
+    assert ids.readonly
+    assert ids.tolist() == [1, 2, 3]
+    assert loaded.nth(1) == Something(2, "two", 1.5)
+    assert loaded.filter_where("score", ">", 1).to_list() == [
+        Something(2, "two", 1.5),
+        Something(3, "three", 2.5),
+    ]
+    assert list(loaded.sorted(key="id", reverse=True).column("id")) == [
+        3,
+        2,
+        1,
+    ]
+    assert loaded.size_of_group_by("id") == {1: 1, 2: 1, 3: 1}
+    assert list(loaded.group_by(lambda r: r.id % 2)) == [1, 0]
+    # a mapped ColumnarRichSet can be saved again
+    copy = tmp_path / "copy.snap"
+    loaded.save(copy)
+    assert ColumnarRichSet.load(copy).to_list() == make_richset().to_list()
+
+
+def test_richset_columnar_load_not_dataclasses(tmp_path: Path) -> None:
+    path = tmp_path / "records.snap"
+    RichSet.from_list([1, 2, 3]).save(path)
+    with pytest.raises(ValueError, match="not a snapshot of dataclasses"):
+        ColumnarRichSet.load(path)
+
+
+@pytest.mark.parametrize(
+    ("records", "kind"),
+    [
+        (
+            (KeywordOnly(id=1, name="a"), KeywordOnly(id=2, name="b")),
+            "columns",
+        ),
+        ((Incremented(1), Incremented(2)), "columns"),
+        ((Slotted(1), Slotted(2)), "columns"),
+        ((WithExtra(1), WithExtra(2)), "pickle"),
+        ((Reduced(1), Reduced(2)), "pickle"),
+    ],
+)
+def test_richset_save_load_dataclasses(
+    tmp_path: Path,
+    records: tuple[object, ...],
+    kind: str,
+) -> None:
+    path = tmp_path / "records.snap"
+    RichSet.from_tuple(records).save(path)
+    assert read_header(path).kind == kind
+    loaded = RichSet.load(path).records
+    # records come back as stored, or as pickling them would return them
+    expected = pickle.loads(pickle.dumps(records))  # noqa: S301
+    assert loaded == expected
+    assert [getattr(r, "__dict__", None) for r in loaded] == [
+        getattr(r, "__dict__", None) for r in expected
+    ]
+    if kind == "columns":
+        assert loaded == records
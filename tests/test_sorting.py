@@ -1,5 +1,7 @@
 from dataclasses import dataclass
 
+import pytest
+
 from richset import RichSet
 
 
@@ -72,3 +74,36 @@ def test_richset_reversed() -> None:
         Something(3, "three"),
         Something(1, "one"),
     ]
+
+
+def test_richset_top_k() -> None:
+    rs = RichSet.from_list(
+        [Something(i % 4, str(i)) for i in range(10)],
+    )
+    assert rs.top_k(3, key=lambda r: r.id).to_list() == [
+        Something(3, "3"),
+        Something(3, "7"),
+        Something(2, "2"),
+    ]
+    for k in range(12):
+        expected = rs.sorted(key=lambda r: r.id, reverse=True).page(0, k)
+        assert rs.top_k(k, key=lambda r: r.id) == expected
+    assert RichSet.from_list([]).top_k(3, key=lambda r: r).to_list() == []
+    with pytest.raises(ValueError):
+        rs.top_k(-1, key=lambda r: r.id)
+
+
+def test_richset_bottom_k() -> None:
+    rs = RichSet.from_list(
+        [Something(i % 4, str(i)) for i in range(10)],
+    )
+    assert rs.bottom_k(3, key=lambda r: r.id).to_list() == [
+        Something(0, "0"),
+        Something(0, "4"),
+        Something(0, "8"),
+    ]
+    for k in range(12):
+        expected = rs.sorted(key=lambda r: r.id).page(0, k)
+        assert rs.bottom_k(k, key=lambda r: r.id) == expected
+    with pytest.raises(ValueError):
+        rs.bottom_k(-1, key=lambda r: r.id)
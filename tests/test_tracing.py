@@ -0,0 +1,131 @@
+import io
+import json
+from dataclasses import dataclass
+
+import pytest
+
+from richset import InMemoryExporter, JsonLinesExporter, RichSet, Tracer
+from richset._instrumentation import current_parent_id, hooks
+
+
+@dataclass(frozen=True)
+class Something:
+    id: int
+    name: str
+
+
+def make_richset() -> RichSet[Something]:
+    return RichSet.from_list(
+        [
+            Something(1, "one"),
+            Something(2, "two"),
+            Something(3, "three"),
+            Something(4, "four"),
+        ],
+    )
+
+
+def test_richset_tracer() -> None:
+    rs = make_richset()
+    exporter = InMemoryExporter()
+    with Tracer(exporter):
+        rs.filter(lambda r: r.id > 1)
+    [span] = exporter.spans
+    assert span.name == "filter"
+    assert span.parent_id is None
+    assert span.input_size == 4
+    assert span.output_size == 3
+    assert span.start_ns <= span.end_ns
+    assert not hooks.active
+
+
+def test_richset_tracer_tree() -> None:
+    rs = make_richset()
+    exporter = InMemoryExporter()
+    with Tracer(exporter) as tracer, tracer.span("pipeline"):
+        rs.filter(lambda r: r.id > 1).group_by(lambda r: r.id % 2)
+        rs.aggregate_by(
+            key=lambda r: r.id % 2,
+            fn=lambda a, r: a + r.id,
+            initial=0,
+        )
+    [root] = exporter.children()
+    assert root.name == "pipeline"
+    assert root.input_size is None
+    assert exporter.spans[-1] == root
+    children = exporter.children(root)
+    assert [s.name for s in children] == ["filter", "group_by", "aggregate_by"]
+    assert [s.name for s in exporter.children(children[1])] == [
+        "to_dict_of_list",
+    ]
+    assert all(root.start_ns <= s.start_ns for s in exporter.spans)
+    assert current_parent_id.get() is None
+
+
+def test_richset_tracer_nested_spans() -> None:
+    rs = make_richset()
+    exporter = InMemoryExporter()
+    with Tracer(exporter) as tracer:
+        with tracer.span("outer"), tracer.span("inner"):
+            rs.to_list()
+        rs.to_set()
+    roots = exporter.children()
+    assert [s.name for s in roots] == ["outer", "to_set"]
+    [inner] = exporter.children(roots[0])
+    assert inner.name == "inner"
+    assert [s.name for s in exporter.children(inner)] == ["to_list"]
+
+
+def test_richset_tracer_span_exception() -> None:
+    exporter = InMemoryExporter()
+    with (
+        Tracer(exporter) as tracer,
+        pytest.raises(ValueError),
+        tracer.span("failing"),
+    ):
+        raise ValueError
+    assert [s.name for s in exporter.spans] == ["failing"]
+    assert exporter.spans[0].error == "ValueError"
+    assert current_parent_id.get() is None
+    exporter.clear()
+    assert exporter.spans == []
+
+
+def test_richset_tracer_failed_call() -> None:
+    rs = make_richset()
+    names: dict[int, str] = {}
+    exporter = InMemoryExporter()
+    with (
+        Tracer(exporter) as tracer,
+        pytest.raises(KeyError),
+        tracer.span("lookup"),
+    ):
+        rs.filter(lambda r: r.id > 2).map(lambda r: names[r.id])
+    filtered, failed, root = exporter.spans
+    assert (filtered.name, filtered.error) == ("filter", None)
+    assert (failed.name, failed.error) == ("map", "KeyError: 3")
+    assert failed.parent_id == root.span_id
+    assert failed.output_size is None
+    assert (root.name, root.error) == ("lookup", "KeyError: 3")
+
+
+def test_richset_json_lines_exporter() -> None:
+    rs = make_richset()
+    stream = io.StringIO()
+    with Tracer(JsonLinesExporter(stream)) as tracer, tracer.span("job"):
+        rs.sorted(key=lambda r: r.name)
+    lines = [json.loads(line) for line in stream.getvalue().splitlines()]
+    assert [line["name"] for line in lines] == ["sorted", "job"]
+    assert lines[0]["parent_id"] == lines[1]["span_id"]
+    assert lines[0]["input_size"] == 4
+    assert lines[1]["output_size"] is None
+    assert set(lines[0]) == {
+        "name",
+        "span_id",
+        "parent_id",
+        "start_ns",
+        "end_ns",
+        "input_size",
+        "output_size",
+        "error",
+    }
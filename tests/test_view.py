@@ -0,0 +1,137 @@
+from dataclasses import dataclass
+
+import pytest
+
+from richset import RichSet, RichSetView
+
+
+@dataclass(frozen=True)
+class Something:
+    id: int
+    name: str
+
+
+def make_richset(size: int) -> RichSet[Something]:
+    return RichSet.from_list([Something(i, str(i)) for i in range(size)])
+
+
+def test_richset_view() -> None:
+    rs = make_richset(5)
+    view = rs.view()
+    assert isinstance(view, RichSetView)
+    assert view.source is rs.records
+    assert len(view) == 5
+    assert view.size() == 5
+    assert not view.is_empty()
+    assert view.to_richset() == rs
+    assert view.to_list() == rs.to_list()
+    assert view.to_tuple() == rs.to_tuple()
+    assert list(view) == rs.to_list()
+
+
+def test_richset_view_accessors() -> None:
+    view = make_richset(5).view()
+    assert view.first() == Something(0, "0")
+    assert view.last() == Something(4, "4")
+    assert view.nth(2) == Something(2, "2")
+    assert view.reversed().nth(0) == Something(4, "4")
+    with pytest.raises(IndexError):
+        view.nth(5)
+    with pytest.raises(IndexError):
+        view.nth(-1)
+    empty = RichSet[Something].from_empty().view()
+    assert empty.is_empty()
+    with pytest.raises(IndexError):
+        empty.first()
+    with pytest.raises(IndexError):
+        empty.last()
+
+
+@pytest.mark.parametrize(
+    ("start", "stop"),
+    [(0, 5), (1, 3), (-3, -1), (3, 1), (0, 100), (-100, 2)],
+)
+def test_richset_view_slice(start: int, stop: int) -> None:
+    rs = make_richset(5)
+    assert rs.view().slice(start, stop).to_richset() == rs.slice(start, stop)
+    assert (
+        rs.view().reversed().slice(start, stop).to_richset()
+        == rs.reversed().slice(start, stop)
+    )
+
+
+def test_richset_view_manipulations() -> None:
+    rs = make_richset(5)
+    view = rs.view()
+    for index in range(-6, 7):
+        left, right = view.divide_at(index)
+        assert (left.to_richset(), right.to_richset()) == rs.divide_at(index)
+    for n in range(6):
+        popped, remains = view.popped_n(n)
+        assert (popped.to_richset(), remains.to_richset()) == rs.popped_n(n)
+        shifted, remains = view.shifted_n(n)
+        assert (shifted.to_richset(), remains.to_richset()) == rs.shifted_n(n)
+    with pytest.raises(IndexError):
+        view.popped_n(6)
+    with pytest.raises(ValueError):
+        view.popped_n(-1)
+    with pytest.raises(IndexError):
+        view.shifted_n(6)
+    with pytest.raises(ValueError):
+        view.shifted_n(-1)
+
+
+def test_richset_view_reversed() -> None:
+    rs = make_richset(5)
+    assert rs.view().reversed().to_richset() == rs.reversed()
+    assert rs.view().reversed().reversed().to_richset() == rs
+    assert rs.view().slice(1, 4).reversed().to_list() == [
+        Something(3, "3"),
+        Something(2, "2"),
+        Something(1, "1"),
+    ]
+
+
+def test_richset_view_paging() -> None:
+    rs = make_richset(5)
+    view = rs.view()
+    assert view.page(1, 2).to_richset() == rs.page(1, 2)
+    assert view.page(4, 2).to_richset() == rs.page(4, 2)
+    assert [p.to_richset() for p in view.split_into_pages(2)] == (
+        rs.split_into_pages(2)
+    )
+    assert all(p.source is rs.records for p in view.split_into_pages(2))
+    with pytest.raises(ValueError, match="offset must be non-negative"):
+        view.page(-1, 2)
+    with pytest.raises(ValueError, match="limit must be non-negative"):
+        view.page(0, -1)
+    with pytest.raises(ValueError, match="size must be a positive integer"):
+        view.split_into_pages(0)
+
+
+def test_richset_view_popped_shifted() -> None:
+    rs = make_richset(3)
+    view = rs.view()
+    record, remains = view.popped()
+    assert (record, remains.to_richset()) == rs.popped()
+    assert remains.source is rs.records
+    record, remains = view.shifted()
+    assert (record, remains.to_richset()) == rs.shifted()
+    assert remains.source is rs.records
+    record, remains = view.reversed().shifted()
+    assert (record, remains.to_richset()) == rs.reversed().shifted()
+    empty = RichSet[Something].from_empty().view()
+    with pytest.raises(IndexError):
+        empty.popped()
+    with pytest.raises(IndexError):
+        empty.shifted()
+
+
+def test_richset_view_drain_as_queue() -> None:
+    rs = make_richset(1000)
+    queue = rs.view()
+    drained = []
+    while not queue.is_empty():
+        record, queue = queue.shifted()
+        drained.append(record)
+    assert drained == rs.to_list()